@@ -1,12 +1,22 @@
 """SugarBuilder package."""
 
+import importlib
+
 __version__ = "0.1.0"
 __author__ = "SugarBuilder Contributors"
 
-from src.core import Config, Project, Compiler
-from src.commands import Command, ConfigureCommand, BuildCommand
-from src.toolchains import Toolchain
-from src.platforms import Platform
+# Public names are imported on first use, so lightweight entry points
+# (such as the daemon client) do not load the whole build system
+_EXPORTS = {
+    "Config": "src.core",
+    "Project": "src.core",
+    "Compiler": "src.core",
+    "Command": "src.commands",
+    "ConfigureCommand": "src.commands",
+    "BuildCommand": "src.commands",
+    "Toolchain": "src.toolchains",
+    "Platform": "src.platforms",
+}
 
 __all__ = [
     "Config",
@@ -18,3 +28,13 @@ __all__ = [
     "Toolchain",
     "Platform",
 ]
+
+
+def __getattr__(name: str):
+    """Import a public name from its module on first access."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
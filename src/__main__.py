@@ -1,17 +1,37 @@
 """SugarBuilder - Manual C++ Build Tool."""
 
-from src.commands import ConfigureCommand, BuildCommand
+from src.commands.base import check_options, get_option, get_port
+from src.core.daemon import daemon_available, daemon_socket_path, send_request
 from typing import Optional
+import os
 import sys
 
 
+# Command classes in src.commands, by command name
+COMMANDS = {
+    "configure": "ConfigureCommand",
+    "build": "BuildCommand",
+    "pgo": "PgoCommand",
+    "daemon": "DaemonCommand",
+    "cache-server": "CacheServerCommand",
+    "worker": "WorkerCommand",
+}
+
+
 def main(argv: Optional[list[str]] = None) -> int:
     """
     Main entry point for SugarBuilder CLI.
     
     Usage:
         sugar-builder configure [--config <path>]
-        sugar-builder build [--config <path>]
+        sugar-builder build [--config <path>] [--configuration <name>] [-j <jobs>]
+                            [--keep-going] [--trace <file>] [--time-report[=N]]
+                            [--time-trace] [--pgo <mode>] [--no-daemon] [--watch]
+        sugar-builder pgo [--config <path>] [--configuration <name>] [-j <jobs>]
+        sugar-builder daemon [--config <path>] [--stop]
+        sugar-builder cache-server [--host <addr>] [--port <n>] [--dir <path>]
+        sugar-builder worker [--host <addr>] [--port <n>] [--slots <n>] [--compilers <list>]
+        sugar-builder <command> --help
         sugar-builder --help
     
     Args:
@@ -30,21 +50,86 @@ def main(argv: Optional[list[str]] = None) -> int:
     command_name = argv[0]
     args = argv[1:]
     
-    # Parse config path if provided
-    config_path = None
-    if "--config" in args:
-        config_idx = args.index("--config")
-        if config_idx + 1 < len(args):
-            config_path = args[config_idx + 1]
+    # Command help is printed without running the command
+    if command_name in COMMANDS and ("--help" in args or "-h" in args):
+        import src.commands
+        print(getattr(src.commands, COMMANDS[command_name])().get_help())
+        return 0
     
     # Execute command
     try:
+        # Parse config path if provided
+        config_path = get_option(args, "--config", value_name="a file path")
+        
+        # Commands are imported when used: a build handed to the daemon
+        # never loads the build system in this process
         if command_name == "configure":
+            from src.commands import ConfigureCommand
             cmd = ConfigureCommand()
             return cmd.execute(config_path)
         elif command_name == "build":
-            cmd = BuildCommand()
+            # Hand the build to a running daemon for this project, if any
+            watch = "--watch" in args
+            if not watch and "--no-daemon" not in args and daemon_available():
+                code = send_request(
+                    daemon_socket_path(config_path or "sugar.toml"),
+                    {"command": "build", "args": args, "cwd": os.getcwd()},
+                    sys.stdout,
+                )
+                if code is not None:
+                    return code
+            from src.commands import BuildCommand
+            try:
+                cmd = BuildCommand.from_args(args)
+            except ValueError as e:
+                print(f"Error: {e}")
+                return 1
+            if watch:
+                return cmd.watch(config_path)
             return cmd.execute(config_path)
+        elif command_name == "pgo":
+            from src.commands import BuildCommand, PgoCommand
+            try:
+                options = BuildCommand.from_args(args)
+            except ValueError as e:
+                print(f"Error: {e}")
+                return 1
+            cmd = PgoCommand(
+                configuration=options.configuration,
+                jobs=options.jobs,
+                keep_going=options.keep_going,
+            )
+            return cmd.execute(config_path)
+        elif command_name == "daemon":
+            from src.commands import DaemonCommand
+            cmd = DaemonCommand(stop="--stop" in args)
+            return cmd.execute(config_path)
+        elif command_name == "cache-server":
+            from src.commands import CacheServerCommand
+            check_options(args, ["--verbose"], ["--host", "--port", "--dir"])
+            cmd = CacheServerCommand(
+                host=get_option(args, "--host") or "127.0.0.1",
+                port=get_port(args, 8877),
+                storage_dir=get_option(args, "--dir"),
+                verbose="--verbose" in args,
+            )
+            return cmd.execute()
+        elif command_name == "worker":
+            from src.commands import WorkerCommand
+            check_options(args, ["--verbose"], ["--host", "--port", "--slots", "--compilers"])
+            slots_value = get_option(args, "--slots")
+            if slots_value is not None and (not slots_value.isdigit() or int(slots_value) < 1):
+                print(f"Error: Invalid slot count '{slots_value}'")
+                return 1
+            compilers_value = get_option(args, "--compilers")
+            cmd = WorkerCommand(
+                host=get_option(args, "--host") or "127.0.0.1",
+                port=get_port(args, 8870),
+                slots=int(slots_value) if slots_value else None,
+                compilers=[name for name in compilers_value.split(",") if name] if compilers_value else None,
+                verbose="--verbose" in args,
+            )
+            return cmd.execute()
         else:
             print(f"Error: Unknown command '{command_name}'")
             print_help()
@@ -52,6 +137,10 @@ def main(argv: Optional[list[str]] = None) -> int:
     except KeyboardInterrupt:
         print("\nBuild cancelled by user")
         return 130
+    except ValueError as e:
+        # Invalid command-line options
+        print(f"Error: {e}")
+        return 1
     except Exception as e:
         print(f"Fatal error: {e}")
         return 1
@@ -68,19 +157,35 @@ Usage:
 Commands:
   configure [--config <path>]    Validate sugar.toml configuration
   build [--config <path>]        Compile and link the C++ project
+  pgo [--config <path>]          Instrument, train and rebuild with PGO
+  cache-server [--port <n>]      Run a shared compile cache server
+  worker [--port <n>]            Compile sources sent by distributed builds
+  daemon [--stop]                Keep the project loaded and serve builds
   help                           Show this help message
 
 Options:
   --config <path>                Path to sugar.toml (defaults to ./sugar.toml)
+  --configuration <name>         Build configuration (Debug, Release, ...)
+  -j, --jobs <n>                 Parallel compile jobs (defaults to CPU count)
+  -k, --keep-going               Keep compiling after a failed file
+  --trace <file>                 Write a Chrome trace-event timing file
+  --time-report[=N]              Print the N slowest files and build timings
+  --pgo <mode>                   Build instrumented or optimized with profiles
+  --no-daemon                    Build in this process even if a daemon runs
+  --watch                        Rebuild whenever sources or headers change
 
 Examples:
   sugar-builder configure
   sugar-builder build
   sugar-builder build --config custom.toml
+  sugar-builder build --configuration Release
+  sugar-builder build -j 8 --keep-going
+  sugar-builder build --trace build-trace.json
+  sugar-builder pgo --configuration Release
+  sugar-builder daemon &
 
 For detailed command help:
-  sugar-builder configure --help
-  sugar-builder build --help
+  sugar-builder <command> --help
 """
     print(help_text)
 
@@ -1,11 +1,35 @@
 """Commands module for SugarBuilder."""
 
-from .base import Command
-from .configure import ConfigureCommand
-from .build import BuildCommand
+import importlib
+
+# Commands are imported on first use, so lightweight entry points (such as
+# the daemon client) do not load the whole build system
+_EXPORTS = {
+    "Command": ".base",
+    "ConfigureCommand": ".configure",
+    "BuildCommand": ".build",
+    "CacheServerCommand": ".cache_server",
+    "DaemonCommand": ".daemon",
+    "PgoCommand": ".pgo",
+    "WorkerCommand": ".worker",
+}
 
 __all__ = [
     "Command",
     "ConfigureCommand",
     "BuildCommand",
+    "CacheServerCommand",
+    "DaemonCommand",
+    "PgoCommand",
+    "WorkerCommand",
 ]
+
+
+def __getattr__(name: str):
+    """Import a public name from its module on first access."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
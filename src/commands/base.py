@@ -1,7 +1,7 @@
 """Base command abstraction."""
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Iterable, List, Optional
 
 
 class Command(ABC):
@@ -41,3 +41,89 @@ class Command(ABC):
             Help text describing the command.
         """
         return f"Command: {self.name}"
+
+
+def get_option(args: List[str], *names: str, value_name: str = "a value") -> Optional[str]:
+    """
+    Get the value of a command-line option.
+    
+    Accepts "--name value", "--name=value" and short "-n<value>" forms.
+    
+    Args:
+        args: Command-line arguments.
+        names: Option names to look for (e.g. "--jobs", "-j").
+        value_name: What the value is, for the error message.
+        
+    Returns:
+        Option value, or None if the option is not present.
+        
+    Raises:
+        ValueError: If the option is last or followed by another option.
+    """
+    for idx, arg in enumerate(args):
+        for name in names:
+            if arg == name:
+                if idx + 1 >= len(args) or args[idx + 1].startswith("-"):
+                    raise ValueError(f"{name} needs {value_name}")
+                return args[idx + 1]
+            if arg.startswith(name + "="):
+                return arg[len(name) + 1:]
+            if len(name) == 2 and arg.startswith(name) and len(arg) > 2:
+                return arg[2:]  # Short form, e.g. -j8
+    return None
+
+
+def get_port(args: List[str], default: int) -> int:
+    """
+    Get the value of a --port option.
+    
+    Args:
+        args: Command-line arguments.
+        default: Port to use if the option is not present.
+        
+    Returns:
+        Port number.
+        
+    Raises:
+        ValueError: If the value is not a port number (1-65535).
+    """
+    value = get_option(args, "--port", value_name="a port number")
+    if value is None:
+        return default
+    if not value.isdigit() or not 1 <= int(value) <= 65535:
+        raise ValueError(f"Invalid port '{value}'. Must be 1-65535.")
+    return int(value)
+
+
+def check_options(
+    args: List[str],
+    flags: Iterable[str],
+    value_options: Iterable[str] = (),
+) -> None:
+    """
+    Reject arguments that are not options of a command.
+    
+    Args:
+        args: Command-line arguments.
+        flags: Options without a value (e.g. "--keep-going"); "--name=value"
+            is accepted for them too, for optional values.
+        value_options: Options taking a value (e.g. "--jobs", "-j").
+        
+    Raises:
+        ValueError: If an argument is not a known option.
+    """
+    flags = set(flags)
+    value_options = set(value_options)
+    short_options = [name for name in value_options if len(name) == 2]
+    expects_value = False
+    for arg in args:
+        if expects_value:
+            expects_value = False
+            continue
+        name = arg.split("=", 1)[0]
+        if arg in value_options:
+            expects_value = True
+        elif name not in flags and name not in value_options and not any(
+            arg.startswith(short) for short in short_options
+        ):
+            raise ValueError(f"Unknown option '{arg}'")
@@ -1,10 +1,23 @@
 """Build command for SugarBuilder."""
 
 from pathlib import Path
-from typing import Optional
-from .base import Command
-from src.core import Config, Project
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import os
+import time
+from .base import Command, check_options, get_option
+from src.core import Config, Project, Target, Job, JobResult, JobScheduler, BuildDatabase, DependencyGraph
+from src.core.cache import CompileCache, user_cache_dir
+from src.core.distributed import WorkerPool
+from src.core.remote_cache import HTTPCacheBackend
+from src.core.scheduler import default_job_count
+from src.core.session import BuildSession
+from src.core.timings import aggregate_time_traces, child_cpu_time
+from src.core.trace import BuildTrace
+from src.core.unity import UnityBuilder
+from src.core.watcher import RESCAN, Change, collect_changes, create_watcher
 from src.toolchains import Toolchain
+from src.toolchains.base import write_output
 
 
 class BuildCommand(Command):
@@ -14,19 +27,326 @@ class BuildCommand(Command):
     Compiles source files to object files and links them into final target.
     """
     
-    def __init__(self):
-        """Initialize build command."""
+    # Command-line options (--config, --no-daemon and --watch are handled
+    # by the entry point but accepted here, as the daemon receives them)
+    FLAGS = ("--keep-going", "-k", "--time-report", "--time-trace", "--no-daemon", "--watch")
+    VALUE_OPTIONS = ("--config", "--jobs", "-j", "--trace", "--configuration", "--pgo")
+    
+    def __init__(
+        self,
+        jobs: Optional[int] = None,
+        keep_going: bool = False,
+        trace_path: Optional[str] = None,
+        time_report: Optional[int] = None,
+        time_trace: bool = False,
+        session: Optional[BuildSession] = None,
+        configuration: Optional[str] = None,
+        pgo: Optional[str] = None,
+    ):
+        """
+        Initialize build command.
+        
+        Args:
+            jobs: Number of parallel compile jobs (overrides sugar.toml).
+            keep_going: Keep compiling remaining files after a failure.
+            trace_path: Write a Chrome trace-event timing file here.
+            time_report: Print a timing summary ranking this many of the
+                slowest translation units (disabled when None).
+            time_trace: Collect per-file compiler time traces (Clang
+                -ftime-trace) and summarize them in the time report.
+            session: Project state from a previous build to reuse (the
+                daemon and watch mode keep one across builds).
+            configuration: Build configuration to use (defaults to
+                default_configuration in sugar.toml).
+            pgo: 'instrument' to build programs that record profiles,
+                'optimize' to build with the recorded profiles.
+        """
         super().__init__("build")
+        self.jobs = jobs
+        self.keep_going = keep_going
+        self.trace_path = trace_path
+        self.time_report = time_report
+        self.time_trace = time_trace
+        self.session = session
+        self.configuration = configuration
+        self.pgo = pgo
+        # Object paths whose inputs changed, when watch mode knows them
+        # exactly; every other object is assumed up to date
+        self.changed_objects: Optional[Set[str]] = None
+        self.trace = BuildTrace()
+    
+    @classmethod
+    def from_args(cls, args: List[str], session: Optional[BuildSession] = None) -> "BuildCommand":
+        """
+        Create a build command from command-line arguments.
+        
+        Args:
+            args: Arguments after the command name.
+            session: Project state from a previous build to reuse.
+            
+        Returns:
+            Configured BuildCommand.
+            
+        Raises:
+            ValueError: If an option is unknown or its value invalid.
+        """
+        check_options(args, cls.FLAGS, cls.VALUE_OPTIONS)
+        
+        # Parse parallel build options
+        jobs = None
+        jobs_value = get_option(args, "--jobs", "-j", value_name="a job count")
+        if jobs_value is not None:
+            try:
+                jobs = int(jobs_value)
+            except ValueError:
+                jobs = 0
+            if jobs < 1:
+                raise ValueError(f"Invalid job count '{jobs_value}'")
+        
+        # Parse timing report options
+        time_report = None
+        if "--time-report" in args:
+            time_report = 10
+        report_value = next(
+            (arg.split("=", 1)[1] for arg in args if arg.startswith("--time-report=")), None
+        )
+        if report_value is not None:
+            if not report_value.isdigit() or int(report_value) < 1:
+                raise ValueError(f"Invalid time report count '{report_value}'")
+            time_report = int(report_value)
+        
+        pgo = get_option(args, "--pgo", value_name="a mode")
+        if pgo is not None and pgo not in ["instrument", "optimize"]:
+            raise ValueError(f"Invalid PGO mode '{pgo}'. Must be 'instrument' or 'optimize'")
+        
+        return cls(
+            jobs=jobs,
+            keep_going="--keep-going" in args or "-k" in args,
+            trace_path=get_option(args, "--trace", value_name="a file path"),
+            time_report=time_report,
+            time_trace="--time-trace" in args,
+            session=session,
+            configuration=get_option(args, "--configuration", value_name="a configuration name"),
+            pgo=pgo,
+        )
     
     def execute(self, config_path: Optional[str] = None) -> int:
+        """
+        Build the C++ project, writing a timing trace if requested.
+        
+        Args:
+            config_path: Optional path to sugar.toml (defaults to ./sugar.toml).
+            
+        Returns:
+            0 on success, 1 on failure.
+        """
+        self.trace = BuildTrace()
+        try:
+            return self._build(config_path)
+        finally:
+            if self.trace_path:
+                try:
+                    self.trace.save(Path(self.trace_path))
+                    print(f"Trace written to {self.trace_path}")
+                except OSError as e:
+                    print(f"Error: Cannot write trace {self.trace_path}: {e}")
+    
+    def watch(self, config_path: Optional[str] = None, quiet: float = 0.2) -> int:
+        """
+        Build, then rebuild whenever sources, headers or sugar.toml change.
+        
+        The project stays loaded between builds. After a successful build,
+        only objects that depend on a changed file are checked and rebuilt;
+        adding or removing sources, editing sugar.toml or a failed build
+        makes the next build check everything.
+        
+        Args:
+            config_path: Optional path to sugar.toml (defaults to ./sugar.toml).
+            quiet: Seconds without further changes before rebuilding.
+            
+        Returns:
+            Exit code of the last build, when stopped with Ctrl+C.
+        """
+        if config_path is None:
+            config_path = "sugar.toml"
+        watched_extensions = set(Project.SOURCE_EXTENSIONS) | set(Project.HEADER_EXTENSIONS)
+        watcher = None
+        watched_session = None
+        code = 1
+        try:
+            while True:
+                try:
+                    session = self.load_session(config_path)
+                except (FileNotFoundError, ValueError) as e:
+                    print(f"Configuration Error: {e}")
+                    session = None
+                
+                # Watch the source directories of the current configuration
+                if watcher is None or session is not watched_session:
+                    if watcher is not None:
+                        watcher.close()
+                    roots = []
+                    skip_dirs = []
+                    if session is not None:
+                        project = session.project
+                        roots = sorted({
+                            project.root_dir / src_path
+                            for target in project.get_targets()
+                            for src_path in target.source_paths
+                            if (project.root_dir / src_path).is_dir()
+                        })
+                        skip_dirs = project.get_generated_directories()
+                    watcher = create_watcher(roots, [Path(config_path)], skip_dirs)
+                    watched_session = session
+                    self.changed_objects = None
+                
+                if session is not None:
+                    code = self.execute(config_path)
+                    # Headers outside the source directories, e.g. include/
+                    if session.dep_graph is not None:
+                        watcher.watch_files(session.dep_graph.get_files())
+                
+                print(f"\nWatching for changes ({type(watcher).__name__}, Ctrl+C to stop)...")
+                while True:
+                    changes = collect_changes(watcher, quiet)
+                    if not changes:
+                        return code
+                    changed = self._classify_changes(changes, config_path, session, watched_extensions)
+                    if changed is not None:
+                        break
+                
+                full_check, changed_files = changed
+                shown = ", ".join(sorted(os.path.relpath(path) for path in changed_files)[:5])
+                more = f" and {len(changed_files) - 5} more" if len(changed_files) > 5 else ""
+                print(f"\nChanged: {shown or 'source files'}{more}")
+                if full_check or code != 0 or session is None or session.dep_graph is None:
+                    self.changed_objects = None
+                else:
+                    self.changed_objects = {
+                        str(obj) for obj in session.dep_graph.get_dependents_of(changed_files)
+                    }
+        except KeyboardInterrupt:
+            print("\nStopped watching")
+            return code
+        finally:
+            if watcher is not None:
+                watcher.close()
+    
+    @staticmethod
+    def _classify_changes(
+        changes: List[Change],
+        config_path: str,
+        session: Optional[BuildSession],
+        watched_extensions: Set[str],
+    ) -> Optional[Tuple[bool, List[Path]]]:
+        """
+        Decide whether file changes call for a rebuild.
+        
+        Args:
+            changes: Changes reported by the watcher.
+            config_path: Path to sugar.toml.
+            session: Current session (None if the configuration is invalid).
+            watched_extensions: Source and header file extensions.
+            
+        Returns:
+            None if nothing relevant changed (e.g. editor swap files),
+            otherwise (whether every object must be checked, changed files).
+        """
+        config_file = os.path.abspath(config_path)
+        known_sources = set()
+        known_files = set()
+        if session is not None:
+            if session.target_sources is not None:
+                known_sources = {
+                    os.path.abspath(path)
+                    for sources in session.target_sources.values()
+                    for path in sources
+                }
+            if session.dep_graph is not None:
+                known_files = {os.path.abspath(path) for path in session.dep_graph.get_files()}
+        
+        full_check = False
+        changed_files: List[Path] = []
+        for kind, path in changes:
+            abs_path = os.path.abspath(path)
+            if kind == RESCAN or abs_path == config_file:
+                full_check = True
+                changed_files.append(Path(abs_path))
+                continue
+            if abs_path not in known_files and os.path.splitext(abs_path)[1] not in watched_extensions:
+                continue
+            changed_files.append(Path(abs_path))
+            if os.path.splitext(abs_path)[1] in Project.SOURCE_EXTENSIONS:
+                # Editors often save by replacing the file, which looks like
+                # remove + add; only a real difference changes the source list
+                exists = os.path.exists(abs_path)
+                if session is not None and exists != (abs_path in known_sources):
+                    session.invalidate_sources()
+                    full_check = True
+        
+        if not changed_files:
+            return None
+        return full_check, sorted(set(changed_files))
+    
+    def load_session(self, config_path: str) -> BuildSession:
+        """
+        Load the project, reusing the current session if sugar.toml and the
+        requested configuration are unchanged.
+        
+        Args:
+            config_path: Path to sugar.toml.
+            
+        Returns:
+            BuildSession for the configuration (also stored in self.session).
+            
+        Raises:
+            FileNotFoundError: If the configuration file does not exist.
+            ValueError: If the configuration is invalid.
+        """
+        if (
+            self.session is not None
+            and self.session.is_current(Path(config_path))
+            and self.session.configuration_name == self.configuration
+        ):
+            return self.session
+        
+        # Load configuration
+        with self.trace.span("Load configuration", args={"config": str(config_path)}):
+            config = Config.load(config_path)
+            config.validate()
+            configuration = config.get_configuration(self.configuration)
+            
+            # Create project
+            project = Project(config, configuration=configuration)
+        
+        # Get toolchain
+        with self.trace.span("Probe toolchain", args={"compiler": config.compiler}):
+            toolchain = Toolchain.create(config.compiler)
+        toolchain.response_file_dir = project.get_response_file_directory()
+        toolchain.set_linker(config.linker)
+        toolchain.set_thin_archives(config.thin_archives)
+        toolchain.set_lto(config.lto)
+        toolchain.lto_cache_dir = project.get_lto_cache_directory()
+        if config.compile_cache or config.remote_cache:
+            cache_dir = Path(config.cache_dir) if config.cache_dir else user_cache_dir() / "objects"
+            remote = HTTPCacheBackend(config.remote_cache) if config.remote_cache else None
+            toolchain.cache = CompileCache(cache_dir, config.cache_max_size_mb * 1024 * 1024, remote)
+        if config.compile_workers:
+            toolchain.distributor = WorkerPool(config.compile_workers)
+        
+        self.session = BuildSession(Path(config_path), config, project, toolchain, self.configuration)
+        return self.session
+    
+    def _build(self, config_path: Optional[str] = None) -> int:
         """
         Build the C++ project.
         
         Steps:
         1. Load and validate configuration
         2. Create build and output directories
-        3. Compile all source files to object files
-        4. Link object files into target (exe/static/shared)
+        3. Compile out-of-date source files of every target in parallel
+        4. Link each target (exe/static/shared) if anything changed, as soon
+           as its objects and the libraries it depends on are ready
         
         Args:
             config_path: Optional path to sugar.toml (defaults to ./sugar.toml).
@@ -41,12 +361,11 @@ class BuildCommand(Command):
             
             print(f"Building from: {config_path}")
             
-            # Load configuration
-            config = Config.load(config_path)
-            config.validate()
-            
-            # Create project
-            project = Project(config)
+            # Load configuration and toolchain, or reuse them from the last build
+            session = self.load_session(config_path)
+            config = session.config
+            project = session.project
+            toolchain = session.toolchain
             
             # Create directories if they don't exist
             build_dir = project.get_build_directory()
@@ -54,68 +373,316 @@ class BuildCommand(Command):
             build_dir.mkdir(parents=True, exist_ok=True)
             output_dir.mkdir(parents=True, exist_ok=True)
             
+            if project.configuration is not None:
+                print(f"Configuration: {project.configuration.name}")
             print(f"Build directory: {build_dir}")
             print(f"Output directory: {output_dir}")
+            if toolchain.linker is not None:
+                print(f"Linker: {toolchain.linker}")
+            if toolchain.lto is not None:
+                toolchain.lto_cache_dir.mkdir(parents=True, exist_ok=True)
+                print(f"LTO: {toolchain.lto}")
             
-            # Get toolchain
-            toolchain = Toolchain.create(config.compiler)
+            # Profiles change between builds, so PGO is set up every time
+            toolchain.set_pgo(self.pgo, project.get_profile_directory())
+            if self.pgo == "instrument":
+                toolchain.profile_dir.mkdir(parents=True, exist_ok=True)
+                print(f"PGO: instrumented; profiles are written to {toolchain.profile_dir}")
+            elif self.pgo == "optimize":
+                print(f"PGO: optimizing with {len(toolchain.get_profile_files())} profile(s)")
+            if toolchain.cache is not None:
+                toolchain.cache.reset_stats()
+                print(f"Compile cache: {toolchain.cache.cache_dir}")
+                if toolchain.cache.remote is not None:
+                    print(f"Remote cache: {toolchain.cache.remote.url}")
             
-            # Get source files
-            source_files = project.get_source_files()
-            if not source_files:
-                print("Warning: No source files found!")
-                return 1
+            # Collect the sources of every target, unless files were neither
+            # added nor removed since the last build
+            targets = project.get_targets()
+            if session.target_sources is None:
+                target_sources = {}
+                with self.trace.span("Discover sources") as trace_args:
+                    for target in targets:
+                        target_sources[target.name] = project.get_source_files(target)
+                        if not target_sources[target.name]:
+                            print(f"Warning: No source files found for target {target.name}!")
+                            return 1
+                    trace_args["files"] = sum(len(files) for files in target_sources.values())
+                session.target_sources = target_sources
+            target_sources = session.target_sources
+            source_count = sum(len(files) for files in target_sources.values())
+            
+            if len(targets) == 1:
+                print(f"Found {source_count} source files")
+            else:
+                print(f"Found {source_count} source files in {len(targets)} targets")
+            
+            # Load build state and header dependencies from previous runs
+            with self.trace.span("Load build state") as trace_args:
+                reloaded = session.load_state()
+                trace_args["reloaded"] = reloaded
+                hasher = session.hasher
+                build_db = session.build_db
+                dep_graph = session.dep_graph
+                timings = session.timings
+                toolchain_id = toolchain.get_identity()
             
-            print(f"Found {len(source_files)} source files")
+            # Flags of the build configuration, plus ones that only affect
+            # diagnostics output
+            configuration = project.configuration
+            configuration_flags = list(configuration.compile_flags) if configuration is not None else []
+            link_flags = list(configuration.link_flags) if configuration is not None else []
+            time_trace_flags: List[str] = []
+            if self.time_trace:
+                time_trace_flags = toolchain.get_time_trace_flags()
+                if not time_trace_flags:
+                    print(f"Note: {toolchain.name} cannot write time traces; ignoring --time-trace")
+            compile_flags = configuration_flags + time_trace_flags
             
-            # Compile sources to objects
-            object_files = []
+            # Build one job graph for all targets: compile out-of-date sources,
+            # then link each target once its objects and upstream libraries exist
+            planning_started = time.perf_counter()
             obj_ext = toolchain.get_object_extension()
+            jobs = []
+            pending = []
+            link_jobs: Dict[str, Job] = {}
+            link_status: Dict[str, str] = {}
+            job_details: Dict[Job, Dict[str, Any]] = {}
+            job_inputs: Dict[Job, List[Path]] = {}
+            all_objects: List[Path] = []
+            unity_batches = 0
+            # State written by another process invalidates what watch mode saw
+            changed_objects = None if reloaded else self.changed_objects
             
-            for source_file in source_files:
-                obj_name = source_file.stem + obj_ext
-                obj_file = build_dir / obj_name
-                
-                print(f"Compiling: {source_file.name} -> {obj_name}")
+            # The precompiled header is built ahead of every compile that uses it
+            pch_job = None
+            if config.precompiled_header:
+                pch_job = self._pch_job(
+                    project,
+                    config,
+                    toolchain,
+                    build_db,
+                    dep_graph,
+                    toolchain_id,
+                    flags=configuration_flags or None,
+                )
+                if pch_job is not None:
+                    jobs.append(pch_job)
+                    job_details[pch_job] = {
+                        "command": toolchain.get_pch_compile_command(
+                            toolchain.precompiled_header,
+                            flags=configuration_flags or None,
+                        ),
+                        "output": str(toolchain.get_pch_path(toolchain.precompiled_header)),
+                    }
+                    job_inputs[pch_job] = [project.root_dir / config.precompiled_header]
+            
+            for target in targets:
+                object_files = []
+                compile_jobs = []
                 
-                # TODO: Pass include dirs from config
-                success = toolchain.compile_object(source_file, obj_file)
+                compile_units = [
+                    (source_file, str(source_file), [source_file])
+                    for source_file in target_sources[target.name]
+                ]
+                if config.unity_build:
+                    compile_units, batch_count = self._plan_unity(project, config, target, target_sources[target.name])
+                    unity_batches += batch_count
                 
-                if not success:
-                    print(f"Error compiling {source_file}")
-                    return 1
+                for source_file, job_name, job_sources in compile_units:
+                    obj_file = project.get_object_path(source_file, obj_ext, target)
+                    object_files.append(obj_file)
+                    
+                    # TODO: Pass include dirs from config
+                    command = toolchain.get_compile_command(source_file, obj_file, flags=compile_flags or None)
+                    if pch_job is not None:
+                        # Depfiles do not list the PCH, so a rebuilt PCH
+                        # rebuilds everything; forget the old records in case
+                        # this build stops early
+                        build_db.forget_object(obj_file)
+                    elif changed_objects is not None and str(obj_file) not in changed_objects:
+                        continue
+                    elif (
+                        build_db.is_object_up_to_date(obj_file, source_file, command, toolchain_id)
+                        and dep_graph.is_up_to_date(obj_file)
+                    ):
+                        continue
+                    compile_job = self._compile_job(
+                        toolchain,
+                        build_db,
+                        dep_graph,
+                        source_file,
+                        obj_file,
+                        command,
+                        job_name,
+                        flags=compile_flags or None,
+                    )
+                    if pch_job is not None:
+                        compile_job.deps.append(pch_job)
+                    compile_jobs.append(compile_job)
+                    job_details[compile_job] = {"command": command, "output": str(obj_file)}
+                    job_inputs[compile_job] = job_sources
+                    pending.append((source_file, obj_file))
                 
-                object_files.append(obj_file)
+                all_objects.extend(object_files)
+                pch_object = toolchain.get_pch_object()
+                if pch_object is not None:
+                    object_files.append(pch_object)
+                upstream = project.target_graph.transitive_deps(target.name)
+                link_job = self._link_job(
+                    toolchain,
+                    build_db,
+                    target,
+                    output_dir / project.get_target_filename(target),
+                    object_files,
+                    [(dep, project.get_link_artifact(dep)) for dep in upstream],
+                    toolchain_id,
+                    link_status,
+                    flags=link_flags,
+                )
+                # Compiles never wait on other targets; only the final link
+                # of a binary blocks on the libraries it links against
+                link_job.deps = list(compile_jobs)
+                if target.project_type != "static":
+                    link_job.deps += [link_jobs[dep.name] for dep in upstream]
+                link_jobs[target.name] = link_job
+                job_details[link_job] = {
+                    "output": str(output_dir / project.get_target_filename(target)),
+                    "target": target.name,
+                    "type": target.project_type,
+                    "inputs": len(object_files) + len(upstream),
+                }
+                jobs.extend(compile_jobs)
+                jobs.append(link_job)
             
-            # Link objects into target
-            target_name = project.get_target_filename()
-            target_path = output_dir / target_name
+            if hasher is not None:
+                hasher.save()
             
-            print(f"\nLinking: {target_name}")
+            # Start the longest work first, based on previous build timings
+            estimates = timings.estimate(
+                {job_details[job]["output"]: job_inputs.get(job, []) for job in jobs}
+            )
+            for job in jobs:
+                job.cost = estimates[job_details[job]["output"]]
             
-            if config.project_type == "exe":
-                success = toolchain.link_executable(
-                    object_files,
-                    target_path,
-                    libraries=config.link_dependencies,
-                )
-            elif config.project_type == "static":
-                success = toolchain.link_static_library(object_files, target_path)
-            elif config.project_type == "shared":
-                success = toolchain.link_shared_library(
-                    object_files,
-                    target_path,
-                    libraries=config.link_dependencies,
+            # Create the mirrored object tree before compiling in parallel
+            Project.create_directories(obj_file for _, obj_file in pending)
+            self.trace.add(
+                "Plan jobs",
+                "setup",
+                planning_started,
+                time.perf_counter(),
+                args={"jobs": len(jobs), "compiles": len(pending)},
+            )
+            
+            object_count = len(all_objects)
+            if config.unity_build:
+                print(f"Unity build: {source_count} source files as {object_count} translation units ({unity_batches} batched)")
+            
+            up_to_date = object_count - len(pending)
+            if up_to_date:
+                print(f"{up_to_date} object file(s) up to date")
+            
+            jobs_limit = self.jobs or config.jobs
+            if pending and toolchain.distributor is not None:
+                toolchain.distributor.reset_stats()
+                with self.trace.span("Query compile workers", "distributed") as trace_args:
+                    slots = asyncio.run(toolchain.distributor.refresh())
+                    trace_args["slots"] = slots
+                print(f"Compile workers: {slots} slot(s) available")
+                if jobs_limit is None:
+                    # Keep the workers' slots busy as well as the local cores
+                    jobs_limit = default_job_count() + slots
+            scheduler = JobScheduler(jobs_limit, self.keep_going)
+            if pending:
+                print(f"Compiling {len(pending)} file(s) with {scheduler.jobs} parallel jobs")
+                if toolchain.cache is not None and toolchain.cache.remote is not None:
+                    with self.trace.span("Fetch remote cache entries", "cache"):
+                        self._prefetch_remote(toolchain, pending, scheduler.jobs, compile_flags or None)
+            
+            link_names = {job: name for name, job in link_jobs.items()}
+            compile_failures = 0
+            link_failures = 0
+            compile_times: List[Tuple[str, float]] = []
+            link_times: List[Tuple[str, float]] = []
+            run_started = time.perf_counter()
+            cpu_started = child_cpu_time()
+            try:
+                for done, result in enumerate(scheduler.run(jobs), start=1):
+                    progress = f"[{done}/{len(jobs)}]"
+                    target_name = link_names.get(result.job)
+                    self._trace_result(result, "compile" if target_name is None else "link", job_details)
+                    
+                    # Remember how long real work took, for reports and scheduling
+                    if result.success and (target_name is None or link_status[target_name] == "linked"):
+                        timings.record(job_details[result.job]["output"], result.duration)
+                        times = compile_times if target_name is None else link_times
+                        times.append((result.job.name, result.duration))
+                    
+                    if result.error is not None:
+                        write_output(f"  Error: {result.error}\n")
+                    if target_name is None:
+                        if result.success:
+                            write_output(f"{progress} Compiled {result.job.name}\n")
+                        else:
+                            compile_failures += 1
+                            write_output(f"{progress} Error compiling {result.job.name}\n")
+                    elif not result.success:
+                        link_failures += 1
+                        write_output(f"{progress} Error linking {result.job.name}\n")
+                    elif link_status[target_name] == "linked":
+                        write_output(f"{progress} Linked {result.job.name} in {result.duration:.2f}s\n")
+                    else:
+                        write_output(f"{progress} Target up to date: {result.job.name}\n")
+            finally:
+                # Keep records of objects and targets that did build
+                run_wall = time.perf_counter() - run_started
+                cpu_finished = child_cpu_time()
+                cpu_used = cpu_finished - cpu_started if cpu_finished is not None else None
+                with self.trace.span("Save build state"):
+                    session.save_state()
+                if toolchain.cache is not None and pending:
+                    self._report_cache(toolchain.cache)
+                if toolchain.distributor is not None and pending:
+                    distributor = toolchain.distributor
+                    print(
+                        f"\nDistributed: {distributor.remote_compiles} compiled on workers, "
+                        f"{distributor.local_fallbacks} fell back to local"
+                    )
+            
+            if self.time_report is not None:
+                # Aggregate the traces of every object, not just this build's
+                trace_files = []
+                if time_trace_flags:
+                    trace_files = [
+                        toolchain.get_time_trace_path(obj_file)
+                        for obj_file in all_objects
+                        if toolchain.get_time_trace_path(obj_file).exists()
+                    ]
+                self._print_time_report(
+                    self.time_report,
+                    compile_times,
+                    link_times,
+                    run_wall,
+                    cpu_used,
+                    scheduler.jobs,
+                    time.perf_counter() - self.trace.origin,
+                    trace_files,
+                    toolchain.linker,
                 )
-            else:
-                raise ValueError(f"Unknown project type: {config.project_type}")
             
-            if not success:
-                print("Error during linking")
+            if compile_failures or link_failures:
+                if compile_failures:
+                    print(f"\n{compile_failures} file(s) failed to compile")
+                if link_failures:
+                    print(f"\n{link_failures} target(s) failed to link")
+                if scheduler.skipped:
+                    print(f"{scheduler.skipped} job(s) not run (use --keep-going to continue past errors)")
                 return 1
             
             print(f"\nBuild successful!")
-            print(f"Target: {target_path}")
+            for target in targets:
+                print(f"Target: {output_dir / project.get_target_filename(target)}")
             
             return 0
         
@@ -129,23 +696,546 @@ class BuildCommand(Command):
             print(f"Build Error: {e}")
             return 1
     
+    def _trace_result(
+        self,
+        result: JobResult,
+        category: str,
+        job_details: Dict[Job, Dict[str, Any]],
+    ) -> None:
+        """
+        Add a finished job to the build trace.
+        
+        Args:
+            result: Scheduler result.
+            category: 'compile' or 'link'.
+            job_details: Extra trace args per job (command line, target).
+        """
+        args = dict(job_details.get(result.job, {}))
+        if "command" in args:
+            args["command"] = " ".join(args["command"])
+        args["status"] = "ok" if result.success else "failed"
+        if result.error is not None:
+            args["error"] = str(result.error)
+        self.trace.add(result.job.name, category, result.start, result.end, result.worker + 1, args)
+    
+    @staticmethod
+    def _print_time_report(
+        count: int,
+        compile_times: List[Tuple[str, float]],
+        link_times: List[Tuple[str, float]],
+        run_wall: float,
+        cpu_used: Optional[float],
+        workers: int,
+        total_wall: float,
+        trace_files: List[Path],
+        linker: Optional[str] = None,
+    ) -> None:
+        """
+        Print where the build spent its time.
+        
+        Args:
+            count: Number of slowest translation units to list.
+            compile_times: (name, seconds) of every compile that ran.
+            link_times: (name, seconds) of every link that ran.
+            run_wall: Wall time of the compile and link phase.
+            cpu_used: CPU time of compiler and linker processes, if known.
+            workers: Number of parallel jobs.
+            total_wall: Wall time of the whole build command.
+            trace_files: Clang -ftime-trace files to aggregate.
+            linker: Linker used, if not the compiler's default.
+        """
+        compile_total = sum(seconds for _, seconds in compile_times)
+        link_total = sum(seconds for _, seconds in link_times)
+        
+        print("\nTime report:")
+        if compile_times:
+            print(f"  Slowest translation units:")
+            for name, seconds in sorted(compile_times, key=lambda item: item[1], reverse=True)[:count]:
+                print(f"    {seconds:8.2f}s  {name}")
+        print(f"  Compile: {len(compile_times)} job(s), {compile_total:.2f}s total")
+        print(f"  Link: {len(link_times)} job(s), {link_total:.2f}s total ({linker or 'default'} linker)")
+        for name, seconds in sorted(link_times, key=lambda item: item[1], reverse=True):
+            print(f"    {seconds:8.2f}s  {name}")
+        print(f"  Wall time: {total_wall:.2f}s ({run_wall:.2f}s compiling and linking)")
+        if cpu_used is not None:
+            print(f"  CPU time (compilers and linkers): {cpu_used:.2f}s")
+        if run_wall > 0 and (compile_times or link_times):
+            efficiency = (compile_total + link_total) / (run_wall * workers)
+            print(f"  Parallel efficiency: {efficiency:.0%} of {workers} job slot(s) busy")
+        
+        if trace_files:
+            headers, templates = aggregate_time_traces(trace_files)
+            if headers:
+                print(f"  Most expensive headers (inclusive parse time across all files):")
+                for name, seconds, uses in headers[:count]:
+                    print(f"    {seconds:8.2f}s  {uses:5d}x  {name}")
+            if templates:
+                print(f"  Most expensive template instantiations:")
+                for name, seconds, uses in templates[:count]:
+                    print(f"    {seconds:8.2f}s  {uses:5d}x  {name}")
+    
+    @staticmethod
+    def _compile_job(
+        toolchain: Toolchain,
+        build_db: BuildDatabase,
+        dep_graph: DependencyGraph,
+        source_file: Path,
+        obj_file: Path,
+        command: List[str],
+        name: Optional[str] = None,
+        compile_func: Optional[Callable[..., Awaitable[bool]]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> Job:
+        """
+        Create a scheduler job that compiles one source file.
+        
+        The source stamp is taken before compiling, so edits made while the
+        compiler runs are picked up by the next build. The depfile written by
+        the compiler is loaded into the dependency graph afterwards.
+        
+        Args:
+            toolchain: Toolchain used for compilation.
+            build_db: Build database to record the result in.
+            dep_graph: Dependency graph to record included headers in.
+            source_file: Path to source file.
+            obj_file: Path to output object file.
+            command: Compile command, as recorded in the build database.
+            name: Job name for progress output (defaults to the source path).
+            compile_func: Coroutine function producing obj_file from
+                source_file (defaults to toolchain.compile_object_async).
+            flags: Extra compiler flags, as included in command.
+            
+        Returns:
+            Job wrapping the compile call.
+        """
+        compile_func = compile_func or toolchain.compile_object_async
+        
+        async def run() -> bool:
+            stamp = build_db.source_stamp(source_file)
+            started_ns = time.time_ns()
+            if not await compile_func(source_file, obj_file, flags=flags):
+                build_db.forget_object(obj_file)
+                dep_graph.forget(obj_file)
+                return False
+            build_db.record_object(obj_file, source_file, command, toolchain.get_identity(), stamp)
+            dep_graph.update_from_depfile(obj_file, toolchain.get_depfile_path(obj_file), started_ns)
+            return True
+        
+        return Job(name=name or str(source_file), func=run)
+    
+    def _pch_job(
+        self,
+        project: Project,
+        config: Config,
+        toolchain: Toolchain,
+        build_db: BuildDatabase,
+        dep_graph: DependencyGraph,
+        toolchain_id: str,
+        flags: Optional[List[str]] = None,
+    ) -> Optional[Job]:
+        """
+        Configure the precompiled header and create its job if it is stale.
+        
+        The configured header is wrapped in <build_path>/pch/<name>, which
+        is what the toolchain precompiles and what sources are compiled
+        against, so the PCH lands in the build directory rather than next
+        to the header. Like an object, the PCH is rebuilt when the header,
+        anything it includes, its command or the compiler changes.
+        
+        Args:
+            project: Project being built.
+            config: Project configuration.
+            toolchain: Toolchain; its precompiled_header is set.
+            build_db: Build database tracking the PCH.
+            dep_graph: Dependency graph tracking the headers it includes.
+            toolchain_id: Identity of the toolchain.
+            flags: Compiler flags of the build configuration; sources are
+                compiled with the same ones, so the PCH stays usable.
+            
+        Returns:
+            Job building the PCH, or None if it is up to date.
+            
+        Raises:
+            FileNotFoundError: If the configured header does not exist.
+        """
+        header = project.root_dir / config.precompiled_header
+        if not header.is_file():
+            raise FileNotFoundError(f"Precompiled header not found: {header}")
+        
+        wrapper = project.get_build_directory() / "pch" / header.name
+        include = Path(os.path.abspath(header)).as_posix()
+        content = (
+            "// Generated by SugarBuilder (precompiled header). Do not edit.\n"
+            "#ifndef SUGAR_PRECOMPILED_HEADER\n"
+            "#define SUGAR_PRECOMPILED_HEADER\n"
+            f'#include "{include}"\n'
+            "#endif\n"
+        )
+        try:
+            unchanged = wrapper.read_text(encoding="utf-8") == content
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            wrapper.parent.mkdir(parents=True, exist_ok=True)
+            wrapper.write_text(content, encoding="utf-8")
+        
+        toolchain.precompiled_header = wrapper
+        pch_file = toolchain.get_pch_path(wrapper)
+        command = toolchain.get_pch_compile_command(wrapper, flags=flags)
+        if (
+            build_db.is_object_up_to_date(pch_file, wrapper, command, toolchain_id)
+            and dep_graph.is_up_to_date(pch_file)
+        ):
+            return None
+        
+        job = self._compile_job(
+            toolchain,
+            build_db,
+            dep_graph,
+            wrapper,
+            pch_file,
+            command,
+            name=f"{config.precompiled_header} (precompiled header)",
+            flags=flags,
+            compile_func=toolchain.compile_precompiled_header_async,
+        )
+        return job
+    
+    @staticmethod
+    def _plan_unity(
+        project: Project,
+        config: Config,
+        target: Target,
+        source_files: List[Path],
+    ) -> Tuple[List[Tuple[Path, str, List[Path]]], int]:
+        """
+        Replace a target's sources with generated unity files.
+        
+        Args:
+            project: Project being built.
+            config: Project configuration with the unity settings.
+            target: Target whose sources are batched.
+            source_files: The target's sources.
+            
+        Returns:
+            Tuple of ((file to compile, job name, sources it covers)
+            triples, number of batches).
+        """
+        unity = UnityBuilder(
+            project.get_unity_directory(target),
+            config.unity_batch_size,
+            config.unity_exclude,
+        )
+        batches, singles = unity.plan(source_files, project.get_relative_source_path)
+        unity.write(batches)
+        
+        units = [
+            (batch.path, f"{batch.path} ({', '.join(source.name for source in batch.sources)})", batch.sources)
+            for batch in batches
+        ]
+        units += [(source_file, str(source_file), [source_file]) for source_file in singles]
+        return units, len(batches)
+    
+    @staticmethod
+    def _link_job(
+        toolchain: Toolchain,
+        build_db: BuildDatabase,
+        target: Target,
+        target_path: Path,
+        object_files: List[Path],
+        upstream: List[Tuple[Target, Path]],
+        toolchain_id: str,
+        link_status: Dict[str, str],
+        flags: Optional[List[str]] = None,
+    ) -> Job:
+        """
+        Create a scheduler job that links one target.
+        
+        Executables and shared libraries are linked against the artifacts of
+        all their transitive library dependencies, plus the
+        link_dependencies of static ones. Static libraries only archive their
+        own objects; their users pull in the rest. The up-to-date check runs
+        inside the job, after upstream libraries have been rebuilt, and
+        covers their stamps as well as the target's objects.
+        
+        Args:
+            toolchain: Toolchain used for linking.
+            build_db: Build database to check and record the target in.
+            target: Target to link.
+            target_path: Path to the linked output.
+            object_files: The target's object files.
+            upstream: (dependency, artifact to link) pairs in link order.
+            toolchain_id: Identity of the toolchain.
+            link_status: Receives 'linked' or 'up to date' per target name.
+            flags: Linker flags of the build configuration (not used for
+                static libraries).
+            
+        Returns:
+            Job wrapping the link call.
+        """
+        inputs = list(object_files)
+        libraries = list(target.link_dependencies)
+        flags = list(flags or []) if target.project_type != "static" else []
+        if target.project_type != "static":
+            for dep, artifact in upstream:
+                inputs.append(artifact)
+                if dep.project_type == "static":
+                    libraries += [lib for lib in dep.link_dependencies if lib not in libraries]
+        
+        link_signature = {
+            "project_type": target.project_type,
+            "link_dependencies": libraries,
+            "toolchain": toolchain_id,
+            # Archives do not go through the linker
+            "linker": toolchain.linker if target.project_type != "static" else None,
+            "thin": toolchain.thin_archives if target.project_type == "static" else None,
+            "flags": flags,
+        }
+        
+        async def run() -> bool:
+            if build_db.is_target_up_to_date(target_path, inputs, link_signature):
+                link_status[target.name] = "up to date"
+                return True
+            
+            if target.project_type == "exe":
+                success = await toolchain.link_executable_async(
+                    inputs,
+                    target_path,
+                    libraries=libraries,
+                    flags=flags or None,
+                )
+            elif target.project_type == "static":
+                # Replace only the members that changed, if the archive allows
+                changes = build_db.get_archive_changes(target_path, inputs, link_signature)
+                if changes is not None and toolchain.can_update_static_library(inputs + changes[1]):
+                    success = await toolchain.update_static_library_async(target_path, *changes)
+                    if not success:
+                        # The archive may be half updated; recreate it next time
+                        build_db.forget_target(target_path)
+                else:
+                    success = await toolchain.link_static_library_async(inputs, target_path)
+            elif target.project_type == "shared":
+                success = await toolchain.link_shared_library_async(
+                    inputs,
+                    target_path,
+                    libraries=libraries,
+                    flags=flags or None,
+                )
+            else:
+                raise ValueError(f"Unknown project type: {target.project_type}")
+            
+            if not success:
+                return False
+            build_db.record_target(target_path, inputs, link_signature)
+            link_status[target.name] = "linked"
+            return True
+        
+        return Job(name=str(target_path), func=run)
+    
+    @staticmethod
+    def _prefetch_remote(
+        toolchain: Toolchain,
+        pending: List[Tuple[Path, Path]],
+        jobs: int,
+        flags: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Download remote cache entries for all pending objects up front.
+        
+        Cache keys are computed in parallel (one preprocessor run per file)
+        and the entries missing locally are then fetched concurrently over
+        the backend's connection pool. compile_object reuses the keys.
+        
+        Args:
+            toolchain: Toolchain with a remote-backed compile cache.
+            pending: (source file, object file) pairs about to be compiled.
+            jobs: Number of parallel key computations.
+            flags: Extra compiler flags the objects are compiled with.
+        """
+        keys: List[Optional[str]] = []
+        
+        def key_job(source_file: Path, obj_file: Path) -> Job:
+            async def run() -> bool:
+                keys.append(await toolchain.prepare_cache_key_async(source_file, obj_file, flags=flags))
+                return True
+            return Job(name=str(source_file), func=run)
+        
+        key_jobs = [key_job(source_file, obj_file) for source_file, obj_file in pending]
+        for _ in JobScheduler(jobs, keep_going=True).run(key_jobs):
+            pass
+        
+        fetched = toolchain.cache.prefetch(key for key in keys if key is not None)
+        if fetched:
+            print(f"Fetched {fetched} object(s) from remote cache")
+    
+    @staticmethod
+    def _report_cache(cache: CompileCache) -> None:
+        """
+        Print compile cache statistics and evict old entries.
+        
+        Args:
+            cache: Compile cache used by the build.
+        """
+        print(f"\nCompile cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+        if cache.remote is not None:
+            print(f"Remote cache: {cache.remote_hits} download(s), {cache.stores} upload(s)")
+        if cache.stores:
+            evicted = cache.trim()
+            if evicted:
+                print(f"Compile cache: evicted {evicted} old entr{'y' if evicted == 1 else 'ies'}")
+    
     def get_help(self) -> str:
         """Get help text for build command."""
         return """
 build - Compile and link the C++ project
 
-Usage: sugar-builder build [--config <path>]
+Usage: sugar-builder build [--config <path>] [--configuration <name>] [-j <jobs>]
+                           [--keep-going] [--trace <file>] [--time-report[=N]]
+                           [--time-trace] [--pgo <mode>] [--no-daemon] [--watch]
 
 Options:
   --config <path>    Path to sugar.toml (defaults to ./sugar.toml)
+  --configuration <name>
+                     Build configuration, e.g. Debug or Release (defaults
+                     to default_configuration in sugar.toml)
+  -j, --jobs <n>     Number of parallel compile jobs (defaults to the
+                     `jobs` key in sugar.toml, then the CPU count)
+  -k, --keep-going   Keep compiling other files after a failure
+  --time-report[=N]  Print the N (default 10) slowest translation units,
+                     total CPU vs wall time, parallel efficiency and link
+                     times
+  --time-trace       With Clang, compile with -ftime-trace and add the most
+                     expensive headers and template instantiations to the
+                     time report (changes the compile command, so every
+                     file is rebuilt once)
+  --trace <file>     Write a timing trace of configuration loading, source
+                     discovery, every compile and every link as Chrome
+                     trace-event JSON (open in chrome://tracing or
+                     ui.perfetto.dev)
+  --pgo <mode>       "instrument" builds programs that record profiles in
+                     <build_path>/pgo when run; "optimize" builds with the
+                     recorded profiles (see `sugar-builder pgo`)
+  --no-daemon        Build in this process even if a daemon is running
+  --watch            Keep running and rebuild whenever a source file, a
+                     header it includes or sugar.toml changes
 
 Description:
   Builds the C++ project by:
   1. Validating sugar.toml configuration
   2. Creating build and output directories
-  3. Compiling all source files to object files
+  3. Compiling changed source files to object files in parallel
   4. Linking object files into final executable/library
 
+Incremental builds:
+  Build state is kept in <build_path>/.sugar_db.json. An object is rebuilt
+  when its source, an included header, its compile command or the compiler
+  changes; headers are tracked through compiler depfiles (-MMD or
+  /showIncludes) recorded in <build_path>/.sugar_deps.json. The target is
+  relinked only when an object or link_dependencies changed.
+  
+  With change_detection = "hash" in sugar.toml, files are compared by
+  content instead of modification time, so a fresh checkout that resets
+  mtimes does not rebuild anything. Hashes are cached by (inode, mtime,
+  size) in <build_path>/.sugar_hashes.json.
+
+Scheduling:
+  Jobs are started longest-critical-path first, using each file's compile
+  time from previous builds (<build_path>/.sugar_timings.json) or, for new
+  files, an estimate from its size. Slow translation units start early
+  instead of finishing last.
+
+Compile cache:
+  With compile_cache = true, objects are stored in a content-addressed
+  cache (cache_dir, default ~/.cache/sugar-builder/objects) keyed by the
+  preprocessed source, compile command and compiler binary. Hits are
+  restored by hardlink or reflink; the cache is capped at
+  cache_max_size_mb (default 5120) with least-recently-used eviction.
+  
+  Setting remote_cache = "http://<host>:<port>" shares entries between
+  machines through a cache server (see `sugar-builder cache-server`).
+
+Distributed compilation:
+  With compile_workers = ["http://<host>:<port>", ...] (GCC/Clang), each
+  source is preprocessed locally and the preprocessed file is sent with
+  its compile command to the least busy worker (see `sugar-builder
+  worker`), which returns the object. A failed dispatch is retried on
+  another worker; when every worker is busy, down or runs a different
+  compiler version, the file is compiled locally. -j defaults to the
+  local cores plus the workers' slots. PGO and --time-trace builds
+  compile locally.
+
+Unity builds:
+  With unity_build = true, sources in the same directory are compiled in
+  batches of up to unity_batch_size (default 8) through generated files
+  in <build_path>/unity/ that #include them, so shared headers are parsed
+  once per batch. Diagnostics still point at the original files, and
+  editing one source rebuilds only its batch. Sources matching the
+  unity_exclude glob patterns (relative to the project root) are compiled
+  on their own.
+
+Precompiled headers:
+  Setting precompiled_header = "src/pch.h" precompiles that header once
+  (.gch for GCC, .pch for Clang, /Yc for MSVC) into <build_path>/pch/
+  before the parallel compile wave, and every source is compiled with it
+  force-included. The PCH, and with it every object, is rebuilt only when
+  the header, a header it includes, or the compiler changes.
+
+Multiple targets:
+  sugar.toml may declare several [[targets]] tables, each with a name,
+  type, source_paths and optional deps on other library targets. All
+  targets are built in one run: independent targets compile and link
+  concurrently, a target's objects compile while its dependencies are
+  still linking, and only its final link waits for the upstream libraries.
+
+Linker:
+  linker = "auto" (the default) links executables and shared libraries
+  with the fastest linker found when the toolchain is probed (mold, then
+  lld, then gold; GCC and Clang only), run on all cores. Set it to "mold",
+  "lld", "gold" or "bfd" to choose one, or "default" for the compiler's
+  own. Each link's time is printed, and --time-report sums them up.
+
+Build configurations:
+  Debug, Release and RelWithDebInfo are built in for every compiler;
+  [configurations.<name>] tables with compile_flags and link_flags replace
+  them or add more. Each configuration builds into <build_path>/<name> and
+  <output_path>/<name> with its own build state, so switching between
+  them rebuilds nothing that is already built. default_configuration
+  picks the one used without --configuration (else the first table);
+  with neither, builds use no configuration and the directories directly.
+  Below, <build_path> means the configuration's build directory.
+
+Link-time optimization:
+  lto = "thin" or "full" (GCC/Clang) compiles to IR and optimizes across
+  files at link time. Clang's ThinLTO runs its backends on all cores and
+  keeps a cache in <build_path>/lto-cache, so relinking after a small
+  change only redoes the modules it affects; entries unused for a week or
+  beyond 2 GiB are pruned. GCC has no ThinLTO: "thin" is its partitioned
+  LTO on all cores (cached from GCC 15), "full" one partition.
+
+Static libraries:
+  A library whose objects changed since it was last archived is updated
+  in place: only changed members are replaced and members of removed
+  sources deleted (regular archives need unique object file names for
+  this; otherwise the library is recreated). With thin_archives = true
+  (GCC/Clang), libraries only reference the object files in the build
+  directory instead of copying them, so they stay small and fast to
+  update but cannot be shipped without the build tree.
+
+Watch mode:
+  `build --watch` builds, then waits for changes (inotify on Linux,
+  polling elsewhere) and rebuilds after a burst of saves settles. The
+  project stays loaded, and after a successful build only objects that
+  depend on a changed file are checked, so a rebuild does not re-stat the
+  whole tree.
+
+Build daemon:
+  `sugar-builder daemon` keeps the configuration, toolchain probe, source
+  lists and build state of one project in memory and listens on a Unix
+  socket. While it runs, `sugar-builder build` for that project sends the
+  build to the daemon and prints its output, so no-op and small builds
+  skip loading the project. The daemon reloads sugar.toml when it changes
+  and re-lists sources when files are added or removed.
+
 The project type (exe/static/shared) determines linking behavior.
 Dependencies are linked as specified in the configuration.
 """
@@ -0,0 +1,83 @@
+"""Cache server command for SugarBuilder."""
+
+from pathlib import Path
+from typing import Optional
+from .base import Command
+from src.core.cache import user_cache_dir
+from src.core.cache_server import CacheServer
+
+
+class CacheServerCommand(Command):
+    """
+    Cache server command runs the reference shared compile cache.
+
+    Builds point at it with remote_cache = "http://<host>:<port>".
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8877,
+        storage_dir: Optional[str] = None,
+        verbose: bool = False,
+    ):
+        """
+        Initialize cache server command.
+
+        Args:
+            host: Address to listen on.
+            port: Port to listen on.
+            storage_dir: Directory for cache entries (defaults to the
+                per-user cache directory).
+            verbose: Log every request.
+        """
+        super().__init__("cache-server")
+        self.host = host
+        self.port = port
+        self.storage_dir = Path(storage_dir) if storage_dir else user_cache_dir() / "server"
+        self.verbose = verbose
+
+    def execute(self, config_path: Optional[str] = None) -> int:
+        """
+        Serve cache entries until interrupted.
+
+        Args:
+            config_path: Unused; the server does not need a project.
+
+        Returns:
+            0 when stopped with Ctrl+C, 1 if the server cannot start.
+        """
+        try:
+            server = CacheServer((self.host, self.port), self.storage_dir, self.verbose)
+        except OSError as e:
+            print(f"Error: Cannot listen on {self.host}:{self.port}: {e}")
+            return 1
+
+        print(f"Serving compile cache at {server.url}")
+        print(f"Storage directory: {self.storage_dir}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nCache server stopped")
+        finally:
+            server.server_close()
+        return 0
+
+    def get_help(self) -> str:
+        """Get help text for cache-server command."""
+        return """
+cache-server - Run a shared compile cache server
+
+Usage: sugar-builder cache-server [--host <addr>] [--port <n>] [--dir <path>] [--verbose]
+
+Options:
+  --host <addr>    Address to listen on (defaults to 127.0.0.1)
+  --port <n>       Port to listen on (defaults to 8877)
+  --dir <path>     Storage directory (defaults to ~/.cache/sugar-builder/server)
+  --verbose        Log every request
+
+Description:
+  Serves GET/PUT /<key> for compile cache entries. Point builds at it by
+  adding remote_cache = "http://<host>:<port>" to sugar.toml; entries
+  compiled by one machine are then reused by every other.
+"""
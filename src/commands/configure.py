@@ -45,14 +45,31 @@ class ConfigureCommand(Command):
             
             print("Configuration validation successful!")
             print(f"  Project: {config.project_name}")
-            print(f"  Type: {config.project_type}")
+            if len(config.targets) == 1:
+                print(f"  Type: {config.targets[0].project_type}")
             print(f"  Compiler: {config.compiler}")
             print(f"  Platform: {config.platform}")
-            print(f"  Source paths: {', '.join(config.source_paths)}")
+            if len(config.targets) == 1:
+                print(f"  Source paths: {', '.join(config.targets[0].source_paths)}")
             print(f"  Build path: {config.build_path}")
             print(f"  Output path: {config.output_path}")
-            if config.link_dependencies:
-                print(f"  Dependencies: {', '.join(config.link_dependencies)}")
+            print(f"  Configurations: {', '.join(config.configurations)}")
+            if config.default_configuration:
+                print(f"  Default configuration: {config.default_configuration}")
+            if len(config.targets) == 1 and config.targets[0].link_dependencies:
+                print(f"  Dependencies: {', '.join(config.targets[0].link_dependencies)}")
+            if len(config.targets) > 1:
+                print("  Targets:")
+                for target in project.get_targets():
+                    deps = f" (deps: {', '.join(target.deps)})" if target.deps else ""
+                    print(f"    {target.name}: {target.project_type}, {', '.join(target.source_paths)}{deps}")
+            if config.jobs:
+                print(f"  Jobs: {config.jobs}")
+            print(f"  Change detection: {config.change_detection}")
+            if config.compile_cache:
+                print(f"  Compile cache: {config.cache_dir or 'per-user cache directory'}")
+            if config.compile_workers:
+                print(f"  Compile workers: {', '.join(config.compile_workers)}")
             
             return 0
         
@@ -0,0 +1,187 @@
+"""Daemon command for SugarBuilder."""
+
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, List, Optional
+import threading
+import time
+from .base import Command
+from .build import BuildCommand
+from src.core.daemon import daemon_available, daemon_socket_path, send_request
+from src.core.session import BuildSession
+from src.core.watcher import ADDED, REMOVED, RESCAN, create_watcher
+
+
+class _OutputForwarder:
+    """File-like object passing printed text to a callback, one write at a time."""
+
+    def __init__(self, write: Callable[[str], None]):
+        self._write = write
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        with self._lock:
+            self._write(text)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+class DaemonCommand(Command):
+    """
+    Daemon command keeps a project loaded and builds it on request.
+
+    `sugar-builder build` in the same project connects to the daemon's
+    socket and streams back its output, so the configuration, toolchain
+    probe, source listings and build state are not reloaded per build.
+    """
+
+    def __init__(self, stop: bool = False):
+        """
+        Initialize daemon command.
+
+        Args:
+            stop: Stop the running daemon instead of starting one.
+        """
+        super().__init__("daemon")
+        self.stop = stop
+        self.session: Optional[BuildSession] = None
+        self.watcher = None
+        self.config_path = Path("sugar.toml")
+
+    def execute(self, config_path: Optional[str] = None) -> int:
+        """
+        Serve builds until stopped.
+
+        Args:
+            config_path: Optional path to sugar.toml (defaults to ./sugar.toml).
+
+        Returns:
+            0 when stopped, 1 if the daemon cannot start.
+        """
+        if not daemon_available():
+            print("Error: The build daemon needs Unix domain sockets, which this platform lacks")
+            return 1
+
+        self.config_path = Path(config_path or "sugar.toml").resolve()
+        socket_path = daemon_socket_path(self.config_path)
+
+        if self.stop:
+            if send_request(socket_path, {"command": "stop"}) is None:
+                print(f"No daemon running for {self.config_path}")
+                return 1
+            print(f"Daemon stopped for {self.config_path}")
+            return 0
+
+        if send_request(socket_path, {"command": "ping"}) is not None:
+            print(f"Error: A daemon is already running for {self.config_path}")
+            return 1
+
+        # Load the project up front so the first build is fast too
+        loader = BuildCommand()
+        try:
+            self.session = loader.load_session(str(self.config_path))
+            self.session.load_state()
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Error: {e}")
+            return 1
+        self._watch(self.session)
+
+        # A socket file without a listener is left over from a killed daemon
+        try:
+            socket_path.unlink()
+        except OSError:
+            pass
+
+        from src.core.daemon import DaemonServer
+        try:
+            server = DaemonServer(socket_path, self._handle_build)
+        except OSError as e:
+            print(f"Error: Cannot listen on {socket_path}: {e}")
+            return 1
+
+        print(f"Serving builds of {self.config_path}")
+        print(f"Socket: {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if self.watcher is not None:
+                self.watcher.close()
+        print("Daemon stopped")
+        return 0
+
+    def _watch(self, session: BuildSession) -> None:
+        """Watch the source directories of a session's targets."""
+        project = session.project
+        roots = {
+            project.root_dir / src_path
+            for target in project.get_targets()
+            for src_path in target.source_paths
+        }
+        self.watcher = create_watcher(
+            [root for root in roots if root.exists()],
+            skip_dirs=project.get_generated_directories(),
+        )
+
+    def _handle_build(self, args: List[str], cwd: str, write: Callable[[str], None]) -> int:
+        """
+        Run one build for a client.
+
+        Args:
+            args: Client's build arguments.
+            cwd: Client's working directory, for relative output paths.
+            write: Sends output to the client.
+
+        Returns:
+            Build exit code.
+        """
+        started = time.perf_counter()
+        try:
+            cmd = BuildCommand.from_args(args, session=self.session)
+        except ValueError as e:
+            write(f"Error: {e}\n")
+            return 1
+        if cmd.trace_path:
+            cmd.trace_path = str(Path(cwd) / cmd.trace_path)
+
+        # New or deleted files change the source lists; edits are found by
+        # the usual up-to-date checks
+        if self.watcher is not None and self.session is not None:
+            if any(kind in (ADDED, REMOVED, RESCAN) for kind, _ in self.watcher.poll()):
+                self.session.invalidate_sources()
+
+        with redirect_stdout(_OutputForwarder(write)):
+            code = cmd.execute(str(self.config_path))
+
+        if cmd.session is not self.session and cmd.session is not None:
+            # sugar.toml changed: source directories may have too
+            if self.watcher is not None:
+                self.watcher.close()
+            self._watch(cmd.session)
+        self.session = cmd.session
+        print(f"Build finished with exit code {code} in {time.perf_counter() - started:.3f}s")
+        return code
+
+    def get_help(self) -> str:
+        """Get help text for daemon command."""
+        return """
+daemon - Keep the project loaded and serve builds
+
+Usage: sugar-builder daemon [--config <path>] [--stop]
+
+Options:
+  --config <path>    Path to sugar.toml (defaults to ./sugar.toml)
+  --stop             Stop the daemon running for the project
+
+Description:
+  Loads the project once and listens on a Unix domain socket. Later
+  `sugar-builder build` runs in the project hand the build to it and
+  print its output, so the configuration, toolchain probe and source
+  listings are not reloaded per build. New or deleted sources are picked
+  up by watching the source directories. Use `build --no-daemon` to
+  build in-process. Unix only.
+"""
@@ -0,0 +1,117 @@
+"""Profile-guided optimization command for SugarBuilder."""
+
+from typing import Optional
+import subprocess
+from .base import Command
+from .build import BuildCommand
+from src.core.session import BuildSession
+
+
+class PgoCommand(Command):
+    """
+    PGO command runs the whole profile-guided optimization workflow.
+
+    It builds the project instrumented, runs the pgo_training command from
+    sugar.toml to record profiles, then rebuilds it optimized with them.
+    """
+
+    def __init__(
+        self,
+        configuration: Optional[str] = None,
+        jobs: Optional[int] = None,
+        keep_going: bool = False,
+    ):
+        """
+        Initialize PGO command.
+
+        Args:
+            configuration: Build configuration to optimize (defaults to
+                default_configuration in sugar.toml).
+            jobs: Number of parallel compile jobs (overrides sugar.toml).
+            keep_going: Keep compiling remaining files after a failure.
+        """
+        super().__init__("pgo")
+        self.configuration = configuration
+        self.jobs = jobs
+        self.keep_going = keep_going
+
+    def execute(self, config_path: Optional[str] = None) -> int:
+        """
+        Instrument, train and optimize.
+
+        Args:
+            config_path: Optional path to sugar.toml (defaults to ./sugar.toml).
+
+        Returns:
+            0 on success, 1 if a build or the training run failed.
+        """
+        if config_path is None:
+            config_path = "sugar.toml"
+
+        print("PGO step 1/3: instrumented build")
+        build = self._build_command("instrument")
+        code = build.execute(config_path)
+        if code != 0:
+            return code
+
+        session = build.session
+        if not session.config.pgo_training:
+            print("Error: Set pgo_training in sugar.toml to a command that runs the program")
+            return 1
+
+        # Profiles of an older build would not match the new objects
+        project = session.project
+        session.toolchain.clear_profiles()
+        output_dir = str(project.get_output_directory())
+        command = [arg.replace("{output_dir}", output_dir) for arg in session.config.pgo_training]
+
+        print("\nPGO step 2/3: training run")
+        print(f"Running: {' '.join(command)}")
+        try:
+            result = subprocess.run(command, cwd=project.root_dir, check=False)
+        except OSError as e:
+            print(f"Error: Cannot run the training command: {e}")
+            return 1
+        if result.returncode != 0:
+            print(f"Error: The training command exited with code {result.returncode}")
+            return 1
+
+        print("\nPGO step 3/3: optimized build")
+        return self._build_command("optimize", session).execute(config_path)
+
+    def _build_command(self, pgo: str, session: Optional[BuildSession] = None) -> BuildCommand:
+        """Create a build of the configuration in a PGO mode."""
+        return BuildCommand(
+            jobs=self.jobs,
+            keep_going=self.keep_going,
+            session=session,
+            configuration=self.configuration,
+            pgo=pgo,
+        )
+
+    def get_help(self) -> str:
+        """Get help text for pgo command."""
+        return """
+pgo - Build with profile-guided optimization
+
+Usage: sugar-builder pgo [--config <path>] [--configuration <name>] [-j <jobs>] [--keep-going]
+
+Options:
+  --config <path>    Path to sugar.toml (defaults to ./sugar.toml)
+  --configuration <name>
+                     Build configuration to optimize (defaults to
+                     default_configuration in sugar.toml)
+  -j, --jobs <n>     Number of parallel compile jobs
+  -k, --keep-going   Keep compiling other files after a failure
+
+Description:
+  1. Builds the project instrumented (build --pgo instrument)
+  2. Deletes old profiles and runs pgo_training from sugar.toml in the
+     project root; "{output_dir}" in it becomes the output directory
+  3. Merges the profiles (llvm-profdata for Clang) and rebuilds the
+     project optimized with them (build --pgo optimize)
+
+  Profiles are kept in <build_path>/pgo. Later `build --pgo optimize`
+  runs reuse them; they rebuild everything only when the profiles change.
+  GCC and Clang only.
+"""
@@ -0,0 +1,93 @@
+"""Compile worker command for SugarBuilder."""
+
+from typing import List, Optional
+from .base import Command
+from src.core.compile_worker import CompileWorker
+from src.core.scheduler import default_job_count
+
+
+class WorkerCommand(Command):
+    """
+    Worker command compiles preprocessed sources for distributed builds.
+
+    Builds send work to it with compile_workers = ["http://<host>:<port>"].
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8870,
+        slots: Optional[int] = None,
+        compilers: Optional[List[str]] = None,
+        verbose: bool = False,
+    ):
+        """
+        Initialize worker command.
+
+        Args:
+            host: Address to listen on.
+            port: Port to listen on.
+            slots: Concurrent compiles (defaults to the CPU count).
+            compilers: Compiler executables clients may use (defaults to
+                g++ and clang++).
+            verbose: Log every request.
+        """
+        super().__init__("worker")
+        self.host = host
+        self.port = port
+        self.slots = slots or default_job_count()
+        self.compilers = compilers or ["g++", "clang++"]
+        self.verbose = verbose
+
+    def execute(self, config_path: Optional[str] = None) -> int:
+        """
+        Serve compile requests until interrupted.
+
+        Args:
+            config_path: Unused; the worker does not need a project.
+
+        Returns:
+            0 when stopped with Ctrl+C, 1 if the worker cannot start.
+        """
+        try:
+            server = CompileWorker((self.host, self.port), self.slots, self.compilers, verbose=self.verbose)
+        except OSError as e:
+            print(f"Error: Cannot listen on {self.host}:{self.port}: {e}")
+            return 1
+
+        print(f"Compile worker at {server.url} with {server.slots} slot(s)")
+        for compiler in self.compilers:
+            version = server.get_compiler_version(compiler)
+            print(f"  {compiler}: {version or 'not found'}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nCompile worker stopped")
+        finally:
+            server.server_close()
+        return 0
+
+    def get_help(self) -> str:
+        """Get help text for worker command."""
+        return """
+worker - Run a compile worker for distributed builds
+
+Usage: sugar-builder worker [--host <addr>] [--port <n>] [--slots <n>] [--compilers <list>] [--verbose]
+
+Options:
+  --host <addr>        Address to listen on (defaults to 127.0.0.1)
+  --port <n>           Port to listen on (defaults to 8870)
+  --slots <n>          Concurrent compiles (defaults to CPU count)
+  --compilers <list>   Comma-separated compilers to serve (defaults to
+                       g++,clang++)
+  --verbose            Log every request
+
+Description:
+  Compiles preprocessed sources sent by builds that list it in
+  compile_workers = ["http://<host>:<port>"] in sugar.toml, and returns
+  the objects. Requests from a client whose compiler version differs are
+  refused, so the client compiles those files itself.
+
+  The worker has no authentication and runs the compile commands it is
+  sent; listen only on localhost or a trusted network.
+"""
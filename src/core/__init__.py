@@ -1,7 +1,31 @@
 """Core module for SugarBuilder."""
 
-from .config import Config
-from .project import Project
-from .compiler import Compiler
+import importlib
 
-__all__ = ["Config", "Project", "Compiler"]
+# Public names are imported on first use, so lightweight entry points
+# (such as the daemon client) do not load the whole build system
+_EXPORTS = {
+    "Config": ".config",
+    "BuildConfiguration": ".config",
+    "Target": ".targets",
+    "TargetGraph": ".targets",
+    "Project": ".project",
+    "Compiler": ".compiler",
+    "Job": ".scheduler",
+    "JobResult": ".scheduler",
+    "JobScheduler": ".scheduler",
+    "BuildDatabase": ".build_db",
+    "DependencyGraph": ".depfile",
+}
+
+__all__ = ["Config", "BuildConfiguration", "Target", "TargetGraph", "Project", "Compiler", "Job", "JobResult", "JobScheduler", "BuildDatabase", "DependencyGraph"]
+
+
+def __getattr__(name: str):
+    """Import a public name from its module on first access."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
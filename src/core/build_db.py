@@ -0,0 +1,300 @@
+"""Persistent build state for incremental rebuilds."""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+import json
+import os
+import threading
+from .hashing import FileHasher
+
+
+# (mtime in nanoseconds, size in bytes) of a file
+FileStamp = Tuple[int, int]
+
+# Either a FileStamp or a content hash, depending on change detection mode
+SourceStamp = Union[FileStamp, str]
+
+
+def file_stamp(path: Path) -> Optional[FileStamp]:
+    """
+    Get the modification stamp of a file.
+
+    Args:
+        path: Path to the file.
+
+    Returns:
+        (mtime_ns, size) tuple, or None if the file does not exist.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class BuildDatabase:
+    """
+    Records what each build output was produced from.
+
+    For every object file the database stores the source stamp, the exact
+    compile command and the toolchain identity. For every linked target it
+    stores the stamps of its objects and a link signature (project type,
+    libraries, toolchain). An output is up to date when all recorded inputs
+    still match. The database is a single JSON file in the build directory.
+
+    With a FileHasher, sources are identified by content hash instead of
+    (mtime, size), so touching a file without changing it is not a change.
+    """
+
+    FILENAME = ".sugar_db.json"
+    VERSION = 1
+
+    def __init__(self, build_dir: Path, hasher: Optional[FileHasher] = None):
+        """
+        Initialize an empty build database.
+
+        Args:
+            build_dir: Build directory the database belongs to.
+            hasher: Optional content hasher for hash-based change detection.
+        """
+        self.path = Path(build_dir) / self.FILENAME
+        self.hasher = hasher
+        self._objects: Dict[str, Dict[str, Any]] = {}
+        self._targets: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    @classmethod
+    def load(cls, build_dir: Path, hasher: Optional[FileHasher] = None) -> "BuildDatabase":
+        """
+        Load the build database from a build directory.
+
+        A missing, unreadable or outdated database yields an empty one,
+        which simply makes every output out of date.
+
+        Args:
+            build_dir: Build directory containing the database.
+            hasher: Optional content hasher for hash-based change detection.
+
+        Returns:
+            BuildDatabase: Loaded database.
+        """
+        db = cls(build_dir, hasher)
+        try:
+            with open(db.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return db
+
+        if not isinstance(data, dict) or data.get("version") != cls.VERSION:
+            return db
+
+        db._objects = data.get("objects", {})
+        db._targets = data.get("targets", {})
+        return db
+
+    def save(self) -> None:
+        """Write the database to disk if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": self.VERSION,
+                "objects": self._objects,
+                "targets": self._targets,
+            }
+            self._dirty = False
+
+        # Write atomically so an interrupted build never leaves a torn file
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def source_stamp(self, source_file: Path) -> Optional[SourceStamp]:
+        """
+        Get the stamp used to detect changes to a source file.
+
+        Args:
+            source_file: Path to the source file.
+
+        Returns:
+            Content hash in hash mode, (mtime_ns, size) otherwise, or None
+            if the file does not exist.
+        """
+        if self.hasher is not None:
+            return self.hasher.hash(source_file)
+        return file_stamp(source_file)
+
+    def is_object_up_to_date(
+        self,
+        object_file: Path,
+        source_file: Path,
+        command: List[str],
+        toolchain_id: str,
+    ) -> bool:
+        """
+        Check whether an object file can be reused.
+
+        Args:
+            object_file: Path to the object file.
+            source_file: Path to its source file.
+            command: Compile command that would produce it now.
+            toolchain_id: Identity of the current toolchain.
+
+        Returns:
+            True if the object exists and all recorded inputs match.
+        """
+        entry = self._objects.get(str(object_file))
+        if entry is None:
+            return False
+        if entry["toolchain"] != toolchain_id or entry["command"] != command:
+            return False
+        stamp = self.source_stamp(source_file)
+        if stamp is None or self._encode_stamp(stamp) != entry["source_stamp"]:
+            return False
+        return object_file.exists()
+
+    def record_object(
+        self,
+        object_file: Path,
+        source_file: Path,
+        command: List[str],
+        toolchain_id: str,
+        source_stamp: Optional[SourceStamp],
+    ) -> None:
+        """
+        Record a successfully compiled object file.
+
+        Args:
+            object_file: Path to the object file.
+            source_file: Path to its source file.
+            command: Compile command that produced it.
+            toolchain_id: Identity of the toolchain that produced it.
+            source_stamp: Source stamp taken before compilation started.
+        """
+        key = str(object_file)
+        with self._lock:
+            if source_stamp is None:
+                self._objects.pop(key, None)
+            else:
+                self._objects[key] = {
+                    "source": str(source_file),
+                    "source_stamp": self._encode_stamp(source_stamp),
+                    "command": command,
+                    "toolchain": toolchain_id,
+                }
+            self._dirty = True
+
+    def forget_object(self, object_file: Path) -> None:
+        """
+        Drop the record for an object file (e.g. after a failed compile).
+
+        Args:
+            object_file: Path to the object file.
+        """
+        with self._lock:
+            if self._objects.pop(str(object_file), None) is not None:
+                self._dirty = True
+
+    def is_target_up_to_date(
+        self,
+        target_file: Path,
+        object_files: List[Path],
+        signature: Dict[str, Any],
+    ) -> bool:
+        """
+        Check whether a linked target can be reused.
+
+        Args:
+            target_file: Path to the linked target.
+            object_files: Object files the target is linked from.
+            signature: Link settings (project type, libraries, toolchain).
+
+        Returns:
+            True if the target exists and no object or setting changed.
+        """
+        entry = self._targets.get(str(target_file))
+        if entry is None or entry["signature"] != signature:
+            return False
+        if entry["objects"] != self._object_stamps(object_files):
+            return False
+        return target_file.exists()
+
+    def forget_target(self, target_file: Path) -> None:
+        """
+        Drop the record for a linked target (e.g. after a failed update).
+
+        Args:
+            target_file: Path to the linked target.
+        """
+        with self._lock:
+            if self._targets.pop(str(target_file), None) is not None:
+                self._dirty = True
+
+    def get_archive_changes(
+        self,
+        target_file: Path,
+        object_files: List[Path],
+        signature: Dict[str, Any],
+    ) -> Optional[Tuple[List[Path], List[Path]]]:
+        """
+        Find which members of a static library need updating.
+
+        Args:
+            target_file: Path to the static library.
+            object_files: Object files the library should now contain.
+            signature: Link settings (project type, libraries, toolchain).
+
+        Returns:
+            (changed or new objects, objects no longer in the library), or
+            None if the library must be created from scratch (missing, or
+            built with different settings).
+        """
+        entry = self._targets.get(str(target_file))
+        if entry is None or entry["signature"] != signature or not target_file.exists():
+            return None
+        recorded = {stamp[0]: stamp for stamp in entry["objects"]}
+        changed = [
+            obj for obj, stamp in zip(object_files, self._object_stamps(object_files))
+            if recorded.get(str(obj)) != stamp
+        ]
+        current = {str(obj) for obj in object_files}
+        removed = [Path(path) for path in recorded if path not in current]
+        return changed, removed
+
+    def record_target(
+        self,
+        target_file: Path,
+        object_files: List[Path],
+        signature: Dict[str, Any],
+    ) -> None:
+        """
+        Record a successfully linked target.
+
+        Args:
+            target_file: Path to the linked target.
+            object_files: Object files the target was linked from.
+            signature: Link settings (project type, libraries, toolchain).
+        """
+        with self._lock:
+            self._targets[str(target_file)] = {
+                "signature": signature,
+                "objects": self._object_stamps(object_files),
+            }
+            self._dirty = True
+
+    @staticmethod
+    def _encode_stamp(stamp: SourceStamp) -> Any:
+        """Convert a stamp to its JSON form (tuples become lists)."""
+        return stamp if isinstance(stamp, str) else list(stamp)
+
+    @staticmethod
+    def _object_stamps(object_files: List[Path]) -> List[List[Any]]:
+        """Get [path, mtime_ns, size] entries for a list of object files."""
+        stamps = []
+        for obj in object_files:
+            stamp = file_stamp(obj)
+            stamps.append([str(obj)] + (list(stamp) if stamp else [None, None]))
+        return stamps
@@ -0,0 +1,318 @@
+"""Content-addressed compilation cache."""
+
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from .remote_cache import CacheBackend, pack_entry, unpack_entry
+
+
+# Linux ioctl for copy-on-write file clones (btrfs, XFS)
+FICLONE = 0x40049409
+
+
+def user_cache_dir() -> Path:
+    """
+    Get the per-user cache directory for SugarBuilder.
+
+    Honors SUGAR_CACHE_DIR, then LOCALAPPDATA on Windows, XDG_CACHE_HOME or
+    ~/Library/Caches on macOS, and ~/.cache elsewhere.
+
+    Returns:
+        Path to the SugarBuilder cache directory (not created).
+    """
+    override = os.environ.get("SUGAR_CACHE_DIR")
+    if override:
+        return Path(override)
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = str(Path.home() / "Library" / "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "sugar-builder"
+
+
+def clone_file(src: Path, dst: Path) -> str:
+    """
+    Materialize src at dst without copying data when possible.
+
+    Tries a hardlink, then a reflink (FICLONE), then falls back to a copy.
+    Any existing dst is replaced.
+
+    Args:
+        src: Existing file.
+        dst: Destination path.
+
+    Returns:
+        Method used: 'hardlink', 'reflink' or 'copy'.
+    """
+    try:
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        pass
+
+    if sys.platform.startswith("linux"):
+        import fcntl
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return "reflink"
+        except OSError:
+            pass
+
+    shutil.copyfile(src, dst)
+    return "copy"
+
+
+class CompileCache:
+    """
+    Local content-addressed store of compiler outputs.
+
+    Each entry is a directory named after its key holding the object file
+    and its depfile. Entries are written to a temporary directory and renamed
+    into place, so concurrent builds never see partial entries. Restores use
+    hardlinks (or reflinks) instead of copies; callers must unlink an object
+    before recompiling it so the cached copy is never overwritten in place.
+    The least recently used entries are evicted once the cache exceeds its
+    size cap.
+
+    An optional remote backend is consulted on local misses and receives
+    every newly stored entry, so entries built on one machine are reused by
+    all others. Remote failures only ever turn into misses.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_size: int,
+        remote: Optional[CacheBackend] = None,
+    ):
+        """
+        Initialize compile cache.
+
+        Args:
+            cache_dir: Root directory of the cache.
+            max_size: Size cap in bytes for all entries.
+            remote: Optional shared backend behind the local cache.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.remote = remote
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Zero the hit, miss and store counters (once per build)."""
+        self.hits = 0
+        self.remote_hits = 0
+        self.misses = 0
+        self.stores = 0
+        # Keys this build's prefetch asked the remote backend for and did
+        # not get; another machine may upload them before the next build
+        self._remote_misses: Set[str] = set()
+
+    @staticmethod
+    def make_key(parts: Iterable[bytes | str]) -> str:
+        """
+        Compute a cache key from the inputs of a compilation.
+
+        Args:
+            parts: Inputs that fully determine the output (compiler identity,
+                command line, preprocessed source, ...).
+
+        Returns:
+            Hex digest identifying the entry.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        for part in parts:
+            data = part.encode("utf-8", "surrogateescape") if isinstance(part, str) else part
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data)
+        return digest.hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        """Get the directory of a cache entry."""
+        return self.cache_dir / key[:2] / key
+
+    def has_entry(self, key: str) -> bool:
+        """
+        Check whether an entry is present in the local cache.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            True if the entry exists locally.
+        """
+        return self._entry_dir(key).is_dir()
+
+    def restore(self, key: str, outputs: Dict[str, Path]) -> bool:
+        """
+        Restore a cached entry into the build tree.
+
+        Falls back to the remote backend on a local miss, unless prefetch()
+        already found the entry missing there.
+
+        Args:
+            key: Cache key.
+            outputs: Mapping of entry file name to destination path.
+
+        Returns:
+            True on a hit (all outputs restored), False on a miss.
+        """
+        remote_hit = False
+        if not self.has_entry(key) and self.remote is not None and key not in self._remote_misses:
+            blob = self.remote.get(key)
+            remote_hit = blob is not None and self._store_blob(key, blob)
+
+        entry = self._entry_dir(key)
+        try:
+            for name, dest in outputs.items():
+                clone_file(entry / name, dest)
+            # Bump the entry's mtime for LRU eviction
+            os.utime(entry)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return False
+
+        with self._lock:
+            self.hits += 1
+            if remote_hit:
+                self.remote_hits += 1
+        return True
+
+    def prefetch(self, keys: Iterable[str]) -> int:
+        """
+        Download entries missing locally from the remote backend in parallel.
+
+        Args:
+            keys: Cache keys that are about to be restored.
+
+        Returns:
+            Number of entries downloaded.
+        """
+        if self.remote is None:
+            return 0
+        missing = [key for key in set(keys) if not self.has_entry(key)]
+        fetched = 0
+        found = self.remote.get_many(missing)
+        for key, blob in found.items():
+            if self._store_blob(key, blob):
+                fetched += 1
+        # restore() does not ask again for these during this build
+        self._remote_misses = set(missing) - found.keys()
+        with self._lock:
+            self.remote_hits += fetched
+        return fetched
+
+    def store(self, key: str, outputs: Dict[str, Path]) -> None:
+        """
+        Add compiler outputs to the cache (and the remote backend, if any).
+
+        Args:
+            key: Cache key.
+            outputs: Mapping of entry file name to file to store.
+        """
+        def fill(tmp_dir: Path) -> None:
+            for name, src in outputs.items():
+                # Copy rather than link, so later edits in the build tree
+                # can never reach the cache
+                shutil.copyfile(src, tmp_dir / name)
+
+        if not self._write_entry(key, fill):
+            return
+
+        with self._lock:
+            self.stores += 1
+
+        if self.remote is not None:
+            try:
+                files = {name: Path(src).read_bytes() for name, src in outputs.items()}
+            except OSError:
+                return
+            self.remote.put(key, pack_entry(files))
+
+    def _store_blob(self, key: str, blob: bytes) -> bool:
+        """Unpack a remote entry into the local cache."""
+        try:
+            files = unpack_entry(blob)
+        except ValueError:
+            return False
+
+        def fill(tmp_dir: Path) -> None:
+            for name, data in files.items():
+                (tmp_dir / Path(name).name).write_bytes(data)
+
+        self._write_entry(key, fill)
+        return self.has_entry(key)
+
+    def _write_entry(self, key: str, fill: Callable[[Path], None]) -> bool:
+        """
+        Create an entry atomically.
+
+        Args:
+            key: Cache key.
+            fill: Callback that writes the entry files into a temp directory.
+
+        Returns:
+            True if this call created the entry.
+        """
+        entry = self._entry_dir(key)
+        if entry.exists():
+            return False
+
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".tmp-", dir=entry.parent))
+        try:
+            fill(tmp_dir)
+            os.rename(tmp_dir, entry)
+        except OSError:
+            # Another process stored the same entry first, or a write failed
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+        return True
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """List (mtime, size, path) for every cache entry."""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for bucket in os.scandir(self.cache_dir):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.startswith(".tmp-") or not entry.is_dir():
+                    continue
+                size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                entries.append((entry.stat().st_mtime, size, Path(entry.path)))
+        return entries
+
+    def trim(self) -> int:
+        """
+        Evict least recently used entries until the cache fits its size cap.
+
+        Returns:
+            Number of entries evicted.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            evicted += 1
+        return evicted
@@ -0,0 +1,153 @@
+"""Reference HTTP server for the shared compile cache."""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional, Tuple
+import os
+import re
+import tempfile
+
+
+# Cache keys are lowercase hex digests
+KEY_PATTERN = re.compile(r"^[0-9a-f]{16,128}$")
+
+
+class CacheRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves GET/HEAD/PUT /<key> against the server's storage directory.
+
+    Uses HTTP/1.1 keep-alive so clients can pool connections.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server: "CacheServer"
+
+    def _key_path(self) -> Optional[Path]:
+        """Map the request path to a storage path, or None if invalid."""
+        key = self.path.rstrip("/").rsplit("/", 1)[-1]
+        if not KEY_PATTERN.match(key):
+            return None
+        return self.server.storage_dir / key[:2] / key
+
+    def _reply(self, status: int, body: bytes = b"", length: Optional[int] = None) -> None:
+        """Send a response with an explicit Content-Length (length for HEAD)."""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(body) if length is None else length))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _read_body(self) -> Optional[bytes]:
+        """
+        Read the request body, or reply with an error and return None.
+
+        The body length must be given and at most the server's
+        max_entry_size; the connection is closed after an error, as the
+        body was not read.
+        """
+        value = self.headers.get("Content-Length")
+        if value is None:
+            status = 411
+        elif not value.strip().isdigit():
+            status = 400
+        elif int(value) > self.server.max_entry_size:
+            status = 413
+        else:
+            return self.rfile.read(int(value))
+        self.close_connection = True
+        self._reply(status)
+        return None
+
+    def do_GET(self) -> None:
+        """Return a stored entry, or 404."""
+        path = self._key_path()
+        if path is None:
+            self._reply(400)
+            return
+        try:
+            body = path.read_bytes()
+        except OSError:
+            self._reply(404)
+            return
+        self._reply(200, body)
+
+    def do_HEAD(self) -> None:
+        """Report whether an entry is stored, and its size."""
+        path = self._key_path()
+        if path is None:
+            self._reply(400)
+            return
+        try:
+            size = path.stat().st_size
+        except OSError:
+            self._reply(404)
+            return
+        self._reply(200, length=size)
+
+    def do_PUT(self) -> None:
+        """Store an entry; the first upload of a key wins."""
+        path = self._key_path()
+        body = self._read_body()
+        if body is None:
+            return
+        if path is None:
+            self._reply(400)
+            return
+        if path.exists():
+            self._reply(200)
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=".tmp-", dir=path.parent)
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp_name, path)
+        self._reply(201)
+
+    def log_message(self, format: str, *args) -> None:
+        """Log requests only when the server is verbose."""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class CacheServer(ThreadingHTTPServer):
+    """
+    Minimal shared cache server for local testing and small teams.
+
+    Stores one file per entry under storage_dir. There is no eviction or
+    authentication; it is meant to run on localhost or a trusted network.
+    """
+
+    daemon_threads = True
+
+    # Largest entry accepted by PUT; bodies are held in memory
+    MAX_ENTRY_SIZE = 512 * 1024 * 1024
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        storage_dir: Path,
+        verbose: bool = False,
+        max_entry_size: int = MAX_ENTRY_SIZE,
+    ):
+        """
+        Initialize cache server.
+
+        Args:
+            address: (host, port) to listen on; port 0 picks a free port.
+            storage_dir: Directory holding cache entries.
+            verbose: Log every request to stderr.
+            max_entry_size: Largest entry in bytes a client may upload.
+        """
+        self.storage_dir = Path(storage_dir)
+        self.max_entry_size = max_entry_size
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.verbose = verbose
+        super().__init__(address, CacheRequestHandler)
+
+    @property
+    def url(self) -> str:
+        """Base URL clients should use for this server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
@@ -0,0 +1,257 @@
+"""HTTP server compiling preprocessed translation units for other hosts."""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+
+# Bumped when requests or replies change incompatibly
+PROTOCOL_VERSION = 1
+
+# Placeholders in the shipped arguments for the files on the worker
+INPUT_PLACEHOLDER = "{input}"
+OUTPUT_PLACEHOLDER = "{output}"
+
+
+class WorkerRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves GET /status and POST /compile.
+
+    A compile request body is one JSON line, {"compiler", "version",
+    "args", "cwd"}, followed by the preprocessed source. The reply to a
+    compile that ran is 200 with one JSON line, {"exit", "output"},
+    followed by the object file when the exit code is 0. Other statuses
+    mean the worker did not compile: 503 when every slot is busy, 409 when
+    its compiler version differs, 400 for a bad request.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server: "CompileWorker"
+
+    def _reply(self, status: int, body: bytes = b"", content_type: str = "application/octet-stream") -> None:
+        """Send a response with an explicit Content-Length."""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _reply_json(self, status: int, message: dict) -> None:
+        """Send a JSON response."""
+        self._reply(status, json.dumps(message).encode("utf-8"), "application/json")
+
+    def do_GET(self) -> None:
+        """Report the worker's slots, running compiles and load."""
+        if self.path.rstrip("/") != "/status":
+            self._reply_json(404, {"error": "Not found"})
+            return
+        self._reply_json(200, self.server.get_status())
+
+    def do_POST(self) -> None:
+        """Compile a preprocessed translation unit."""
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.path.rstrip("/") != "/compile":
+            self._reply_json(404, {"error": "Not found"})
+            return
+
+        header, _, source = body.partition(b"\n")
+        try:
+            request = json.loads(header)
+        except ValueError:
+            request = None
+        if (
+            not isinstance(request, dict)
+            or not isinstance(request.get("compiler"), str)
+            or not isinstance(request.get("args"), list)
+            or not all(isinstance(arg, str) for arg in request["args"])
+        ):
+            self._reply_json(400, {"error": "Malformed compile request"})
+            return
+
+        compiler = request["compiler"]
+        if compiler not in self.server.compilers:
+            self._reply_json(400, {"error": f"Compiler {compiler} is not served here"})
+            return
+        version = self.server.get_compiler_version(compiler)
+        if version is None or version != request.get("version"):
+            self._reply_json(409, {"error": f"{compiler} here is version {version or 'unknown'}"})
+            return
+
+        if not self.server.acquire_slot():
+            self._reply_json(503, {"error": "All slots are busy"})
+            return
+        try:
+            exit_code, output, object_data = self.server.compile(
+                compiler, request["args"], source, request.get("cwd")
+            )
+        except OSError as e:
+            self._reply_json(500, {"error": str(e)})
+            return
+        finally:
+            self.server.release_slot()
+
+        result = json.dumps({"exit": exit_code, "output": output}).encode("utf-8")
+        self._reply(200, result + b"\n" + object_data)
+
+    def log_message(self, format: str, *args) -> None:
+        """Log requests only when the worker is verbose."""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class CompileWorker(ThreadingHTTPServer):
+    """
+    Compile worker for distributed builds.
+
+    Clients preprocess locally and send the translation unit with its
+    compile arguments; the worker compiles it in a temporary directory and
+    returns the object. At most `slots` compiles run at once. There is no
+    authentication: compile arguments can run arbitrary code through the
+    compiler, so the worker is meant for localhost or a trusted network.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        slots: int,
+        compilers: List[str],
+        timeout: float = 600.0,
+        verbose: bool = False,
+    ):
+        """
+        Initialize worker.
+
+        Args:
+            address: (host, port) to listen on; port 0 picks a free port.
+            slots: Maximum number of concurrent compiles.
+            compilers: Compiler executables clients may use (e.g. g++).
+            timeout: Seconds a single compile may take.
+            verbose: Log every request to stderr.
+        """
+        self.slots = max(1, slots)
+        self.compilers = list(compilers)
+        self.timeout = timeout
+        self.verbose = verbose
+        self._running = 0
+        self._lock = threading.Lock()
+        self._versions: Dict[str, Optional[str]] = {}
+        super().__init__(address, WorkerRequestHandler)
+
+    @property
+    def url(self) -> str:
+        """Base URL clients should use for this worker."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def acquire_slot(self) -> bool:
+        """Claim a compile slot, or return False if all are busy."""
+        with self._lock:
+            if self._running >= self.slots:
+                return False
+            self._running += 1
+            return True
+
+    def release_slot(self) -> None:
+        """Give back a compile slot."""
+        with self._lock:
+            self._running -= 1
+
+    def get_status(self) -> dict:
+        """Get the status reported to clients choosing a worker."""
+        with self._lock:
+            running = self._running
+        load = os.getloadavg()[0] if hasattr(os, "getloadavg") else None
+        return {
+            "protocol": PROTOCOL_VERSION,
+            "slots": self.slots,
+            "running": running,
+            "load": load,
+            "compilers": self.compilers,
+        }
+
+    def get_compiler_version(self, compiler: str) -> Optional[str]:
+        """
+        Get the version of a served compiler, asked once and remembered.
+
+        Clients send their own compiler's version and are turned away on a
+        mismatch, so objects never come from a different compiler.
+
+        Args:
+            compiler: Compiler executable.
+
+        Returns:
+            Version string, or None if the compiler cannot be run.
+        """
+        with self._lock:
+            if compiler in self._versions:
+                return self._versions[compiler]
+        # Imported here so the client side does not load the toolchains
+        from src.toolchains.probe import find_version, run_probe
+        path = shutil.which(compiler)
+        version = find_version(run_probe([path, "--version"]).split("\n", 1)[0]) if path else ""
+        with self._lock:
+            self._versions[compiler] = version or None
+        return version or None
+
+    def compile(
+        self,
+        compiler: str,
+        args: List[str],
+        source: bytes,
+        cwd: Optional[str] = None,
+    ) -> Tuple[int, str, bytes]:
+        """
+        Compile a preprocessed translation unit in a temporary directory.
+
+        Args:
+            compiler: Compiler executable (one of self.compilers).
+            args: Arguments with INPUT_PLACEHOLDER and OUTPUT_PLACEHOLDER.
+            source: Preprocessed source.
+            cwd: Client's working directory; debug info is mapped back to it.
+
+        Returns:
+            Tuple of (exit code, compiler output, object file contents).
+
+        Raises:
+            OSError: If the compiler cannot be started.
+        """
+        with tempfile.TemporaryDirectory(prefix="sugar-worker-") as tmp_dir:
+            input_file = os.path.join(tmp_dir, "tu.ii")
+            output_file = os.path.join(tmp_dir, "tu.o")
+            with open(input_file, "wb") as f:
+                f.write(source)
+
+            cmd = [shutil.which(compiler) or compiler]
+            cmd += [
+                arg.replace(INPUT_PLACEHOLDER, input_file).replace(OUTPUT_PLACEHOLDER, output_file)
+                for arg in args
+            ]
+            if cwd:
+                cmd.append(f"-fdebug-prefix-map={tmp_dir}={cwd}")
+
+            try:
+                result = subprocess.run(
+                    cmd,
+                    cwd=tmp_dir,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    timeout=self.timeout,
+                    check=False,
+                )
+            except subprocess.TimeoutExpired:
+                return 1, f"{compiler} timed out after {self.timeout:.0f}s\n", b""
+            output = result.stdout.decode("utf-8", errors="replace")
+            if result.returncode != 0:
+                return result.returncode, output, b""
+            with open(output_file, "rb") as f:
+                return 0, output, f.read()
@@ -1,9 +1,11 @@
 """Configuration loader and validator for SugarBuilder."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
+import re
 import sys
+from .targets import TARGET_TYPES, Target, TargetGraph
 
 # tomllib available in Python 3.11+, use tomli as fallback
 if sys.version_info >= (3, 11):
@@ -18,6 +20,44 @@ else:
         )
 
 
+# Built-in configurations per compiler as (compile flags, link flags);
+# [configurations.<name>] tables in sugar.toml replace or add to them
+CONFIGURATION_PRESETS: Dict[str, Dict[str, Tuple[List[str], List[str]]]] = {
+    "GCC": {
+        "Debug": (["-O0", "-g"], []),
+        "Release": (["-O2", "-DNDEBUG"], []),
+        "RelWithDebInfo": (["-O2", "-g", "-DNDEBUG"], []),
+    },
+    "Clang": {
+        "Debug": (["-O0", "-g"], []),
+        "Release": (["-O2", "-DNDEBUG"], []),
+        "RelWithDebInfo": (["-O2", "-g", "-DNDEBUG"], []),
+    },
+    "MSVC": {
+        "Debug": (["/Od", "/Z7"], ["/DEBUG"]),
+        "Release": (["/O2", "/DNDEBUG"], []),
+        "RelWithDebInfo": (["/O2", "/Z7", "/DNDEBUG"], ["/DEBUG"]),
+    },
+}
+
+# Configuration names become directory names
+CONFIGURATION_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_][A-Za-z0-9_.-]*$")
+
+
+@dataclass
+class BuildConfiguration:
+    """
+    Named build variant (Debug, Release, ...).
+    
+    Each configuration adds its flags to every compile and link and builds
+    into its own object tree, build database and output directory.
+    """
+    
+    name: str
+    compile_flags: List[str] = field(default_factory=list)
+    link_flags: List[str] = field(default_factory=list)
+
+
 @dataclass
 class Config:
     """
@@ -34,6 +74,27 @@ class Config:
     build_path: str
     output_path: str
     link_dependencies: List[str]
+    jobs: Optional[int] = None  # Parallel compile jobs (defaults to CPU count)
+    change_detection: str = "timestamp"  # timestamp, hash
+    compile_cache: bool = False  # Reuse objects from the compile cache
+    cache_dir: Optional[str] = None  # Defaults to the per-user cache directory
+    cache_max_size_mb: int = 5120
+    remote_cache: Optional[str] = None  # URL of a shared cache server
+    compile_workers: List[str] = field(default_factory=list)  # URLs of compile workers
+    recursive: bool = True  # Search source_paths recursively
+    source_include: List[str] = field(default_factory=list)  # Glob patterns
+    source_exclude: List[str] = field(default_factory=list)  # Glob patterns
+    unity_build: bool = False  # Compile sources in batched unity files
+    unity_batch_size: int = 8  # Maximum sources per unity file
+    unity_exclude: List[str] = field(default_factory=list)  # Sources compiled on their own
+    precompiled_header: Optional[str] = None  # Header precompiled once and used by every source
+    linker: str = "auto"  # auto, default, bfd, gold, lld, mold
+    thin_archives: bool = False  # Static libraries reference objects instead of copying them
+    lto: Optional[str] = None  # thin, full (GCC/Clang)
+    pgo_training: List[str] = field(default_factory=list)  # Command the pgo command trains with
+    configurations: Dict[str, BuildConfiguration] = field(default_factory=dict)  # Presets and [configurations.*]
+    default_configuration: Optional[str] = None  # None builds without a configuration
+    targets: List[Target] = field(default_factory=list)  # Always at least one
     
     @classmethod
     def load(cls, config_path: str | Path) -> "Config":
@@ -76,20 +137,22 @@ class Config:
         """
         required_fields = [
             "project_name",
-            "project_type",
             "compiler",
             "platform",
-            "source_paths",
             "build_path",
             "output_path",
         ]
+        # With [[targets]], each target carries its own type and sources
+        multi_target = "targets" in data
+        if not multi_target:
+            required_fields[1:1] = ["project_type", "source_paths"]
         
         missing = [f for f in required_fields if f not in data]
         if missing:
             raise ValueError(f"Missing required configuration fields: {', '.join(missing)}")
         
         # Validate project_type
-        if data["project_type"] not in ["exe", "static", "shared"]:
+        if "project_type" in data and data["project_type"] not in TARGET_TYPES:
             raise ValueError(
                 f"Invalid project_type: {data['project_type']}. "
                 "Must be 'exe', 'static', or 'shared'."
@@ -110,7 +173,7 @@ class Config:
             )
         
         # Ensure source_paths is a list
-        if not isinstance(data["source_paths"], list):
+        if not isinstance(data.get("source_paths", []), list):
             raise ValueError("source_paths must be a list of paths.")
         
         # link_dependencies is optional
@@ -118,15 +181,299 @@ class Config:
         if not isinstance(link_deps, list):
             raise ValueError("link_dependencies must be a list.")
         
+        # jobs is optional
+        jobs = data.get("jobs")
+        if jobs is not None and (
+            not isinstance(jobs, int) or isinstance(jobs, bool) or jobs < 1
+        ):
+            raise ValueError("jobs must be a positive integer.")
+        
+        # change_detection is optional
+        change_detection = data.get("change_detection", "timestamp")
+        if change_detection not in ["timestamp", "hash"]:
+            raise ValueError(
+                f"Invalid change_detection: {change_detection}. "
+                "Must be 'timestamp' or 'hash'."
+            )
+        
+        # Compile cache settings are optional
+        compile_cache = data.get("compile_cache", False)
+        if not isinstance(compile_cache, bool):
+            raise ValueError("compile_cache must be true or false.")
+        
+        cache_dir = data.get("cache_dir")
+        if cache_dir is not None and not isinstance(cache_dir, str):
+            raise ValueError("cache_dir must be a path string.")
+        
+        cache_max_size_mb = data.get("cache_max_size_mb", 5120)
+        if (
+            not isinstance(cache_max_size_mb, int)
+            or isinstance(cache_max_size_mb, bool)
+            or cache_max_size_mb < 1
+        ):
+            raise ValueError("cache_max_size_mb must be a positive integer.")
+        
+        remote_cache = data.get("remote_cache")
+        if remote_cache is not None and (
+            not isinstance(remote_cache, str)
+            or not remote_cache.startswith(("http://", "https://"))
+        ):
+            raise ValueError("remote_cache must be an http:// or https:// URL.")
+        
+        # Distributed compilation is optional
+        compile_workers = data.get("compile_workers", [])
+        if not isinstance(compile_workers, list) or not all(
+            isinstance(url, str) and url.startswith("http://") for url in compile_workers
+        ):
+            raise ValueError("compile_workers must be a list of http:// URLs.")
+        
+        # Source discovery settings are optional
+        recursive = data.get("recursive", True)
+        if not isinstance(recursive, bool):
+            raise ValueError("recursive must be true or false.")
+        
+        for key in ["source_include", "source_exclude"]:
+            patterns = data.get(key, [])
+            if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+                raise ValueError(f"{key} must be a list of glob patterns.")
+        
+        # Unity build settings are optional
+        unity_build = data.get("unity_build", False)
+        if not isinstance(unity_build, bool):
+            raise ValueError("unity_build must be true or false.")
+        
+        unity_batch_size = data.get("unity_batch_size", 8)
+        if (
+            not isinstance(unity_batch_size, int)
+            or isinstance(unity_batch_size, bool)
+            or unity_batch_size < 2
+        ):
+            raise ValueError("unity_batch_size must be an integer of at least 2.")
+        
+        unity_exclude = data.get("unity_exclude", [])
+        if not isinstance(unity_exclude, list) or not all(isinstance(p, str) for p in unity_exclude):
+            raise ValueError("unity_exclude must be a list of glob patterns.")
+        
+        precompiled_header = data.get("precompiled_header")
+        if precompiled_header is not None and (
+            not isinstance(precompiled_header, str) or not precompiled_header.strip()
+        ):
+            raise ValueError("precompiled_header must be a header path.")
+        
+        # linker is optional; auto picks the fastest one installed
+        linker = data.get("linker", "auto")
+        if linker not in ["auto", "default", "bfd", "gold", "lld", "mold"]:
+            raise ValueError(
+                f"Invalid linker: {linker}. "
+                "Must be 'auto', 'default', 'bfd', 'gold', 'lld', or 'mold'."
+            )
+        
+        thin_archives = data.get("thin_archives", False)
+        if not isinstance(thin_archives, bool):
+            raise ValueError("thin_archives must be true or false.")
+        
+        # Link-time optimization is optional
+        lto = data.get("lto")
+        if lto is not None and lto not in ["thin", "full"]:
+            raise ValueError(f"Invalid lto: {lto}. Must be 'thin' or 'full'.")
+        
+        pgo_training = data.get("pgo_training", [])
+        if not isinstance(pgo_training, list) or not all(isinstance(arg, str) for arg in pgo_training):
+            raise ValueError("pgo_training must be a command as a list of strings.")
+        
+        configurations, default_configuration = cls._configurations_from_dict(data)
+        
+        # Targets are optional; without them the project is a single target
+        if multi_target:
+            if not isinstance(data["targets"], list) or not data["targets"]:
+                raise ValueError("targets must be a non-empty array of [[targets]] tables.")
+            targets = [cls._target_from_dict(entry, data) for entry in data["targets"]]
+        else:
+            targets = [
+                Target(
+                    name=data["project_name"],
+                    project_type=data["project_type"],
+                    source_paths=data["source_paths"],
+                    link_dependencies=link_deps,
+                    recursive=recursive,
+                    source_include=data.get("source_include", []),
+                    source_exclude=data.get("source_exclude", []),
+                )
+            ]
+        TargetGraph(targets)  # Rejects unknown deps and cycles
+        
         return cls(
             project_name=data["project_name"],
-            project_type=data["project_type"],
+            project_type=data.get("project_type", ""),
             compiler=data["compiler"],
             platform=data["platform"],
-            source_paths=data["source_paths"],
+            source_paths=data.get("source_paths", []),
             build_path=data["build_path"],
             output_path=data["output_path"],
             link_dependencies=link_deps,
+            jobs=jobs,
+            change_detection=change_detection,
+            compile_cache=compile_cache,
+            cache_dir=cache_dir,
+            cache_max_size_mb=cache_max_size_mb,
+            remote_cache=remote_cache,
+            compile_workers=compile_workers,
+            recursive=recursive,
+            source_include=data.get("source_include", []),
+            source_exclude=data.get("source_exclude", []),
+            unity_build=unity_build,
+            unity_batch_size=unity_batch_size,
+            unity_exclude=unity_exclude,
+            precompiled_header=precompiled_header,
+            linker=linker,
+            thin_archives=thin_archives,
+            lto=lto,
+            pgo_training=pgo_training,
+            configurations=configurations,
+            default_configuration=default_configuration,
+            targets=targets,
+        )
+    
+    @staticmethod
+    def _configurations_from_dict(
+        data: Dict[str, Any],
+    ) -> Tuple[Dict[str, BuildConfiguration], Optional[str]]:
+        """
+        Read the [configurations.<name>] tables and default_configuration.
+        
+        The compiler's built-in presets are always available; a table with
+        the same name replaces a preset. Without tables or a
+        default_configuration, builds use no configuration at all, as
+        before configurations existed.
+        
+        Args:
+            data: Top-level configuration data.
+            
+        Returns:
+            Tuple of (configurations by name, default configuration name).
+            
+        Raises:
+            ValueError: If a table or the default name is invalid.
+        """
+        configurations = {
+            name: BuildConfiguration(name, list(compile_flags), list(link_flags))
+            for name, (compile_flags, link_flags) in CONFIGURATION_PRESETS[data["compiler"]].items()
+        }
+        
+        tables = data.get("configurations", {})
+        if not isinstance(tables, dict):
+            raise ValueError("configurations must be a table of [configurations.<name>] tables.")
+        for name, table in tables.items():
+            if not CONFIGURATION_NAME_PATTERN.match(name):
+                raise ValueError(
+                    f"Invalid configuration name: {name}. "
+                    "Use letters, digits, '_', '.' and '-'."
+                )
+            if not isinstance(table, dict):
+                raise ValueError(f"configurations.{name} must be a table.")
+            for key in ["compile_flags", "link_flags"]:
+                value = table.get(key, [])
+                if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                    raise ValueError(f"{key} of configuration '{name}' must be a list of strings.")
+            configurations[name] = BuildConfiguration(
+                name,
+                table.get("compile_flags", []),
+                table.get("link_flags", []),
+            )
+        
+        default_configuration = data.get("default_configuration")
+        if default_configuration is None and tables:
+            default_configuration = next(iter(tables))
+        if default_configuration is not None and default_configuration not in configurations:
+            raise ValueError(
+                f"Invalid default_configuration: {default_configuration}. "
+                f"Must be one of: {', '.join(configurations)}."
+            )
+        return configurations, default_configuration
+    
+    def get_configuration(self, name: Optional[str] = None) -> Optional[BuildConfiguration]:
+        """
+        Get a build configuration.
+        
+        Args:
+            name: Configuration name, or None for the default one.
+            
+        Returns:
+            The configuration, or None when none is requested and there is
+            no default.
+            
+        Raises:
+            ValueError: If the name is not a known configuration.
+        """
+        if name is None:
+            name = self.default_configuration
+        if name is None:
+            return None
+        if name not in self.configurations:
+            raise ValueError(
+                f"Unknown configuration: {name}. "
+                f"Must be one of: {', '.join(self.configurations)}."
+            )
+        return self.configurations[name]
+    
+    @staticmethod
+    def _target_from_dict(entry: Dict[str, Any], defaults: Dict[str, Any]) -> Target:
+        """
+        Create a Target from a [[targets]] table, with validation.
+        
+        Source discovery settings not given in the table fall back to the
+        top-level ones.
+        
+        Args:
+            entry: Dictionary for one [[targets]] table.
+            defaults: Top-level configuration data.
+            
+        Returns:
+            Target: Target description.
+            
+        Raises:
+            ValueError: If required fields are missing or invalid.
+        """
+        if not isinstance(entry, dict):
+            raise ValueError("targets must be an array of [[targets]] tables.")
+        
+        name = entry.get("name")
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError("Every target needs a non-empty name.")
+        
+        missing = [f for f in ["type", "source_paths"] if f not in entry]
+        if missing:
+            raise ValueError(f"Target '{name}' is missing fields: {', '.join(missing)}")
+        
+        if entry["type"] not in TARGET_TYPES:
+            raise ValueError(
+                f"Invalid type for target '{name}': {entry['type']}. "
+                "Must be 'exe', 'static', or 'shared'."
+            )
+        
+        for key in ["source_paths", "deps", "link_dependencies"]:
+            value = entry.get(key, [])
+            if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                raise ValueError(f"{key} of target '{name}' must be a list of strings.")
+        
+        recursive = entry.get("recursive", defaults.get("recursive", True))
+        if not isinstance(recursive, bool):
+            raise ValueError(f"recursive of target '{name}' must be true or false.")
+        
+        for key in ["source_include", "source_exclude"]:
+            patterns = entry.get(key, [])
+            if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+                raise ValueError(f"{key} of target '{name}' must be a list of glob patterns.")
+        
+        return Target(
+            name=name,
+            project_type=entry["type"],
+            source_paths=entry["source_paths"],
+            link_dependencies=entry.get("link_dependencies", []),
+            deps=entry.get("deps", []),
+            recursive=recursive,
+            source_include=entry.get("source_include", defaults.get("source_include", [])),
+            source_exclude=entry.get("source_exclude", defaults.get("source_exclude", [])),
         )
     
     def validate(self) -> None:
@@ -139,9 +486,10 @@ class Config:
         if not self.project_name.strip():
             raise ValueError("project_name cannot be empty.")
         
-        if not self.source_paths:
-            raise ValueError("source_paths cannot be empty.")
-        
-        # Check that source paths are not empty strings
-        if any(not path.strip() for path in self.source_paths):
-            raise ValueError("source_paths cannot contain empty strings.")
+        for target in self.targets:
+            if not target.source_paths:
+                raise ValueError(f"source_paths of target '{target.name}' cannot be empty.")
+            
+            # Check that source paths are not empty strings
+            if any(not path.strip() for path in target.source_paths):
+                raise ValueError("source_paths cannot contain empty strings.")
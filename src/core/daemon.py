@@ -0,0 +1,165 @@
+"""Local build server protocol over a Unix domain socket.
+
+Only uses the standard library, so the client side starts quickly.
+"""
+
+from pathlib import Path
+from typing import Callable, List, Optional, TextIO
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+
+
+# Runs one build: (command-line arguments, client working directory,
+# output callback) -> exit code
+BuildHandler = Callable[[List[str], str, Callable[[str], None]], int]
+
+
+def daemon_available() -> bool:
+    """Check whether this platform supports the build daemon."""
+    return hasattr(socket, "AF_UNIX") and hasattr(socketserver, "UnixStreamServer")
+
+
+def daemon_socket_path(config_path: str | Path) -> Path:
+    """
+    Get the socket a daemon for a configuration file listens on.
+
+    Sockets live in a per-user runtime directory ($XDG_RUNTIME_DIR, else
+    the temp directory), named by a hash of the working directory (the
+    project root) and the absolute configuration path, so each project
+    has its own daemon.
+
+    Args:
+        config_path: Path to sugar.toml.
+
+    Returns:
+        Path of the Unix domain socket.
+    """
+    key = f"{os.getcwd()}\0{Path(config_path).resolve()}"
+    name = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        base = Path(runtime_dir) / "sugar-builder"
+    else:
+        base = Path(tempfile.gettempdir()) / f"sugar-builder-{os.getuid()}"
+    return base / f"{name}.sock"
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handles one client request (a single JSON line)."""
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+        command = request.get("command") if isinstance(request, dict) else None
+
+        if command == "ping":
+            self._send({"exit": 0, "pid": os.getpid()})
+        elif command == "stop":
+            self._send({"exit": 0})
+            # shutdown() waits for serve_forever(), so it cannot run on this thread
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        elif command == "build":
+            args = [str(arg) for arg in request.get("args", [])]
+            cwd = str(request.get("cwd") or os.getcwd())
+            with self.server.build_lock:
+                code = self.server.handle_build(args, cwd, self._send_output)
+            self._send({"exit": code})
+        else:
+            self._send({"exit": 1, "out": f"Error: Unknown daemon request {command!r}\n"})
+
+    def _send_output(self, text: str) -> None:
+        """Forward build output to the client, ignoring a disconnected client."""
+        if text:
+            self._send({"out": text})
+
+    def _send(self, message: dict) -> None:
+        try:
+            self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+            self.wfile.flush()
+        except OSError:
+            pass
+
+
+if daemon_available():
+
+    class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        """
+        Unix socket server that runs builds for thin clients.
+
+        Requests are JSON lines: {"command": "build", "args": [...], "cwd": ...},
+        {"command": "ping"} or {"command": "stop"}. Replies are JSON lines
+        {"out": text} carrying build output as it is printed, then a final
+        {"exit": code}. Builds run one at a time; pings and stops are
+        answered while a build is running.
+        """
+
+        daemon_threads = True
+
+        def __init__(self, socket_path: Path, handle_build: BuildHandler):
+            """
+            Initialize server and bind the socket.
+
+            Args:
+                socket_path: Socket file to listen on.
+                handle_build: Runs a build and returns its exit code.
+
+            Raises:
+                OSError: If the socket cannot be created.
+            """
+            socket_path = Path(socket_path)
+            socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            self.socket_path = socket_path
+            self.handle_build = handle_build
+            self.build_lock = threading.Lock()
+            super().__init__(str(socket_path), _RequestHandler)
+
+        def server_close(self) -> None:
+            """Close the socket and remove the socket file."""
+            super().server_close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+
+def send_request(
+    socket_path: Path,
+    request: dict,
+    output: Optional[TextIO] = None,
+) -> Optional[int]:
+    """
+    Send a request to a running daemon.
+
+    Args:
+        socket_path: Daemon socket.
+        request: Request message.
+        output: Stream to copy build output to as it arrives.
+
+    Returns:
+        Exit code reported by the daemon, or None if no daemon is listening
+        or it went away before answering.
+    """
+    if not daemon_available() or not os.path.exists(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(socket_path))
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as replies:
+                for line in replies:
+                    message = json.loads(line)
+                    if "out" in message and output is not None:
+                        output.write(message["out"])
+                        output.flush()
+                    if "exit" in message:
+                        return int(message["exit"])
+    except (OSError, ValueError):
+        return None
+    return None
@@ -0,0 +1,342 @@
+"""Header dependency tracking from compiler-emitted depfiles."""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import hashlib
+import json
+import os
+import threading
+from .hashing import FileHasher
+
+
+def parse_depfile(text: str) -> List[str]:
+    """
+    Parse a Makefile-style depfile as written by `-MMD -MF`.
+
+    Handles line continuations, escaped spaces and `$$`. Only the
+    prerequisites are returned; the target(s) before the colon are dropped.
+
+    Args:
+        text: Contents of the depfile.
+
+    Returns:
+        List of prerequisite paths in the order they appear.
+    """
+    text = text.replace("\\\r\n", " ").replace("\\\n", " ")
+
+    tokens: List[str] = []
+    current: List[str] = []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\" and i + 1 < len(text) and text[i + 1] in " #":
+            current.append(text[i + 1])
+            i += 2
+            continue
+        if ch == "$" and text.startswith("$$", i):
+            current.append("$")
+            i += 2
+            continue
+        if ch.isspace():
+            if current:
+                tokens.append("".join(current))
+                current = []
+        else:
+            current.append(ch)
+        i += 1
+    if current:
+        tokens.append("".join(current))
+
+    # Skip targets: everything up to and including the token ending in ':'
+    for idx, token in enumerate(tokens):
+        if token.endswith(":"):
+            return tokens[idx + 1:]
+    return []
+
+
+def write_depfile(path: Path, target: Path, dependencies: Iterable[Path]) -> None:
+    """
+    Write a Makefile-style depfile.
+
+    Used for compilers that report includes in another form (MSVC
+    /showIncludes) so every toolchain produces the same depfile format.
+
+    Args:
+        path: Depfile path.
+        target: Object file the dependencies belong to.
+        dependencies: Files the object depends on.
+    """
+    def escape(p: Path) -> str:
+        return str(p).replace("$", "$$").replace(" ", "\\ ").replace("#", "\\#")
+
+    lines = [f"{escape(target)}:"]
+    lines.extend(f"  {escape(dep)}" for dep in dependencies)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(" \\\n".join(lines) + "\n")
+
+
+class DependencyGraph:
+    """
+    Maps object files to the headers they were compiled from.
+
+    Paths are interned in a single table and each object stores indices into
+    it plus a fingerprint of its dependencies' (mtime, size) stamps at
+    compile time. An object is up to date while that fingerprint still
+    matches. Each dependency is stat'ed at most once per graph refresh, no
+    matter how many objects include it. The graph is persisted as JSON in
+    the build directory, next to the objects.
+
+    With a FileHasher, dependencies are fingerprinted by content hash
+    instead of (mtime, size).
+    """
+
+    FILENAME = ".sugar_deps.json"
+    VERSION = 1
+
+    def __init__(self, build_dir: Path, hasher: Optional[FileHasher] = None):
+        """
+        Initialize an empty dependency graph.
+
+        Args:
+            build_dir: Build directory the graph belongs to.
+            hasher: Optional content hasher for hash-based change detection.
+        """
+        self.path = Path(build_dir) / self.FILENAME
+        self.hasher = hasher
+        self._files: List[str] = []
+        self._file_index: Dict[str, int] = {}
+        # object path -> (dependency indices, fingerprint or None)
+        self._objects: Dict[str, Tuple[List[int], Optional[str]]] = {}
+        self._stamps: Dict[int, Optional[Tuple[int, int]]] = {}
+        self._hashes: Dict[int, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    @classmethod
+    def load(cls, build_dir: Path, hasher: Optional[FileHasher] = None) -> "DependencyGraph":
+        """
+        Load the dependency graph from a build directory.
+
+        Args:
+            build_dir: Build directory containing the graph.
+            hasher: Optional content hasher for hash-based change detection.
+
+        Returns:
+            DependencyGraph: Loaded graph (empty if missing or outdated).
+        """
+        graph = cls(build_dir, hasher)
+        try:
+            with open(graph.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return graph
+
+        if not isinstance(data, dict) or data.get("version") != cls.VERSION:
+            return graph
+
+        graph._files = data["files"]
+        graph._file_index = {p: i for i, p in enumerate(graph._files)}
+        graph._objects = {
+            obj: (deps, fingerprint) for obj, (deps, fingerprint) in data["objects"].items()
+        }
+        return graph
+
+    def save(self) -> None:
+        """Write the graph to disk if it changed, dropping unused paths."""
+        with self._lock:
+            if not self._dirty:
+                return
+            # Compact the path table to entries still referenced
+            used = sorted({i for deps, _ in self._objects.values() for i in deps})
+            remap = {old: new for new, old in enumerate(used)}
+            data = {
+                "version": self.VERSION,
+                "files": [self._files[i] for i in used],
+                "objects": {
+                    obj: [[remap[i] for i in deps], fingerprint]
+                    for obj, (deps, fingerprint) in self._objects.items()
+                },
+            }
+            self._dirty = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def refresh(self) -> None:
+        """Forget cached stamps so the next check re-stats dependencies."""
+        with self._lock:
+            self._stamps.clear()
+            self._hashes.clear()
+
+    def _intern(self, path: str) -> int:
+        """Get the index of a path in the path table, adding it if needed."""
+        index = self._file_index.get(path)
+        if index is None:
+            index = len(self._files)
+            self._files.append(path)
+            self._file_index[path] = index
+        return index
+
+    def _stamp(self, index: int) -> Optional[Tuple[int, int]]:
+        """Get the cached (mtime_ns, size) stamp of an interned path."""
+        if index not in self._stamps:
+            try:
+                st = os.stat(self._files[index])
+                self._stamps[index] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                self._stamps[index] = None
+        return self._stamps[index]
+
+    def _content_hash(self, index: int) -> Optional[str]:
+        """Get the cached content hash of an interned path."""
+        if index not in self._hashes:
+            self._hashes[index] = self.hasher.hash(self._files[index])
+        return self._hashes[index]
+
+    def _fingerprint(self, deps: List[int]) -> str:
+        """Hash the current stamps (or content hashes) of a list of dependencies."""
+        stamp = self._stamp if self.hasher is None else self._content_hash
+        digest = hashlib.blake2b(digest_size=8)
+        for index in deps:
+            digest.update(f"{self._files[index]}|{stamp(index)};".encode())
+        return digest.hexdigest()
+
+    def update(self, object_file: Path, dependencies: Iterable[str | Path], since_ns: int) -> None:
+        """
+        Record the dependencies of a freshly compiled object.
+
+        Args:
+            object_file: Object file that was compiled.
+            dependencies: Files reported by the compiler's depfile.
+            since_ns: Time (time.time_ns) the compile started. A dependency
+                modified after this point was possibly edited mid-compile,
+                so the object is recorded as out of date.
+        """
+        with self._lock:
+            deps = [self._intern(str(dep)) for dep in dependencies]
+            for index in deps:
+                self._stamps.pop(index, None)
+                self._hashes.pop(index, None)
+            fingerprint: Optional[str] = self._fingerprint(deps)
+            for index in deps:
+                stamp = self._stamp(index)
+                if stamp is None or stamp[0] >= since_ns:
+                    fingerprint = None
+                    break
+            self._objects[str(object_file)] = (deps, fingerprint)
+            self._dirty = True
+
+    def update_from_depfile(self, object_file: Path, depfile: Path, since_ns: int) -> bool:
+        """
+        Record an object's dependencies from the depfile its compile wrote.
+
+        Args:
+            object_file: Object file that was compiled.
+            depfile: Depfile written by the compiler.
+            since_ns: Time (time.time_ns) the compile started.
+
+        Returns:
+            True if the depfile was read, False if it is missing or unreadable
+            (the object is then forgotten and rebuilt next time).
+        """
+        try:
+            with open(depfile, "r", encoding="utf-8", errors="surrogateescape") as f:
+                dependencies = parse_depfile(f.read())
+        except OSError:
+            self.forget(object_file)
+            return False
+        self.update(object_file, dependencies, since_ns)
+        return True
+
+    def forget(self, object_file: Path) -> None:
+        """
+        Drop the record for an object file.
+
+        Args:
+            object_file: Object file to forget.
+        """
+        with self._lock:
+            if self._objects.pop(str(object_file), None) is not None:
+                self._dirty = True
+
+    def is_up_to_date(self, object_file: Path) -> bool:
+        """
+        Check whether none of an object's dependencies changed.
+
+        Args:
+            object_file: Object file to check.
+
+        Returns:
+            True if the object has a record and its dependencies are unchanged.
+        """
+        with self._lock:
+            entry = self._objects.get(str(object_file))
+            if entry is None or entry[1] is None:
+                return False
+            deps, fingerprint = entry
+            return self._fingerprint(deps) == fingerprint
+
+    def get_dependencies(self, object_file: Path) -> List[Path]:
+        """
+        Get the recorded dependencies of an object file.
+
+        Args:
+            object_file: Object file to look up.
+
+        Returns:
+            List of dependency paths (empty if unknown).
+        """
+        entry = self._objects.get(str(object_file))
+        if entry is None:
+            return []
+        return [Path(self._files[i]) for i in entry[0]]
+
+    def get_dependents(self, dependency: str | Path) -> List[Path]:
+        """
+        Get the object files that depend on a file.
+
+        Args:
+            dependency: Header or source path.
+
+        Returns:
+            List of object files whose recorded dependencies include it.
+        """
+        index = self._file_index.get(str(dependency))
+        if index is None:
+            return []
+        return [Path(obj) for obj, (deps, _) in self._objects.items() if index in deps]
+
+    def get_dependents_of(self, paths: Iterable[str | Path]) -> Set[Path]:
+        """
+        Get the object files that depend on any of several files.
+
+        Paths are compared as absolute paths, so they may be given relative
+        to a different directory than the depfiles used.
+
+        Args:
+            paths: Changed headers or sources.
+
+        Returns:
+            Set of object files whose recorded dependencies include one of them.
+        """
+        wanted = {os.path.abspath(path) for path in paths}
+        with self._lock:
+            indices = {
+                index for index, path in enumerate(self._files) if os.path.abspath(path) in wanted
+            }
+            return {
+                Path(obj) for obj, (deps, _) in self._objects.items() if not indices.isdisjoint(deps)
+            }
+
+    def get_files(self) -> List[Path]:
+        """
+        Get every file recorded as a dependency of some object.
+
+        Returns:
+            List of header and source paths.
+        """
+        with self._lock:
+            return [Path(path) for path in self._files]
@@ -0,0 +1,304 @@
+"""Client side of distributed compilation: a pool of compile workers."""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import asyncio
+import json
+import time
+from .compile_worker import PROTOCOL_VERSION
+
+
+@dataclass
+class RemoteCompileResult:
+    """Outcome of a compile that ran on a worker."""
+
+    exit_code: int
+    output: str
+    object_data: bytes
+    worker: str
+
+
+class _Worker:
+    """What the pool knows about one worker."""
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        if parts.scheme != "http" or not parts.hostname:
+            raise ValueError(f"Invalid compile worker URL: {url}")
+        self.url = url.rstrip("/")
+        self.name = parts.netloc
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.slots = 0  # 0 until the worker has answered a status request
+        self.running = 0  # Compiles running there, as last reported
+        self.load: Optional[float] = None
+        self.in_flight = 0  # Compiles this pool has sent and not heard back
+        self.checked = 0.0  # When the status was last requested
+        self.down_until = 0.0
+
+    def is_up(self, now: float) -> bool:
+        """Whether the worker has answered and is not being skipped."""
+        return self.slots > 0 and now >= self.down_until
+
+    def busy_ratio(self) -> float:
+        """Fraction of the worker's slots in use."""
+        return max(self.in_flight, self.running) / self.slots
+
+
+async def http_request(
+    host: str,
+    port: int,
+    method: str,
+    path: str,
+    body: bytes = b"",
+    timeout: float = 10.0,
+) -> Tuple[int, bytes]:
+    """
+    Send one HTTP/1.1 request over asyncio streams.
+
+    Waiting for the reply does not block the event loop, so compiles on
+    many workers and local ones share the build's single thread.
+
+    Args:
+        host: Server host.
+        port: Server port.
+        method: HTTP method.
+        path: Request path.
+        body: Request body.
+        timeout: Seconds to wait for the whole exchange.
+
+    Returns:
+        Tuple of (status code, response body).
+
+    Raises:
+        OSError: On connection failures, timeouts and malformed replies.
+    """
+    async def exchange() -> Tuple[int, bytes]:
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            head = (
+                f"{method} {path} HTTP/1.1\r\n"
+                f"Host: {host}:{port}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(head.encode("ascii") + body)
+            await writer.drain()
+
+            status_line = await reader.readline()
+            parts = status_line.split()
+            if len(parts) < 2 or not parts[1].isdigit():
+                raise OSError(f"Malformed reply from {host}:{port}")
+            length = None
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value.strip())
+            data = await (reader.readexactly(length) if length is not None else reader.read())
+            return int(parts[1]), data
+        except (asyncio.IncompleteReadError, ValueError) as e:
+            raise OSError(f"Malformed reply from {host}:{port}: {e}") from e
+        finally:
+            writer.close()
+
+    try:
+        return await asyncio.wait_for(exchange(), timeout)
+    except asyncio.TimeoutError as e:
+        raise OSError(f"{host}:{port} did not answer within {timeout:.0f}s") from e
+
+
+class WorkerPool:
+    """
+    Dispatches compiles to the least busy of a set of compile workers.
+
+    Workers report their slots and running compiles at GET /status, which
+    is asked again every STATUS_INTERVAL seconds. Each compile goes to the
+    worker with the smallest fraction of busy slots (counting the compiles
+    this pool already sent it), breaking ties by load average per slot.
+    A worker that cannot be reached is skipped for DOWN_INTERVAL seconds,
+    and one with a different compiler version for the rest of the build.
+    A compile is retried on up to `retries` other workers; when no worker
+    is free or every try failed, compile() returns None and the caller
+    compiles locally.
+    """
+
+    STATUS_INTERVAL = 2.0
+    DOWN_INTERVAL = 30.0
+    STATUS_TIMEOUT = 2.0
+
+    def __init__(self, urls: List[str], retries: int = 2, timeout: float = 600.0):
+        """
+        Initialize worker pool.
+
+        Args:
+            urls: Worker base URLs (http://host:port).
+            retries: Other workers to try after a failed dispatch.
+            timeout: Seconds to wait for one remote compile.
+
+        Raises:
+            ValueError: If a URL is not an http URL.
+        """
+        self.workers = [_Worker(url) for url in urls]
+        self.retries = retries
+        self.timeout = timeout
+        self.remote_compiles = 0
+        self.local_fallbacks = 0
+        self._warned: Dict[str, str] = {}
+
+    def reset_stats(self) -> None:
+        """Reset remote and fallback counts (called at the start of a build)."""
+        self.remote_compiles = 0
+        self.local_fallbacks = 0
+
+    def note_fallback(self, compiled_remotely: bool = False) -> None:
+        """
+        Count a compile that ran locally although workers are configured.
+
+        Args:
+            compiled_remotely: The compile was counted as remote, but its
+                result could not be used.
+        """
+        if compiled_remotely:
+            self.remote_compiles -= 1
+        self.local_fallbacks += 1
+
+    def _mark_down(self, worker: _Worker, reason: str, until: float) -> None:
+        """Stop using a worker for a while, saying why once per reason."""
+        worker.down_until = until
+        if self._warned.get(worker.url) != reason:
+            self._warned[worker.url] = reason
+            # Imported here: the toolchains package imports this module
+            from src.toolchains.base import write_output
+            write_output(f"  Warning: Compile worker {worker.name} skipped: {reason}\n")
+
+    async def _refresh(self, worker: _Worker) -> None:
+        """Ask a worker for its status."""
+        worker.checked = time.monotonic()
+        try:
+            status, data = await http_request(
+                worker.host, worker.port, "GET", "/status", timeout=self.STATUS_TIMEOUT
+            )
+            info = json.loads(data) if status == 200 else None
+        except (OSError, ValueError) as e:
+            self._mark_down(worker, str(e), time.monotonic() + self.DOWN_INTERVAL)
+            return
+        if not isinstance(info, dict) or info.get("protocol") != PROTOCOL_VERSION:
+            self._mark_down(worker, "unsupported protocol", float("inf"))
+            return
+        try:
+            worker.slots = max(0, int(info.get("slots", 0)))
+            worker.running = max(0, int(info.get("running", 0)))
+            worker.load = float(info["load"]) if info.get("load") is not None else None
+        except (ValueError, TypeError):
+            self._mark_down(worker, "malformed status", time.monotonic() + self.DOWN_INTERVAL)
+            return
+        if self._warned.pop(worker.url, None) is not None:
+            worker.down_until = 0.0
+
+    async def refresh(self) -> int:
+        """
+        Ask every worker for its status.
+
+        Returns:
+            Total slots of the workers that answered.
+        """
+        await asyncio.gather(*(self._refresh(worker) for worker in self.workers))
+        now = time.monotonic()
+        return sum(worker.slots for worker in self.workers if worker.is_up(now))
+
+    async def _pick(self, tried: List[_Worker]) -> Optional[_Worker]:
+        """Choose the least busy worker with a free slot, refreshing stale statuses."""
+        now = time.monotonic()
+        stale = [
+            worker for worker in self.workers
+            if worker not in tried and now >= worker.down_until and now - worker.checked >= self.STATUS_INTERVAL
+        ]
+        if stale:
+            await asyncio.gather(*(self._refresh(worker) for worker in stale))
+            now = time.monotonic()
+
+        candidates = [
+            worker for worker in self.workers
+            if worker not in tried and worker.is_up(now) and worker.busy_ratio() < 1
+        ]
+        if not candidates:
+            return None
+        return min(
+            candidates,
+            key=lambda worker: (worker.busy_ratio(), (worker.load or 0.0) / worker.slots),
+        )
+
+    async def compile(
+        self,
+        compiler: str,
+        version: str,
+        args: List[str],
+        source: bytes,
+        cwd: str,
+    ) -> Optional[RemoteCompileResult]:
+        """
+        Compile a preprocessed translation unit on a worker.
+
+        Args:
+            compiler: Compiler executable name (e.g. g++).
+            version: Local compiler version; workers must match it.
+            args: Compile arguments with {input} and {output} placeholders.
+            source: Preprocessed source.
+            cwd: Local working directory, for debug info paths.
+
+        Returns:
+            The result of a compile that ran on a worker (including one
+            that failed with compile errors), or None if no worker could
+            take it and it must be compiled locally.
+        """
+        header = json.dumps({"compiler": compiler, "version": version, "args": args, "cwd": cwd})
+        body = header.encode("utf-8") + b"\n" + source
+
+        tried: List[_Worker] = []
+        for _ in range(self.retries + 1):
+            worker = await self._pick(tried)
+            if worker is None:
+                break
+            tried.append(worker)
+            worker.in_flight += 1
+            try:
+                status, data = await http_request(
+                    worker.host, worker.port, "POST", "/compile", body, timeout=self.timeout
+                )
+            except OSError as e:
+                self._mark_down(worker, str(e), time.monotonic() + self.DOWN_INTERVAL)
+                continue
+            finally:
+                worker.in_flight -= 1
+
+            if status == 503:
+                # Busy with other clients; not chosen again until refreshed
+                worker.running = worker.slots
+                continue
+            if status != 200:
+                try:
+                    reason = json.loads(data).get("error", f"HTTP {status}")
+                except (ValueError, AttributeError):
+                    reason = f"HTTP {status}"
+                # A worker that rejects the request will reject it again
+                until = float("inf") if status in (400, 409) else time.monotonic() + self.DOWN_INTERVAL
+                self._mark_down(worker, reason, until)
+                continue
+
+            result_line, _, object_data = data.partition(b"\n")
+            try:
+                result = json.loads(result_line)
+                exit_code = int(result["exit"])
+                output = str(result.get("output", ""))
+            except (ValueError, KeyError, TypeError):
+                self._mark_down(worker, "malformed compile reply", time.monotonic() + self.DOWN_INTERVAL)
+                continue
+            self.remote_compiles += 1
+            return RemoteCompileResult(exit_code, output, object_data, worker.name)
+
+        self.local_fallbacks += 1
+        return None
@@ -0,0 +1,171 @@
+"""Fast file content hashing with a persistent stat-keyed cache."""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+
+# xxhash is optional; blake2b from hashlib is the fallback
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+HASH_ALGORITHM = "xxh3_128" if xxhash is not None else "blake2b"
+
+# Files at least this large are hashed through mmap instead of read()
+MMAP_THRESHOLD = 1024 * 1024
+READ_BUFFER_SIZE = 1024 * 1024
+
+# Coarsest file timestamp resolution to allow for (FAT stores 2 seconds)
+TIMESTAMP_GRANULARITY_NS = 2 * 10**9
+
+
+def _new_hasher():
+    """Create a new incremental hasher for the configured algorithm."""
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+def hash_file(path: str | Path, size: Optional[int] = None) -> str:
+    """
+    Hash the contents of a file.
+
+    Large files are mapped into memory; smaller ones are read with one
+    large buffered read.
+
+    Args:
+        path: Path to the file.
+        size: File size if already known (avoids an extra stat).
+
+    Returns:
+        Hex digest of the file contents.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    hasher = _new_hasher()
+    with open(path, "rb", buffering=0) as f:
+        if size is None:
+            size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                hasher.update(mapped)
+        else:
+            while True:
+                chunk = f.read(READ_BUFFER_SIZE)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class FileHasher:
+    """
+    Content hashes of files, cached by (inode, mtime, size).
+
+    A file is only read when its stat key differs from the cached one, so
+    unchanged files cost a single stat. The cache is persisted as JSON in
+    the build directory; it is discarded when the hash algorithm changes.
+
+    A hash taken within TIMESTAMP_GRANULARITY_NS of the file's mtime is not
+    trusted: an edit of the same size in the same timestamp tick would keep
+    the stat key (the "racy git" problem). Such files are hashed again
+    until a hash is recorded clearly after their last modification.
+    """
+
+    FILENAME = ".sugar_hashes.json"
+
+    def __init__(self, build_dir: Path):
+        """
+        Initialize an empty hash cache.
+
+        Args:
+            build_dir: Build directory the cache belongs to.
+        """
+        self.path = Path(build_dir) / self.FILENAME
+        # path -> [inode, mtime_ns, size, digest, time hashed (ns)]
+        self._entries: Dict[str, List] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.files_hashed = 0
+
+    @classmethod
+    def load(cls, build_dir: Path) -> "FileHasher":
+        """
+        Load the hash cache from a build directory.
+
+        Args:
+            build_dir: Build directory containing the cache.
+
+        Returns:
+            FileHasher: Loaded cache (empty if missing or outdated).
+        """
+        hasher = cls(build_dir)
+        try:
+            with open(hasher.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return hasher
+
+        if isinstance(data, dict) and data.get("algorithm") == HASH_ALGORITHM:
+            hasher._entries = data.get("files", {})
+        return hasher
+
+    def save(self) -> None:
+        """Write the cache to disk if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"algorithm": HASH_ALGORITHM, "files": dict(self._entries)}
+            self._dirty = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def hash(self, path: str | Path) -> Optional[str]:
+        """
+        Get the content hash of a file.
+
+        Args:
+            path: Path to the file.
+
+        Returns:
+            Hex digest, or None if the file does not exist or is unreadable.
+        """
+        key = str(path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            return None
+        stat_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+        entry = self._entries.get(key)
+        if (
+            entry is not None
+            and len(entry) == 5
+            and tuple(entry[:3]) == stat_key
+            and st.st_mtime_ns + TIMESTAMP_GRANULARITY_NS <= entry[4]
+        ):
+            return entry[3]
+
+        hashed_ns = time.time_ns()
+        try:
+            digest = hash_file(key, st.st_size)
+        except OSError:
+            return None
+
+        with self._lock:
+            self._entries[key] = [*stat_key, digest, hashed_ns]
+            self._dirty = True
+            self.files_hashed += 1
+        return digest
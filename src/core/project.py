@@ -1,8 +1,12 @@
 """Project representation and management."""
 
 from pathlib import Path
-from typing import List
-from .config import Config
+from typing import Iterable, List, Optional
+import hashlib
+import os
+from .config import BuildConfiguration, Config
+from .sources import SourceScanner
+from .targets import Target, TargetGraph
 
 
 class Project:
@@ -12,86 +16,311 @@ class Project:
     Manages project configuration, source files, and build artifacts.
     """
     
-    def __init__(self, config: Config, root_dir: str | Path = "."):
+    SOURCE_EXTENSIONS = (".cpp", ".cc", ".cxx", ".c")
+    HEADER_EXTENSIONS = (".h", ".hpp", ".hh", ".hxx", ".inl", ".ipp")
+    
+    def __init__(
+        self,
+        config: Config,
+        root_dir: str | Path = ".",
+        configuration: Optional[BuildConfiguration] = None,
+    ):
         """
         Initialize project with configuration.
         
         Args:
             config: Project configuration from sugar.toml.
             root_dir: Root directory of the project.
+            configuration: Build configuration (Debug, Release, ...) whose
+                objects and outputs go in subdirectories of their own.
         """
         self.config = config
         self.root_dir = Path(root_dir)
+        self.configuration = configuration
+        self.target_graph = TargetGraph(config.targets)
+        self._scanner: Optional[SourceScanner] = None
+    
+    def get_targets(self) -> List[Target]:
+        """
+        Get the project's targets.
+        
+        Returns:
+            Targets in dependency order (libraries before their users).
+        """
+        return self.target_graph.order()
     
-    def get_source_files(self) -> List[Path]:
+    def _resolve_target(self, target: Optional[Target]) -> Target:
+        """Default to the first declared target (the only one for single-target projects)."""
+        return target if target is not None else self.config.targets[0]
+    
+    def get_source_files(self, target: Optional[Target] = None) -> List[Path]:
         """
-        Collect all C++ source files from configured source paths.
+        Collect all C++ source files of a target.
+        
+        Source paths are walked recursively (unless `recursive = false`),
+        filtered by the `source_include` / `source_exclude` glob patterns,
+        and never descend into the build or output directories. Directory
+        listings are cached in the build directory keyed by directory mtime,
+        so unchanged subtrees are not re-read.
         
+        Args:
+            target: Target to collect sources for (defaults to the first target).
+            
         Returns:
-            List of Path objects pointing to C++ source files (.cpp, .cc, .cxx, .c).
+            Sorted list of Path objects pointing to C++ source files (.cpp, .cc, .cxx, .c).
         """
-        source_files = []
-        source_extensions = {".cpp", ".cc", ".cxx", ".c"}
+        target = self._resolve_target(target)
+        if self._scanner is None:
+            self._scanner = SourceScanner(self.SOURCE_EXTENSIONS, self.get_build_directory())
+        
+        source_files = set()
+        skip_dirs = self.get_generated_directories()
         
-        for src_path in self.config.source_paths:
+        for src_path in target.source_paths:
             src_dir = self.root_dir / src_path
             if not src_dir.exists():
                 continue
             
-            for ext in source_extensions:
-                source_files.extend(src_dir.glob(f"*{ext}"))
+            source_files.update(
+                self._scanner.scan(
+                    src_dir,
+                    recursive=target.recursive,
+                    include=target.source_include,
+                    exclude=target.source_exclude,
+                    skip_dirs=skip_dirs,
+                )
+            )
+        
+        self._scanner.save()
+        return sorted(source_files)
+    
+    def get_build_root(self) -> Path:
+        """
+        Get the build_path directory shared by all configurations.
         
-        return source_files
+        Returns:
+            Path to the top-level build directory.
+        """
+        return self.root_dir / self.config.build_path
     
     def get_build_directory(self) -> Path:
         """
         Get the build directory path.
         
+        Each configuration has its own build directory (build_path/<name>),
+        so switching configurations leaves the other's objects and build
+        database untouched.
+        
         Returns:
             Path to the build directory.
         """
-        return self.root_dir / self.config.build_path
+        if self.configuration is not None:
+            return self.get_build_root() / self.configuration.name
+        return self.get_build_root()
+    
+    def get_object_directory(self, target: Optional[Target] = None) -> Path:
+        """
+        Get the directory holding a target's compiled object files.
+        
+        Args:
+            target: Target (defaults to the first target).
+            
+        Returns:
+            Path to the object directory inside the build directory.
+        """
+        return self.get_build_directory() / "obj" / self._resolve_target(target).name
+    
+    def get_object_path(
+        self,
+        source_file: Path,
+        obj_ext: str,
+        target: Optional[Target] = None,
+    ) -> Path:
+        """
+        Get the object file path for a source file.
+        
+        Objects mirror the source tree under the target's object directory
+        and keep the source extension, so src/net/util.cpp becomes
+        obj/<target>/src/net/util.cpp.o and never collides with
+        src/db/util.cpp, src/net/util.c or the same file compiled for another
+        target. Sources outside the project root are placed under
+        obj/<target>/_external/<hash of their directory>/, and generated
+        unity sources under obj/<target>/_unity/.
+        
+        Args:
+            source_file: Path to the source file.
+            obj_ext: Object file extension (e.g. '.o', '.obj').
+            target: Target the object belongs to (defaults to the first target).
+            
+        Returns:
+            Path to the object file.
+        """
+        unity_dir = self.get_unity_directory(target)
+        if unity_dir in Path(source_file).parents:
+            rel = os.path.join("_unity", os.path.relpath(source_file, unity_dir))
+        else:
+            rel = self.get_relative_source_path(source_file)
+        return self.get_object_directory(target) / (rel + obj_ext)
+    
+    def get_relative_source_path(self, source_file: Path) -> str:
+        """
+        Get a source file's path relative to the project root.
+        
+        Sources outside the project root map to
+        _external/<hash of their directory>/<file name>.
+        
+        Args:
+            source_file: Path to the source file.
+            
+        Returns:
+            Relative path using the platform separator.
+        """
+        rel = os.path.relpath(source_file, self.root_dir)
+        if os.path.isabs(rel) or rel.split(os.sep, 1)[0] == os.pardir:
+            parent = os.path.abspath(os.path.dirname(source_file))
+            digest = hashlib.blake2b(parent.encode("utf-8", "surrogateescape"), digest_size=6)
+            rel = os.path.join("_external", digest.hexdigest(), os.path.basename(source_file))
+        return rel
+    
+    def get_unity_directory(self, target: Optional[Target] = None) -> Path:
+        """
+        Get the directory holding a target's generated unity sources.
+        
+        Args:
+            target: Target (defaults to the first target).
+            
+        Returns:
+            Path to the unity directory inside the build directory.
+        """
+        return self.get_build_directory() / "unity" / self._resolve_target(target).name
+    
+    def get_response_file_directory(self) -> Path:
+        """
+        Get the directory holding response files for long link commands.
+        
+        Returns:
+            Path to the response file directory inside the build directory.
+        """
+        return self.get_build_directory() / "rsp"
+    
+    def get_lto_cache_directory(self) -> Path:
+        """
+        Get the directory where incremental LTO links keep their cache.
+        
+        Returns:
+            Path to the LTO cache directory inside the build directory.
+        """
+        return self.get_build_directory() / "lto-cache"
+    
+    def get_profile_directory(self) -> Path:
+        """
+        Get the directory PGO-instrumented programs write profiles to.
+        
+        Returns:
+            Path to the profile directory inside the build directory.
+        """
+        return self.get_build_directory() / "pgo"
+    
+    @staticmethod
+    def create_directories(paths: Iterable[Path]) -> None:
+        """
+        Create the parent directories of many files in one batch.
+        
+        Each distinct directory is created once, before any parallel work
+        starts, instead of once per file.
+        
+        Args:
+            paths: File paths whose parent directories must exist.
+        """
+        for directory in sorted({path.parent for path in paths}):
+            directory.mkdir(parents=True, exist_ok=True)
+    
+    def get_output_root(self) -> Path:
+        """
+        Get the output_path directory shared by all configurations.
+        
+        Returns:
+            Path to the top-level output directory.
+        """
+        return self.root_dir / self.config.output_path
     
     def get_output_directory(self) -> Path:
         """
         Get the output directory path.
         
         Returns:
-            Path to the output directory.
+            Path to the output directory (output_path/<name> for a
+            configuration).
         """
-        return self.root_dir / self.config.output_path
+        if self.configuration is not None:
+            return self.get_output_root() / self.configuration.name
+        return self.get_output_root()
     
-    def get_target_filename(self) -> str:
+    def get_generated_directories(self) -> List[Path]:
+        """
+        Get the directories builds write to, for every configuration.
+        
+        Source discovery and file watching skip these.
+        
+        Returns:
+            The top-level build and output directories.
+        """
+        return [self.get_build_root(), self.get_output_root()]
+    
+    def get_target_filename(self, target: Optional[Target] = None) -> str:
         """
         Get the target executable/library filename based on project type and platform.
         
+        Args:
+            target: Target (defaults to the first target).
+            
         Returns:
             Filename of the build target.
         """
-        target_name = self.config.project_name
+        target = self._resolve_target(target)
+        target_name = target.name
+        project_type = target.project_type
         
         if self.config.platform == "Windows":
-            if self.config.project_type == "exe":
+            if project_type == "exe":
                 return f"{target_name}.exe"
-            elif self.config.project_type == "static":
+            elif project_type == "static":
                 return f"{target_name}.lib"
-            elif self.config.project_type == "shared":
+            elif project_type == "shared":
                 return f"{target_name}.dll"
         
         elif self.config.platform == "Linux":
-            if self.config.project_type == "exe":
+            if project_type == "exe":
                 return target_name
-            elif self.config.project_type == "static":
+            elif project_type == "static":
                 return f"lib{target_name}.a"
-            elif self.config.project_type == "shared":
+            elif project_type == "shared":
                 return f"lib{target_name}.so"
         
         elif self.config.platform == "macOS":
-            if self.config.project_type == "exe":
+            if project_type == "exe":
                 return target_name
-            elif self.config.project_type == "static":
+            elif project_type == "static":
                 return f"lib{target_name}.a"
-            elif self.config.project_type == "shared":
+            elif project_type == "shared":
                 return f"lib{target_name}.dylib"
         
         return target_name
+    
+    def get_link_artifact(self, target: Target) -> Path:
+        """
+        Get the file that dependents of a library target link against.
+        
+        This is the library itself, except for Windows DLLs, whose users link
+        against the import library link.exe writes next to the DLL.
+        
+        Args:
+            target: Library target.
+            
+        Returns:
+            Path to the file to pass to the linker.
+        """
+        output = self.get_output_directory() / self.get_target_filename(target)
+        if self.config.platform == "Windows" and target.project_type == "shared":
+            return output.with_suffix(".lib")
+        return output
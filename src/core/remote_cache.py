@@ -0,0 +1,217 @@
+"""Remote backends for the compile cache."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+import http.client
+import queue
+import struct
+
+
+def pack_entry(files: Dict[str, bytes]) -> bytes:
+    """
+    Serialize a cache entry into a single blob.
+
+    Layout per file: name length (u16), name, data length (u64), data.
+
+    Args:
+        files: Mapping of entry file name to contents.
+
+    Returns:
+        Packed entry.
+    """
+    parts = []
+    for name, data in files.items():
+        encoded = name.encode("utf-8")
+        parts.append(struct.pack("<H", len(encoded)))
+        parts.append(encoded)
+        parts.append(struct.pack("<Q", len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def unpack_entry(blob: bytes) -> Dict[str, bytes]:
+    """
+    Deserialize a blob produced by pack_entry.
+
+    Args:
+        blob: Packed entry.
+
+    Returns:
+        Mapping of entry file name to contents.
+
+    Raises:
+        ValueError: If the blob is truncated or malformed.
+    """
+    files = {}
+    offset = 0
+    try:
+        while offset < len(blob):
+            (name_len,) = struct.unpack_from("<H", blob, offset)
+            offset += 2
+            name = blob[offset:offset + name_len].decode("utf-8")
+            offset += name_len
+            (data_len,) = struct.unpack_from("<Q", blob, offset)
+            offset += 8
+            if offset + data_len > len(blob):
+                raise ValueError("truncated cache entry")
+            files[name] = blob[offset:offset + data_len]
+            offset += data_len
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f"malformed cache entry: {e}")
+    return files
+
+
+class CacheBackend:
+    """
+    Abstract remote store for compile cache entries.
+
+    Entries are opaque blobs addressed by cache key. Implementations must be
+    safe to call from several threads at once.
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Fetch an entry.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Entry blob, or None if the backend does not have it.
+        """
+        raise NotImplementedError("Subclasses must implement get()")
+
+    def put(self, key: str, blob: bytes) -> bool:
+        """
+        Upload an entry.
+
+        Args:
+            key: Cache key.
+            blob: Entry blob.
+
+        Returns:
+            True if the backend accepted the entry.
+        """
+        raise NotImplementedError("Subclasses must implement put()")
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """
+        Fetch several entries.
+
+        Args:
+            keys: Cache keys.
+
+        Returns:
+            Mapping of key to blob for the entries that were found.
+        """
+        found = {}
+        for key in keys:
+            blob = self.get(key)
+            if blob is not None:
+                found[key] = blob
+        return found
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class HTTPCacheBackend(CacheBackend):
+    """
+    Cache backend speaking plain HTTP: GET/PUT <base>/<key>.
+
+    Keeps a pool of persistent HTTP/1.1 connections so requests avoid
+    reconnecting, and fetches in parallel over that pool in get_many.
+    Network errors are treated as misses.
+    """
+
+    def __init__(self, url: str, connections: int = 8, timeout: float = 10.0):
+        """
+        Initialize HTTP backend.
+
+        Args:
+            url: Base URL of the cache server (http:// or https://).
+            connections: Maximum number of pooled connections.
+            timeout: Socket timeout in seconds.
+
+        Raises:
+            ValueError: If the URL is not an http(s) URL.
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Invalid remote cache URL: {url}")
+        self.url = url
+        self.connections = connections
+        self.timeout = timeout
+        self._scheme = parts.scheme
+        self._host = parts.hostname
+        self._port = parts.port
+        self._base_path = parts.path.rstrip("/")
+        self._pool: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        """Get a pooled connection or open a new one."""
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        if self._scheme == "https":
+            return http.client.HTTPSConnection(self._host, self._port, timeout=self.timeout)
+        return http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        """Return a healthy connection to the pool."""
+        if self._pool.qsize() < self.connections:
+            self._pool.put(conn)
+        else:
+            conn.close()
+
+    def _request(self, method: str, key: str, body: Optional[bytes] = None):
+        """
+        Send a request, retrying once on a stale pooled connection.
+
+        Returns:
+            Tuple of (status, response body), or None on network failure.
+        """
+        path = f"{self._base_path}/{key}"
+        for _ in range(2):
+            conn = self._connect()
+            try:
+                conn.request(method, path, body=body)
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                continue
+            self._release(conn)
+            return response.status, data
+        return None
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Fetch an entry with GET <base>/<key>."""
+        result = self._request("GET", key)
+        if result is None or result[0] != 200:
+            return None
+        return result[1]
+
+    def put(self, key: str, blob: bytes) -> bool:
+        """Upload an entry with PUT <base>/<key>."""
+        result = self._request("PUT", key, blob)
+        return result is not None and 200 <= result[0] < 300
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Fetch entries in parallel over the connection pool."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.connections, len(keys))) as executor:
+            blobs: List[Optional[bytes]] = list(executor.map(self.get, keys))
+        return {key: blob for key, blob in zip(keys, blobs) if blob is not None}
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
@@ -0,0 +1,255 @@
+"""Parallel job scheduling for build steps."""
+
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Set, Union
+import asyncio
+import heapq
+import os
+import sys
+import time
+
+
+@dataclass(eq=False)
+class Job:
+    """
+    A unit of work for the scheduler.
+
+    The callable returns True on success. Coroutine functions are awaited
+    on the scheduler's event loop; plain functions run on a worker thread.
+    A job only starts once every job in `deps` has succeeded. Among ready jobs,
+    the one with the longest chain of expected work (`cost` in seconds) left
+    behind it starts first, then submission order.
+    """
+
+    name: str
+    func: Callable[[], Union[bool, Awaitable[bool]]]
+    deps: List["Job"] = field(default_factory=list)
+    cost: float = 0.0
+
+
+@dataclass
+class JobResult:
+    """Outcome of a finished job."""
+
+    job: Job
+    success: bool
+    start: float
+    end: float
+    worker: int
+    error: Optional[BaseException] = None
+
+    @property
+    def duration(self) -> float:
+        """Wall-clock duration of the job in seconds."""
+        return self.end - self.start
+
+
+def default_job_count() -> int:
+    """
+    Get the default number of parallel jobs.
+
+    Returns:
+        Number of CPUs available to this process (at least 1).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+class JobScheduler:
+    """
+    Runs a graph of jobs on an asyncio event loop with a bounded job limit.
+
+    Build jobs spend their time waiting on compiler subprocesses, so they
+    are coroutines sharing one event loop rather than threads blocked on
+    one child process each. A semaphore with `jobs` slots bounds how many
+    run at once, a job starts as soon as its dependencies have succeeded
+    and a slot is free, and results are yielded in completion order. The
+    loop runs on the caller's thread while it waits for the next result.
+    
+    Ready jobs are started longest-critical-path first: a job's rank is its
+    own cost plus the largest rank among the jobs waiting on it. For
+    independent compiles this is longest-processing-time-first, so a slow
+    translation unit starts early instead of becoming the tail of the
+    build; jobs that unblock long chains (a PCH, a library link) go first.
+    After the first failure no new jobs are started unless `keep_going` is
+    set; jobs already running are allowed to finish and their results are
+    still reported. Jobs that depend on a failed job never run.
+    """
+
+    def __init__(self, jobs: Optional[int] = None, keep_going: bool = False):
+        """
+        Initialize scheduler.
+
+        Args:
+            jobs: Maximum number of concurrent jobs (defaults to CPU count).
+            keep_going: Keep scheduling new jobs after a failure.
+        """
+        self.jobs = jobs if jobs and jobs > 0 else default_job_count()
+        self.keep_going = keep_going
+        self.failed = False
+        self.skipped = 0
+
+    @staticmethod
+    async def _run_job(job: Job, worker: int) -> JobResult:
+        """Execute a single job, converting exceptions into failures."""
+        start = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(job.func):
+                success = bool(await job.func())
+            else:
+                success = bool(await asyncio.to_thread(job.func))
+            error = None
+        except Exception as e:
+            success = False
+            error = e
+        return JobResult(job, success, start, time.perf_counter(), worker, error)
+
+    @staticmethod
+    def _critical_path_ranks(
+        jobs: List[Job],
+        dependents: Dict[Job, List[Job]],
+    ) -> Dict[Job, float]:
+        """
+        Compute each job's cost plus the costliest chain of jobs after it.
+
+        Args:
+            jobs: All scheduled jobs.
+            dependents: Jobs waiting on each job.
+
+        Returns:
+            Rank per job.
+
+        Raises:
+            ValueError: If the dependencies contain a cycle.
+        """
+        # Topological order (Kahn), then accumulate ranks from the sinks up
+        remaining = {job: len(job.deps) for job in jobs}
+        topo = [job for job in jobs if remaining[job] == 0]
+        for job in topo:
+            for dependent in dependents[job]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    topo.append(dependent)
+        if len(topo) != len(jobs):
+            raise ValueError("Job dependencies contain a cycle")
+
+        rank: Dict[Job, float] = {}
+        for job in reversed(topo):
+            rank[job] = job.cost + max((rank[d] for d in dependents[job]), default=0.0)
+        return rank
+
+    def run(self, jobs: Iterable[Job]) -> Iterator[JobResult]:
+        """
+        Run jobs in parallel, yielding results as they finish.
+
+        Args:
+            jobs: Jobs to run. Dependencies must be included in the same
+                iterable.
+
+        Yields:
+            JobResult for every job that was started.
+
+        Raises:
+            ValueError: If a job depends on a job that is not scheduled, or
+                the dependencies contain a cycle.
+        """
+        jobs = list(jobs)
+        scheduled = set(jobs)
+        waiting: Dict[Job, int] = {}
+        dependents: Dict[Job, List[Job]] = {job: [] for job in jobs}
+        ready: List = []
+
+        for job in jobs:
+            for dep in job.deps:
+                if dep not in scheduled:
+                    raise ValueError(f"Job '{job.name}' depends on unscheduled job '{dep.name}'")
+                dependents[dep].append(job)
+            waiting[job] = len(job.deps)
+        order = {job: seq for seq, job in enumerate(jobs)}
+        rank = self._critical_path_ranks(jobs, dependents)
+
+        def make_ready(job: Job) -> None:
+            heapq.heappush(ready, (-rank[job], order[job], job))
+
+        for job in jobs:
+            if waiting[job] == 0:
+                make_ready(job)
+
+        loop = asyncio.new_event_loop()
+        slots = asyncio.Semaphore(self.jobs)
+        # Worker ids are slot numbers, so traces show one lane per slot
+        free_workers = list(range(self.jobs - 1, -1, -1))
+        changed = asyncio.Event()
+        results: asyncio.Queue = asyncio.Queue()
+        running: Set[asyncio.Task] = set()
+        stopped = False
+
+        async def execute(job: Job, worker: int) -> None:
+            try:
+                result = await self._run_job(job, worker)
+            finally:
+                free_workers.append(worker)
+                slots.release()
+            if result.success:
+                for dependent in dependents[job]:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        make_ready(dependent)
+            else:
+                self.failed = True
+            results.put_nowait(result)
+
+        def on_done(task: asyncio.Task) -> None:
+            running.discard(task)
+            changed.set()
+
+        async def dispatch() -> None:
+            # Take a slot first, then the best job ready at that moment
+            while True:
+                await slots.acquire()
+                while not ready and running and not stopped:
+                    changed.clear()
+                    await changed.wait()
+                if not ready or stopped or (self.failed and not self.keep_going):
+                    slots.release()
+                    break
+                job = heapq.heappop(ready)[-1]
+                task = loop.create_task(execute(job, free_workers.pop()))
+                running.add(task)
+                task.add_done_callback(on_done)
+            while running:
+                await asyncio.wait(set(running))
+            results.put_nowait(None)
+
+        finished = 0
+        dispatcher = loop.create_task(dispatch())
+        getter = None
+        try:
+            while True:
+                getter = loop.create_task(results.get())
+                result = loop.run_until_complete(getter)
+                if result is None:
+                    break
+                finished += 1
+                yield result
+            loop.run_until_complete(dispatcher)
+        finally:
+            if not dispatcher.done():
+                # The caller stopped early: let running jobs finish, or
+                # cancel them (killing their tools) on Ctrl+C
+                stopped = True
+                changed.set()
+                pending = [dispatcher, *running]
+                if isinstance(sys.exc_info()[1], KeyboardInterrupt):
+                    for task in pending:
+                        task.cancel()
+                if getter is not None and not getter.done():
+                    getter.cancel()
+                    pending.append(getter)
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+
+        # Count jobs that never started because of a failure
+        self.skipped = len(jobs) - finished
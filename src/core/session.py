@@ -0,0 +1,142 @@
+"""Project state kept in memory between builds."""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import os
+from .build_db import BuildDatabase
+from .config import Config
+from .depfile import DependencyGraph
+from .hashing import FileHasher
+from .project import Project
+from .timings import BuildTimings
+
+if TYPE_CHECKING:
+    from src.toolchains import Toolchain
+
+
+class BuildSession:
+    """
+    Loaded configuration, toolchain, source listings and build state.
+
+    A one-off build creates a session and throws it away. Long-running
+    processes (the build daemon, watch mode) hand the same session to every
+    build, so the configuration is parsed, the toolchain probed and the
+    build state read from disk only once. Each piece is reloaded when it
+    may be stale:
+
+    - the whole session, when sugar.toml changes (see is_current()) or
+      another build configuration is requested
+    - the source listings, when invalidate_sources() is called because
+      files were added or removed
+    - the build state, when another process rewrote its files
+    """
+
+    def __init__(
+        self,
+        config_path: Path,
+        config: Config,
+        project: Project,
+        toolchain: "Toolchain",
+        configuration_name: Optional[str] = None,
+    ):
+        """
+        Initialize a session for a loaded project.
+
+        Args:
+            config_path: Path to sugar.toml.
+            config: Loaded, validated configuration.
+            project: Project for the configuration.
+            toolchain: Toolchain for the configured compiler.
+            configuration_name: Build configuration requested on the command
+                line (None for the default one).
+        """
+        self.config_path = Path(config_path).resolve()
+        self.config_stamp = self.get_config_stamp(self.config_path)
+        self.config = config
+        self.project = project
+        self.toolchain = toolchain
+        self.configuration_name = configuration_name
+        # Source files per target name, None until discovered
+        self.target_sources: Optional[Dict[str, List[Path]]] = None
+        self.hasher: Optional[FileHasher] = None
+        self.build_db: Optional[BuildDatabase] = None
+        self.dep_graph: Optional[DependencyGraph] = None
+        self.timings: Optional[BuildTimings] = None
+        self._state_stamp: Optional[List[Optional[Tuple[int, int]]]] = None
+
+    @staticmethod
+    def get_config_stamp(config_path: Path) -> Optional[Tuple[int, int]]:
+        """Get the (mtime, size) of a configuration file, or None if missing."""
+        try:
+            st = os.stat(config_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def is_current(self, config_path: Path) -> bool:
+        """
+        Check whether this session still matches a configuration file.
+
+        Args:
+            config_path: Path to sugar.toml for the next build.
+
+        Returns:
+            True if it is the same file and unchanged since it was loaded.
+        """
+        config_path = Path(config_path).resolve()
+        return config_path == self.config_path and self.get_config_stamp(config_path) == self.config_stamp
+
+    def invalidate_sources(self) -> None:
+        """Discover source files again on the next build."""
+        self.target_sources = None
+
+    def _state_files(self) -> List[Path]:
+        """Get the build state files this session reads and writes."""
+        build_dir = self.project.get_build_directory()
+        files = [
+            build_dir / BuildDatabase.FILENAME,
+            build_dir / DependencyGraph.FILENAME,
+            build_dir / BuildTimings.FILENAME,
+        ]
+        if self.config.change_detection == "hash":
+            files.append(build_dir / FileHasher.FILENAME)
+        return files
+
+    def _get_state_stamp(self) -> List[Optional[Tuple[int, int]]]:
+        """Stat the build state files."""
+        stamps = []
+        for path in self._state_files():
+            try:
+                st = os.stat(path)
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamps.append(None)
+        return stamps
+
+    def load_state(self) -> bool:
+        """
+        Load the build state, unless the copy in memory is still current.
+
+        Returns:
+            True if the state was read from disk, False if reused.
+        """
+        if self.build_db is not None and self._state_stamp == self._get_state_stamp():
+            # Headers may have changed since the last build
+            self.dep_graph.refresh()
+            return False
+
+        build_dir = self.project.get_build_directory()
+        self.hasher = FileHasher.load(build_dir) if self.config.change_detection == "hash" else None
+        self.build_db = BuildDatabase.load(build_dir, self.hasher)
+        self.dep_graph = DependencyGraph.load(build_dir, self.hasher)
+        self.timings = BuildTimings.load(build_dir)
+        return True
+
+    def save_state(self) -> None:
+        """Write the build state and remember what is now on disk."""
+        self.build_db.save()
+        self.dep_graph.save()
+        self.timings.save()
+        if self.hasher is not None:
+            self.hasher.save()
+        self._state_stamp = self._get_state_stamp()
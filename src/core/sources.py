@@ -0,0 +1,200 @@
+"""Source file discovery with a directory listing cache."""
+
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import json
+import os
+import time
+
+
+# Listings of directories modified this recently are not trusted, since a
+# later change could land within the same mtime tick on coarse filesystems.
+RECENT_WINDOW_NS = 2_000_000_000
+
+
+def matches_any(rel_path: str, patterns: Iterable[str]) -> bool:
+    """
+    Check a relative path against glob patterns.
+
+    Patterns use fnmatch syntax where `*` also matches `/`, so "*.cpp"
+    matches at any depth and "tests/*" matches everything under tests.
+
+    Args:
+        rel_path: Path relative to a source root, with forward slashes.
+        patterns: Glob patterns.
+
+    Returns:
+        True if any pattern matches.
+    """
+    return any(fnmatchcase(rel_path, pattern) for pattern in patterns)
+
+
+class SourceScanner:
+    """
+    Walks source directories in a single pass with os.scandir.
+
+    Each directory's listing (matching files and subdirectories) is cached
+    together with the directory's mtime. Since adding, removing or renaming
+    an entry updates the directory mtime, an unchanged directory costs one
+    stat instead of a readdir. The cache is persisted as JSON in the build
+    directory.
+    """
+
+    FILENAME = ".sugar_sources.json"
+    VERSION = 1
+
+    def __init__(self, extensions: Iterable[str], cache_dir: Optional[Path] = None):
+        """
+        Initialize scanner.
+
+        Args:
+            extensions: File extensions to collect (e.g. ".cpp").
+            cache_dir: Directory for the persistent listing cache (optional).
+        """
+        self.extensions = frozenset(extensions)
+        self.path = Path(cache_dir) / self.FILENAME if cache_dir else None
+        # directory -> (mtime_ns, files, subdirectories)
+        self._listings: Dict[str, Tuple[int, List[str], List[str]]] = {}
+        self._dirty = False
+        self.directories_read = 0
+        self._load()
+
+    def _load(self) -> None:
+        """Load the listing cache from disk, if present."""
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if (
+            isinstance(data, dict)
+            and data.get("version") == self.VERSION
+            and data.get("extensions") == sorted(self.extensions)
+        ):
+            self._listings = {
+                d: (mtime, files, subdirs) for d, (mtime, files, subdirs) in data["dirs"].items()
+            }
+
+    def save(self) -> None:
+        """Write the listing cache to disk if it changed."""
+        if self.path is None or not self._dirty:
+            return
+        data = {
+            "version": self.VERSION,
+            "extensions": sorted(self.extensions),
+            "dirs": {d: list(entry) for d, entry in self._listings.items()},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def _list_dir(self, directory: str, mtime: int, now_ns: int) -> Tuple[List[str], List[str]]:
+        """
+        Get the matching files and subdirectories of a directory.
+
+        Args:
+            directory: Directory path.
+            mtime: Current mtime of the directory in nanoseconds.
+            now_ns: Time the scan started, for the recent-change guard.
+
+        Returns:
+            Tuple of (file names, subdirectory names).
+        """
+        cached = self._listings.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2]
+
+        files: List[str] = []
+        subdirs: List[str] = []
+        self.directories_read += 1
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=True):
+                        subdirs.append(entry.name)
+                    elif os.path.splitext(entry.name)[1] in self.extensions:
+                        files.append(entry.name)
+        except OSError:
+            return [], []
+
+        files.sort()
+        subdirs.sort()
+        if now_ns - mtime > RECENT_WINDOW_NS:
+            self._listings[directory] = (mtime, files, subdirs)
+        else:
+            self._listings.pop(directory, None)
+        self._dirty = True
+        return files, subdirs
+
+    def scan(
+        self,
+        root: Path,
+        recursive: bool = True,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        skip_dirs: Iterable[Path] = (),
+    ) -> List[Path]:
+        """
+        Collect source files under a directory.
+
+        Args:
+            root: Directory to scan.
+            recursive: Descend into subdirectories.
+            include: Glob patterns a file must match (relative to root);
+                all files with a source extension when empty.
+            exclude: Glob patterns for files or directories to skip.
+            skip_dirs: Directories never to descend into (e.g. the build
+                directory when it lives inside a source path).
+
+        Returns:
+            Sorted list of source file paths.
+        """
+        include = include or []
+        exclude = exclude or []
+        now_ns = time.time_ns()
+        found: List[str] = []
+        visited: Set[Tuple[int, int]] = set()
+        for skip_dir in skip_dirs:
+            try:
+                st = os.stat(skip_dir)
+            except OSError:
+                continue
+            visited.add((st.st_dev, st.st_ino))
+
+        stack = [(str(root), "")]
+        while stack:
+            directory, rel_dir = stack.pop()
+            try:
+                st = os.stat(directory)
+            except OSError:
+                self._listings.pop(directory, None)
+                continue
+            if (st.st_dev, st.st_ino) in visited:
+                continue  # Symlink loop or duplicate
+            visited.add((st.st_dev, st.st_ino))
+
+            files, subdirs = self._list_dir(directory, st.st_mtime_ns, now_ns)
+            for name in files:
+                rel_path = f"{rel_dir}{name}"
+                if include and not matches_any(rel_path, include):
+                    continue
+                if exclude and matches_any(rel_path, exclude):
+                    continue
+                found.append(os.path.join(directory, name))
+
+            if recursive:
+                for name in subdirs:
+                    rel_path = f"{rel_dir}{name}"
+                    if exclude and matches_any(rel_path, exclude):
+                        continue
+                    stack.append((os.path.join(directory, name), rel_path + "/"))
+
+        # Sort plain strings; comparing Path objects is far slower
+        found.sort()
+        return [Path(p) for p in found]
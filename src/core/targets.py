@@ -0,0 +1,115 @@
+"""Build targets and the dependency graph between them."""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List
+
+
+TARGET_TYPES = ("exe", "static", "shared")
+
+
+@dataclass
+class Target:
+    """
+    One artifact (executable or library) built from a set of sources.
+
+    Projects without a [[targets]] table have a single target named after
+    the project, built from the top-level settings.
+    """
+
+    name: str
+    project_type: str  # exe, static, shared
+    source_paths: List[str]
+    link_dependencies: List[str] = field(default_factory=list)
+    deps: List[str] = field(default_factory=list)  # Names of targets linked into this one
+    recursive: bool = True
+    source_include: List[str] = field(default_factory=list)
+    source_exclude: List[str] = field(default_factory=list)
+
+
+class TargetGraph:
+    """
+    Validated dependency graph of a project's targets.
+
+    Only libraries can be depended on. A target is linked against the
+    artifacts of all of its transitive dependencies, so an executable that
+    uses a static library which itself uses another static library links
+    both.
+    """
+
+    def __init__(self, targets: Iterable[Target]):
+        """
+        Build the graph.
+
+        Args:
+            targets: Targets of the project.
+
+        Raises:
+            ValueError: On duplicate names, unknown or executable
+                dependencies, or dependency cycles.
+        """
+        self.targets: Dict[str, Target] = {}
+        for target in targets:
+            if target.name in self.targets:
+                raise ValueError(f"Duplicate target name: {target.name}")
+            self.targets[target.name] = target
+
+        for target in self.targets.values():
+            for dep in target.deps:
+                if dep not in self.targets:
+                    raise ValueError(f"Target '{target.name}' depends on unknown target '{dep}'")
+                if self.targets[dep].project_type == "exe":
+                    raise ValueError(
+                        f"Target '{target.name}' cannot depend on executable '{dep}'"
+                    )
+
+        self._order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Order targets so that dependencies come first."""
+        order: List[str] = []
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(name: str, path: List[str]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                cycle = path[path.index(name):] + [name]
+                raise ValueError(f"Target dependency cycle: {' -> '.join(cycle)}")
+            state[name] = 1
+            for dep in self.targets[name].deps:
+                visit(dep, path + [name])
+            state[name] = 2
+            order.append(name)
+
+        for name in self.targets:
+            visit(name, [])
+        return order
+
+    def order(self) -> List[Target]:
+        """
+        Get all targets, dependencies before dependents.
+
+        Returns:
+            Targets in topological order.
+        """
+        return [self.targets[name] for name in self._order]
+
+    def transitive_deps(self, name: str) -> List[Target]:
+        """
+        Get every target a target depends on, directly or indirectly.
+
+        Args:
+            name: Target name.
+
+        Returns:
+            Dependencies in link order: each library comes before the
+            libraries it depends on, as single-pass linkers require.
+        """
+        seen = set()
+        stack = list(self.targets[name].deps)
+        while stack:
+            dep = stack.pop()
+            if dep not in seen:
+                seen.add(dep)
+                stack.extend(self.targets[dep].deps)
+        return [self.targets[n] for n in reversed(self._order) if n in seen]
@@ -0,0 +1,210 @@
+"""Compile and link timing history and reports."""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import threading
+
+# resource is Unix-only; CPU time is not reported on Windows
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class BuildTimings:
+    """
+    Persistent per-job durations from previous builds.
+
+    Keyed by output path (object file or linked target). Each value is an
+    exponential moving average of the job's wall time, so one noisy run
+    does not dominate. Stored as JSON in the build directory, where the
+    scheduler can use it to start the longest jobs first.
+    """
+
+    FILENAME = ".sugar_timings.json"
+    VERSION = 1
+    # Weight of the newest measurement in the moving average
+    SMOOTHING = 0.5
+    # Compile speed assumed before anything has been measured (~100 KB/s)
+    DEFAULT_SECONDS_PER_BYTE = 1e-5
+
+    def __init__(self, build_dir: Path):
+        """
+        Initialize empty timings.
+
+        Args:
+            build_dir: Build directory holding the timings file.
+        """
+        self.path = Path(build_dir) / self.FILENAME
+        self._durations: Dict[str, float] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, build_dir: Path) -> "BuildTimings":
+        """
+        Load timings from the build directory.
+
+        Args:
+            build_dir: Build directory holding the timings file.
+
+        Returns:
+            BuildTimings, empty if the file is missing or unreadable.
+        """
+        timings = cls(build_dir)
+        try:
+            with open(timings.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return timings
+        if isinstance(data, dict) and data.get("version") == cls.VERSION:
+            timings._durations = {
+                key: float(value) for key, value in data.get("durations", {}).items()
+            }
+        return timings
+
+    def save(self) -> None:
+        """Write timings to disk if they changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": self.VERSION, "durations": dict(self._durations)}
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def record(self, key: str, seconds: float) -> None:
+        """
+        Add a measurement for a job.
+
+        Args:
+            key: Output path of the job.
+            seconds: Wall time of this run.
+        """
+        with self._lock:
+            previous = self._durations.get(key)
+            if previous is None:
+                self._durations[key] = seconds
+            else:
+                self._durations[key] = previous + self.SMOOTHING * (seconds - previous)
+            self._dirty = True
+
+    def get(self, key: str) -> Optional[float]:
+        """
+        Get the expected duration of a job.
+
+        Args:
+            key: Output path of the job.
+
+        Returns:
+            Smoothed duration in seconds, or None if never measured.
+        """
+        return self._durations.get(key)
+
+    def estimate(self, inputs: Dict[str, List[Path]]) -> Dict[str, float]:
+        """
+        Estimate how long each of a set of jobs will take.
+
+        Measured jobs use their recorded duration. The rest are estimated
+        from the size of their input files, at the seconds-per-byte rate of
+        the measured jobs in the same set, so estimates and measurements
+        stay comparable.
+
+        Args:
+            inputs: Input files (sources) per job output path.
+
+        Returns:
+            Expected seconds per job output path.
+        """
+        sizes: Dict[str, int] = {}
+        for key, paths in inputs.items():
+            size = 0
+            for path in paths:
+                try:
+                    size += os.stat(path).st_size
+                except OSError:
+                    pass
+            sizes[key] = size
+
+        measured_seconds = 0.0
+        measured_bytes = 0
+        for key, size in sizes.items():
+            seconds = self._durations.get(key)
+            if seconds is not None and size:
+                measured_seconds += seconds
+                measured_bytes += size
+        rate = measured_seconds / measured_bytes if measured_bytes else self.DEFAULT_SECONDS_PER_BYTE
+
+        estimates = {}
+        for key, size in sizes.items():
+            seconds = self._durations.get(key)
+            estimates[key] = seconds if seconds is not None else size * rate
+        return estimates
+
+
+def child_cpu_time() -> Optional[float]:
+    """
+    Get the CPU time used so far by finished child processes.
+
+    Returns:
+        User plus system seconds of all waited-for subprocesses (compilers,
+        linkers), or None where the platform does not report it.
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def aggregate_time_traces(
+    trace_files: Iterable[Path],
+) -> Tuple[List[Tuple[str, float, int]], List[Tuple[str, float, int]]]:
+    """
+    Sum Clang -ftime-trace results across translation units.
+
+    Args:
+        trace_files: JSON files written by clang -ftime-trace.
+
+    Returns:
+        Tuple of (headers, template instantiations), each a list of
+        (name, total seconds, occurrences) sorted by total time. Header
+        times are inclusive of the headers they include.
+    """
+    headers: Dict[str, List[float]] = {}
+    templates: Dict[str, List[float]] = {}
+    for trace_file in trace_files:
+        try:
+            with open(trace_file, "r", encoding="utf-8") as f:
+                events = json.load(f).get("traceEvents", [])
+        except (OSError, ValueError, AttributeError):
+            continue
+        for event in events:
+            if event.get("ph") != "X":
+                continue
+            name = event.get("name")
+            detail = (event.get("args") or {}).get("detail")
+            if not detail:
+                continue
+            if name == "Source":
+                totals = headers
+            elif name in ("InstantiateClass", "InstantiateFunction"):
+                totals = templates
+            else:
+                continue
+            entry = totals.setdefault(detail, [0.0, 0])
+            entry[0] += event.get("dur", 0) / 1_000_000
+            entry[1] += 1
+
+    def ranked(totals: Dict[str, List[float]]) -> List[Tuple[str, float, int]]:
+        return sorted(
+            ((name, seconds, int(count)) for name, (seconds, count) in totals.items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+    return ranked(headers), ranked(templates)
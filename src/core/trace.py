@@ -0,0 +1,121 @@
+"""Build timing traces in Chrome trace-event format."""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+import json
+import os
+import threading
+import time
+
+
+class BuildTrace:
+    """
+    Collects timed build steps and writes them as trace-event JSON.
+
+    Every step becomes a complete ("X") event with microsecond timestamps
+    relative to the start of the build. Steps on the main thread use
+    tid 0 and scheduler jobs use their worker id + 1, so chrome://tracing
+    and Perfetto show one row per worker and stragglers or idle workers
+    stand out.
+    """
+
+    MAIN_TID = 0
+
+    def __init__(self):
+        """Initialize an empty trace starting now."""
+        self.origin = time.perf_counter()
+        self.events: List[Dict[str, Any]] = []
+        self._tids = {self.MAIN_TID}
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        end: float,
+        tid: int = MAIN_TID,
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Record a finished step.
+
+        Args:
+            name: Step name shown in the viewer.
+            category: Step category (e.g. 'compile', 'link', 'setup').
+            start: Start time from time.perf_counter().
+            end: End time from time.perf_counter().
+            tid: Row to show the step on (0 for the main thread).
+            args: Extra details shown when the step is selected.
+        """
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - self.origin) * 1_000_000, 1),
+            "dur": round((end - start) * 1_000_000, 1),
+            "pid": 1,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+            self._tids.add(tid)
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        category: str = "setup",
+        args: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Time a block on the main thread.
+
+        Args:
+            name: Step name shown in the viewer.
+            category: Step category.
+            args: Extra details; the block may add more through the
+                yielded dictionary.
+
+        Yields:
+            Dictionary of event args.
+        """
+        args = dict(args or {})
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add(name, category, start, time.perf_counter(), self.MAIN_TID, args)
+
+    def save(self, path: Path) -> None:
+        """
+        Write the trace as JSON loadable by chrome://tracing or Perfetto.
+
+        Args:
+            path: Output file.
+        """
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": 1,
+                "tid": tid,
+                "args": {"name": "main" if tid == self.MAIN_TID else f"worker {tid - 1}"},
+            }
+            for tid in sorted(self._tids)
+        ]
+        metadata.append(
+            {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "sugar-builder"}}
+        )
+        with self._lock:
+            events = metadata + sorted(self.events, key=lambda event: event["ts"])
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,128 @@
+"""Unity (jumbo) build batching."""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+import os
+from .sources import matches_any
+
+
+UNITY_HEADER = "// Generated by SugarBuilder (unity build). Do not edit.\n"
+
+
+@dataclass
+class UnityBatch:
+    """A generated unity source and the sources it includes."""
+
+    path: Path
+    sources: List[Path]
+
+
+class UnityBuilder:
+    """
+    Combines sources into unity files that #include several of them.
+
+    Sources are grouped by directory (and by language, so C and C++ never
+    mix) and split into batches of at most `batch_size` files in sorted
+    order. Each unity file includes its members by absolute path, so
+    diagnostics still name the original file and line, and the compiler's
+    depfile lists the members: editing one source only rebuilds its batch.
+    Unity files are rewritten only when their contents change, which keeps
+    their mtime, and with it every other batch, stable across builds.
+    """
+
+    def __init__(self, unity_dir: Path, batch_size: int, exclude: Iterable[str] = ()):
+        """
+        Initialize unity builder.
+
+        Args:
+            unity_dir: Directory for the generated unity sources.
+            batch_size: Maximum number of sources per unity file.
+            exclude: Glob patterns (relative to the project root) for
+                sources that must be compiled on their own.
+        """
+        self.unity_dir = Path(unity_dir)
+        self.batch_size = batch_size
+        self.exclude = list(exclude)
+
+    def plan(
+        self,
+        sources: Iterable[Path],
+        relative_path: Callable[[Path], str],
+    ) -> Tuple[List[UnityBatch], List[Path]]:
+        """
+        Split sources into unity batches and standalone sources.
+
+        Args:
+            sources: Source files of a target.
+            relative_path: Maps a source to its path relative to the
+                project root (see Project.get_relative_source_path).
+
+        Returns:
+            Tuple of (batches, sources compiled individually). Excluded
+            sources and batches that would hold a single file end up in
+            the second list.
+        """
+        groups: Dict[Tuple[str, str], List[Path]] = {}
+        singles: List[Path] = []
+        for source in sources:
+            rel = relative_path(source)
+            if self.exclude and matches_any(rel.replace(os.sep, "/"), self.exclude):
+                singles.append(source)
+                continue
+            ext = ".c" if source.suffix == ".c" else ".cpp"
+            groups.setdefault((os.path.dirname(rel), ext), []).append(source)
+
+        batches: List[UnityBatch] = []
+        for (rel_dir, ext), members in sorted(groups.items()):
+            members.sort()
+            for index, start in enumerate(range(0, len(members), self.batch_size)):
+                chunk = members[start:start + self.batch_size]
+                if len(chunk) == 1:
+                    singles.extend(chunk)
+                    continue
+                path = self.unity_dir / rel_dir / f"unity_{index}{ext}"
+                batches.append(UnityBatch(path, chunk))
+
+        singles.sort()
+        return batches, singles
+
+    def write(self, batches: List[UnityBatch]) -> int:
+        """
+        Write unity sources and delete ones no longer in use.
+
+        Args:
+            batches: Batches from plan().
+
+        Returns:
+            Number of unity files created or changed.
+        """
+        written = 0
+        wanted = set()
+        for batch in batches:
+            wanted.add(os.path.normcase(os.path.abspath(batch.path)))
+            lines = [UNITY_HEADER]
+            for source in batch.sources:
+                include = Path(os.path.abspath(source)).as_posix()
+                lines.append(f'#include "{include}"\n')
+            content = "".join(lines)
+
+            try:
+                if batch.path.read_text(encoding="utf-8") == content:
+                    continue
+            except OSError:
+                pass
+            batch.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = batch.path.with_name(batch.path.name + ".tmp")
+            tmp_path.write_text(content, encoding="utf-8")
+            os.replace(tmp_path, batch.path)
+            written += 1
+
+        # Remove batches left over from a larger or differently split tree
+        if self.unity_dir.exists():
+            for directory, _, files in os.walk(self.unity_dir):
+                for name in files:
+                    path = os.path.join(directory, name)
+                    if name.startswith("unity_") and os.path.normcase(os.path.abspath(path)) not in wanted:
+                        os.unlink(path)
+        return written
@@ -0,0 +1,461 @@
+"""File system change watching."""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+# Change kinds reported by watchers
+ADDED = "added"
+REMOVED = "removed"
+MODIFIED = "modified"
+# Events were lost; anything under the watched roots may have changed
+RESCAN = "rescan"
+
+# (kind, path) of one changed file
+Change = Tuple[str, Path]
+
+
+class PollingWatcher:
+    """
+    Detects file changes by periodically re-scanning directory trees.
+
+    Every file under the watched roots (and each extra watched file) is
+    recorded with its (mtime, size). wait() re-scans every `interval`
+    seconds until something differs. Works on every platform and file
+    system, at the cost of a stat per file per scan.
+    """
+
+    def __init__(
+        self,
+        roots: Iterable[Path],
+        files: Iterable[Path] = (),
+        skip_dirs: Iterable[Path] = (),
+        interval: float = 1.0,
+    ):
+        """
+        Initialize watcher and take the first snapshot.
+
+        Args:
+            roots: Directories to watch recursively.
+            files: Individual files to watch (e.g. sugar.toml, headers
+                outside the roots).
+            skip_dirs: Directories not to descend into (build output).
+            interval: Seconds between scans.
+        """
+        self.roots = [Path(os.path.abspath(root)) for root in roots]
+        self.files = [Path(os.path.abspath(path)) for path in files]
+        self.skip_dirs = {os.path.abspath(path) for path in skip_dirs}
+        self.interval = interval
+        self._closed = threading.Event()
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """Stat every watched file."""
+        snapshot: Dict[str, Tuple[int, int]] = {}
+        stack = [str(root) for root in self.roots]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=True):
+                                if entry.path not in self.skip_dirs:
+                                    stack.append(entry.path)
+                                continue
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        snapshot[entry.path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                continue
+        for path in self.files:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snapshot[str(path)] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def watch_files(self, files: Iterable[Path]) -> None:
+        """
+        Also watch individual files from now on.
+
+        Args:
+            files: Files to add (already watched ones are ignored).
+        """
+        known = set(self.files)
+        for path in files:
+            path = Path(os.path.abspath(path))
+            if path in known:
+                continue
+            known.add(path)
+            self.files.append(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            self._snapshot[str(path)] = (st.st_mtime_ns, st.st_size)
+
+    def poll(self) -> List[Change]:
+        """
+        Scan once and report what changed since the previous scan.
+
+        Returns:
+            List of (kind, path) changes, empty if nothing changed.
+        """
+        snapshot = self._scan()
+        previous = self._snapshot
+        self._snapshot = snapshot
+        changes: List[Change] = []
+        for path, stamp in snapshot.items():
+            old = previous.get(path)
+            if old is None:
+                changes.append((ADDED, Path(path)))
+            elif old != stamp:
+                changes.append((MODIFIED, Path(path)))
+        for path in previous.keys() - snapshot.keys():
+            changes.append((REMOVED, Path(path)))
+        return changes
+
+    def wait(self, timeout: Optional[float] = None) -> List[Change]:
+        """
+        Block until files change.
+
+        Args:
+            timeout: Give up after this many seconds (None waits forever).
+
+        Returns:
+            Changes found, or an empty list on timeout or close().
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._closed.is_set():
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, deadline - time.monotonic())
+                if delay <= 0:
+                    return []
+            if self._closed.wait(delay):
+                break
+            changes = self.poll()
+            if changes:
+                return changes
+        return []
+
+    def close(self) -> None:
+        """Stop watching and wake up a blocked wait()."""
+        self._closed.set()
+
+
+class InotifyWatcher:
+    """
+    Detects file changes with Linux inotify, through ctypes.
+
+    Every directory under the watched roots gets a watch, and new
+    directories are added as they appear. Individual files are watched
+    through their parent directory, since editors often replace a file
+    instead of writing to it. Events queue up in the kernel, so changes
+    made while nobody is waiting (e.g. during a build) are not lost.
+    """
+
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    MASK = (
+        IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+        | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    )
+    EVENT_HEADER = struct.Struct("iIII")
+
+    _libc = None
+
+    @classmethod
+    def available(cls) -> bool:
+        """Check whether inotify can be used on this system."""
+        if not sys.platform.startswith("linux"):
+            return False
+        if cls._libc is None:
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+                libc.inotify_init1.argtypes = [ctypes.c_int]
+                libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            except (OSError, AttributeError):
+                return False
+            cls._libc = libc
+        return True
+
+    def __init__(
+        self,
+        roots: Iterable[Path],
+        files: Iterable[Path] = (),
+        skip_dirs: Iterable[Path] = (),
+    ):
+        """
+        Initialize watcher and add watches.
+
+        Args:
+            roots: Directories to watch recursively.
+            files: Individual files to watch.
+            skip_dirs: Directories not to descend into (build output).
+
+        Raises:
+            OSError: If inotify is unavailable or out of resources.
+        """
+        if not self.available():
+            raise OSError("inotify is not available")
+        self.roots = [Path(os.path.abspath(root)) for root in roots]
+        self.skip_dirs = {os.path.abspath(path) for path in skip_dirs}
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._wake_r, self._wake_w = os.pipe()
+        self._closed = False
+        # Guards _closed and _waiting, so the descriptors are released by
+        # close() or by the last wait() to return, never while in select()
+        self._lock = threading.Lock()
+        self._waiting = 0
+        # watch descriptor -> directory
+        self._dirs: Dict[int, str] = {}
+        # watch descriptor -> file names watched in that directory, for
+        # directories that are only watched for individual files
+        self._file_names: Dict[int, Set[str]] = {}
+        self._recursive: Set[int] = set()
+        for root in self.roots:
+            self._watch_tree(str(root), [])
+        self.watch_files(files)
+
+    def _add_watch(self, directory: str) -> Optional[int]:
+        """Watch a directory, returning its watch descriptor."""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            return None
+        self._dirs[wd] = directory
+        return wd
+
+    def _watch_tree(self, directory: str, found: List[str]) -> None:
+        """
+        Watch a directory and its subdirectories recursively.
+
+        Args:
+            directory: Directory to watch.
+            found: Receives the files already present, which may have been
+                created before the watch was in place.
+        """
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            wd = self._add_watch(current)
+            if wd is None:
+                continue
+            self._recursive.add(wd)
+            self._file_names.pop(wd, None)
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=True):
+                                if entry.path not in self.skip_dirs:
+                                    stack.append(entry.path)
+                            else:
+                                found.append(entry.path)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    def watch_files(self, files: Iterable[Path]) -> None:
+        """
+        Also watch individual files from now on.
+
+        Args:
+            files: Files to add (already watched ones are ignored).
+        """
+        for path in files:
+            directory, name = os.path.split(os.path.abspath(path))
+            wd = self._add_watch(directory)
+            if wd is None or wd in self._recursive:
+                continue
+            self._file_names.setdefault(wd, set()).add(name)
+
+    def poll(self) -> List[Change]:
+        """
+        Read the events queued since the last call, without blocking.
+
+        Returns:
+            List of (kind, path) changes, empty if nothing changed.
+        """
+        changes: List[Change] = []
+        while not self._closed:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset + self.EVENT_HEADER.size <= len(data):
+                wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                self._handle_event(wd, mask, name, changes)
+        return changes
+
+    def _handle_event(self, wd: int, mask: int, name: str, changes: List[Change]) -> None:
+        """Translate one inotify event into changes."""
+        if mask & self.IN_Q_OVERFLOW:
+            changes.extend((RESCAN, root) for root in self.roots)
+            return
+        directory = self._dirs.get(wd)
+        if directory is None:
+            return
+        if mask & self.IN_IGNORED:
+            # The directory was deleted or unmounted
+            del self._dirs[wd]
+            self._recursive.discard(wd)
+            self._file_names.pop(wd, None)
+            return
+        if not name:
+            return  # Event on the watched directory itself
+        names = self._file_names.get(wd)
+        if names is not None and name not in names:
+            return
+
+        path = os.path.join(directory, name)
+        if mask & self.IN_ISDIR:
+            if wd not in self._recursive or path in self.skip_dirs:
+                return
+            if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                found: List[str] = []
+                self._watch_tree(path, found)
+                changes.extend((ADDED, Path(file_path)) for file_path in found)
+            elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                changes.append((REMOVED, Path(path)))
+        elif mask & (self.IN_CREATE | self.IN_MOVED_TO):
+            changes.append((ADDED, Path(path)))
+        elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+            changes.append((REMOVED, Path(path)))
+        elif mask & (self.IN_CLOSE_WRITE | self.IN_ATTRIB):
+            changes.append((MODIFIED, Path(path)))
+
+    def wait(self, timeout: Optional[float] = None) -> List[Change]:
+        """
+        Block until files change.
+
+        Args:
+            timeout: Give up after this many seconds (None waits forever).
+
+        Returns:
+            Changes found, or an empty list on timeout or close().
+        """
+        with self._lock:
+            if self._closed:
+                return []
+            self._waiting += 1
+        try:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._closed:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                ready, _, _ = select.select([self._fd, self._wake_r], [], [], remaining)
+                if self._closed or self._wake_r in ready:
+                    break
+                if not ready:
+                    return []
+                changes = self.poll()
+                if changes:
+                    return changes
+            return []
+        finally:
+            with self._lock:
+                self._waiting -= 1
+                if self._closed and not self._waiting:
+                    self._release()
+
+    def close(self) -> None:
+        """Stop watching and wake up a blocked wait()."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._waiting:
+                # The waiting thread releases the descriptors on its way out
+                os.write(self._wake_w, b"x")
+            else:
+                self._release()
+
+    def _release(self) -> None:
+        """Close the inotify descriptor and the wake-up pipe."""
+        os.close(self._fd)
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+
+def create_watcher(
+    roots: Iterable[Path],
+    files: Iterable[Path] = (),
+    skip_dirs: Iterable[Path] = (),
+):
+    """
+    Create the best available watcher for this platform.
+
+    Uses inotify on Linux and falls back to polling elsewhere, or when
+    inotify cannot be set up (e.g. the watch limit is reached).
+
+    Args:
+        roots: Directories to watch recursively.
+        files: Individual files to watch.
+        skip_dirs: Directories not to descend into.
+
+    Returns:
+        InotifyWatcher or PollingWatcher.
+    """
+    roots = list(roots)
+    files = list(files)
+    skip_dirs = list(skip_dirs)
+    if InotifyWatcher.available():
+        try:
+            return InotifyWatcher(roots, files, skip_dirs)
+        except OSError:
+            pass
+    return PollingWatcher(roots, files, skip_dirs)
+
+
+def collect_changes(watcher, quiet: float = 0.2) -> List[Change]:
+    """
+    Wait for a burst of changes to finish.
+
+    Blocks until something changes, then keeps collecting until no new
+    change arrives for `quiet` seconds, so saving many files (or an editor
+    writing one file in several steps) triggers a single rebuild.
+
+    Args:
+        watcher: InotifyWatcher or PollingWatcher.
+        quiet: Seconds without changes that end the burst.
+
+    Returns:
+        All changes of the burst, empty if the watcher was closed.
+    """
+    changes = watcher.wait()
+    while changes:
+        more = watcher.wait(quiet)
+        if not more:
+            break
+        changes.extend(more)
+    return changes
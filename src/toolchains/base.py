@@ -1,7 +1,184 @@
 """Base toolchain abstraction."""
 
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
 from pathlib import Path
+import asyncio
+import hashlib
+import locale
+import os
+import shutil
+import sys
+import threading
+from src.core.cache import CompileCache
+from src.core.distributed import WorkerPool
+from .probe import ToolchainInfo, ToolchainProbe
+
+
+# Tool output kept in memory per process; anything beyond is only streamed
+MAX_RETAINED_OUTPUT = 64 * 1024
+
+# Longest line held back waiting for its newline
+MAX_LINE_LENGTH = 64 * 1024
+
+# Serializes console output, so lines from parallel jobs never mix
+OUTPUT_LOCK = threading.Lock()
+
+
+def write_output(text: str) -> None:
+    """
+    Write text to stdout as one unit.
+    
+    Args:
+        text: Complete line(s), including the trailing newline.
+    """
+    with OUTPUT_LOCK:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+
+def decode_output(data: bytes) -> str:
+    """
+    Decode tool output for display.
+    
+    Args:
+        data: Raw bytes printed by a compiler, linker or archiver.
+        
+    Returns:
+        Text in the locale encoding, with undecodable bytes replaced.
+    """
+    return data.decode(locale.getpreferredencoding(False), errors="replace")
+
+
+@dataclass
+class ProcessResult:
+    """Exit status and retained output of a tool run."""
+    
+    returncode: int
+    # Combined stdout/stderr, up to MAX_RETAINED_OUTPUT bytes
+    output: bytes = b""
+    # Bytes of output that were not retained
+    truncated: int = 0
+    
+    def text(self) -> str:
+        """Get the retained output as text (decoded on demand)."""
+        return decode_output(self.output)
+
+
+class _LineSplitter:
+    """Splits a tool's output stream into lines, filtering and retaining them."""
+    
+    def __init__(
+        self,
+        line_filter: Optional[Callable[[bytes], bool]],
+        echo: bool,
+        max_retained: int,
+    ):
+        self.line_filter = line_filter
+        self.echo = echo
+        self.max_retained = max_retained
+        self.retained = bytearray()
+        self.truncated = 0
+        self._pending = b""
+    
+    def _handle(self, line: bytes) -> None:
+        if self.line_filter is not None and not self.line_filter(line):
+            return
+        if len(self.retained) + len(line) <= self.max_retained:
+            self.retained.extend(line)
+        else:
+            self.truncated += len(line)
+        if self.echo:
+            write_output("  " + decode_output(line).rstrip("\r\n") + "\n")
+    
+    def feed(self, chunk: bytes) -> None:
+        """Handle every complete line in a chunk of output."""
+        pending = self._pending + chunk
+        start = 0
+        while True:
+            end = pending.find(b"\n", start)
+            if end < 0:
+                break
+            self._handle(pending[start:end + 1])
+            start = end + 1
+        pending = pending[start:]
+        if len(pending) > MAX_LINE_LENGTH:
+            self._handle(pending)
+            pending = b""
+        self._pending = pending
+    
+    def finish(self, returncode: int) -> ProcessResult:
+        """Handle an unterminated last line and build the result."""
+        if self._pending:
+            self._handle(self._pending)
+            self._pending = b""
+        return ProcessResult(returncode, bytes(self.retained), self.truncated)
+
+
+async def run_process_async(
+    cmd: List[str],
+    line_filter: Optional[Callable[[bytes], bool]] = None,
+    echo: bool = True,
+    max_retained: int = MAX_RETAINED_OUTPUT,
+) -> ProcessResult:
+    """
+    Run a tool, streaming its output line by line as it is produced.
+    
+    stdout and stderr are read as one byte stream, in the order the tool
+    wrote them. Each complete line is passed to line_filter, then echoed
+    indented under OUTPUT_LOCK, so parallel jobs interleave whole lines.
+    Lines are decoded only when echoed, and at most max_retained bytes are
+    kept for the caller. Waiting on the tool does not block the event loop,
+    so many tools can run from one thread.
+    
+    Args:
+        cmd: Command line to run.
+        line_filter: Called with each raw line (including its newline);
+            returning False consumes the line (neither echoed nor retained).
+        echo: Print lines as they arrive.
+        max_retained: Maximum bytes of output to keep in the result.
+        
+    Returns:
+        ProcessResult with the exit code and retained output.
+        
+    Raises:
+        OSError: If the tool cannot be started (FileNotFoundError if missing).
+    """
+    splitter = _LineSplitter(line_filter, echo, max_retained)
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+    try:
+        while True:
+            chunk = await proc.stdout.read(65536)
+            if not chunk:
+                break
+            splitter.feed(chunk)
+        returncode = await proc.wait()
+    except BaseException:
+        # Cancelled: do not leave the tool running
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    return splitter.finish(returncode)
+
+
+def run_process(
+    cmd: List[str],
+    line_filter: Optional[Callable[[bytes], bool]] = None,
+    echo: bool = True,
+    max_retained: int = MAX_RETAINED_OUTPUT,
+) -> ProcessResult:
+    """
+    Run a tool and wait for it (see run_process_async()).
+    
+    Must not be called from a running event loop.
+    """
+    return asyncio.run(run_process_async(cmd, line_filter, echo, max_retained))
 
 
 class Toolchain:
@@ -9,8 +186,48 @@ class Toolchain:
     Abstract toolchain for C++ compilation and linking.
     
     Defines interface for compiling sources and linking object files.
+    
+    When a CompileCache is attached, compile_object looks up each object by
+    a key built from the compiler identity, the compile command and the
+    preprocessed source, and restores hits instead of compiling.
+    
+    Compiling and linking are coroutines (compile_object_async(),
+    link_executable_async(), ...) that run tools with asyncio
+    subprocesses, so one event loop can drive many jobs at once. The
+    synchronous methods of the same names run them to completion.
     """
     
+    # Flags that embed the working directory in objects (debug info)
+    DEBUG_FLAG_PREFIXES = ("-g",)
+    
+    # Extension appended to a header's name for its precompiled form
+    PCH_EXTENSION = ".pch"
+    
+    # Link commands longer than this (in characters) pass their arguments
+    # in a response file; below the 8191 characters cmd.exe accepts
+    RESPONSE_FILE_THRESHOLD = 8000
+    RESPONSE_FILE_ENCODING = "utf-8"
+    
+    # Linkers the `linker` setting may select for this toolchain
+    SUPPORTED_LINKERS: Tuple[str, ...] = ()
+    
+    # Whether the archiver can create thin archives
+    SUPPORTS_THIN_ARCHIVES = False
+    
+    # Link-time optimization modes the `lto` setting may select
+    LTO_MODES: Tuple[str, ...] = ()
+    
+    # Whether builds can be instrumented for and optimized with PGO
+    SUPPORTS_PGO = False
+    
+    # Whether compiles can be preprocessed here and compiled on workers
+    SUPPORTS_DISTRIBUTED = False
+    
+    # Profile data in the profile directory: what training runs write and
+    # what optimized builds read
+    RAW_PROFILE_PATTERNS: Tuple[str, ...] = ()
+    PROFILE_PATTERNS: Tuple[str, ...] = ()
+    
     def __init__(self, name: str):
         """
         Initialize toolchain.
@@ -19,6 +236,492 @@ class Toolchain:
             name: Toolchain name (MSVC, GCC, Clang).
         """
         self.name = name
+        # Resolved tools and system directories, cached across runs
+        self.info: ToolchainInfo = ToolchainProbe().lookup(
+            name, self.get_install_roots(), self.probe
+        )
+        self.cache: Optional[CompileCache] = None
+        # Compile workers to send compiles to, if distributed
+        self.distributor: Optional[WorkerPool] = None
+        # Header every compile command uses in precompiled form, if any
+        self.precompiled_header: Optional[Path] = None
+        # Where response files go (defaults to next to the output)
+        self.response_file_dir: Optional[Path] = None
+        # Linker chosen by set_linker(), None for the compiler's default
+        self.linker: Optional[str] = None
+        # Static libraries reference their objects instead of copying them
+        self.thin_archives = False
+        # Link-time optimization mode, None when off
+        self.lto: Optional[str] = None
+        # Where incremental LTO links keep their cache
+        self.lto_cache_dir: Optional[Path] = None
+        # PGO mode ('instrument' or 'optimize'), None when off
+        self.pgo: Optional[str] = None
+        # Where instrumented programs write profiles (absolute)
+        self.profile_dir: Optional[Path] = None
+        self._profile_stamp: Optional[str] = None
+        self._identity: Optional[str] = None
+        # Cache keys computed ahead of compile_object, by output path
+        self._prepared_keys: Dict[str, Optional[str]] = {}
+        self._prepared_lock = threading.Lock()
+    
+    @classmethod
+    def get_install_roots(cls) -> List[Path]:
+        """
+        Get install directories searched when probing this toolchain.
+        
+        Their modification times are part of the probe cache key, so
+        installing or removing a version there triggers a new probe.
+        
+        Returns:
+            List of install directories (may not exist).
+        """
+        return []
+    
+    @classmethod
+    def probe(cls) -> ToolchainInfo:
+        """
+        Discover the installed toolchain.
+        
+        Called only when the per-user probe cache is missing or stale.
+        
+        Returns:
+            ToolchainInfo with resolved tools, version and system directories.
+        """
+        raise NotImplementedError("Subclasses must implement probe()")
+    
+    def get_version(self) -> str:
+        """
+        Get the compiler version found by the probe.
+        
+        Returns:
+            Version string, or an empty string if it could not be determined.
+        """
+        return self.info.version
+    
+    def set_linker(self, setting: str) -> None:
+        """
+        Choose the linker for executables and shared libraries.
+        
+        Args:
+            setting: 'auto' (the fastest supported linker the probe found),
+                'default' (the compiler's own choice) or a linker name.
+                
+        Raises:
+            ValueError: If this toolchain cannot use the named linker.
+        """
+        if setting == "default":
+            self.linker = None
+        elif setting == "auto":
+            self.linker = next(
+                (name for name in self.info.linkers if name in self.SUPPORTED_LINKERS), None
+            )
+        elif setting in self.SUPPORTED_LINKERS:
+            self.linker = setting
+        else:
+            raise ValueError(f"The {self.name} toolchain cannot use the {setting} linker.")
+    
+    def set_thin_archives(self, enabled: bool) -> None:
+        """
+        Choose whether static libraries are thin archives.
+        
+        Args:
+            enabled: Create thin archives.
+            
+        Raises:
+            ValueError: If this toolchain cannot create thin archives.
+        """
+        if enabled and not self.SUPPORTS_THIN_ARCHIVES:
+            raise ValueError(f"The {self.name} toolchain cannot create thin archives.")
+        self.thin_archives = enabled
+    
+    def get_linker_flags(self) -> List[str]:
+        """
+        Get the link flags that select the chosen linker.
+        
+        Returns:
+            Flags for executable and shared library links, or an empty
+            list for the default linker.
+        """
+        return []
+    
+    def set_lto(self, mode: Optional[str]) -> None:
+        """
+        Choose the link-time optimization mode.
+        
+        Args:
+            mode: 'thin' (parallel, incremental), 'full' (whole program in
+                one unit) or None for no LTO.
+                
+        Raises:
+            ValueError: If this toolchain cannot use the mode.
+        """
+        if mode is not None and mode not in self.LTO_MODES:
+            raise ValueError(f"The {self.name} toolchain cannot use {mode} LTO.")
+        self.lto = mode
+    
+    def set_pgo(self, mode: Optional[str], profile_dir: Optional[Path] = None) -> None:
+        """
+        Choose the profile-guided optimization mode.
+        
+        'instrument' builds programs that write profiles to profile_dir when
+        run; 'optimize' compiles with the profiles found there, merging raw
+        ones first if the toolchain needs that. The profiles are part of
+        get_identity() while optimizing, so new ones rebuild everything.
+        
+        Args:
+            mode: 'instrument', 'optimize' or None for no PGO.
+            profile_dir: Directory holding the profiles.
+            
+        Raises:
+            ValueError: If this toolchain cannot use PGO or merging failed.
+            FileNotFoundError: If there are no profiles to optimize with.
+        """
+        self._profile_stamp = None
+        if mode is None:
+            self.pgo = None
+            return
+        if not self.SUPPORTS_PGO:
+            raise ValueError(f"The {self.name} toolchain cannot use profile-guided optimization.")
+        self.pgo = mode
+        self.profile_dir = Path(os.path.abspath(profile_dir))
+        if mode == "optimize":
+            if not self.merge_profiles():
+                raise ValueError(f"Cannot merge the profiles in {self.profile_dir}.")
+            profiles = self.get_profile_files()
+            if not profiles:
+                raise FileNotFoundError(
+                    f"No profiles in {self.profile_dir}. "
+                    "Build with --pgo instrument and run the program first."
+                )
+            digest = hashlib.sha256()
+            for path in profiles:
+                name = path.relative_to(self.profile_dir).as_posix()
+                digest.update(name.encode("utf-8") + b"\0" + path.read_bytes())
+            self._profile_stamp = digest.hexdigest()
+    
+    def _find_profile_data(self, patterns: Tuple[str, ...]) -> List[Path]:
+        """Find files matching any of the patterns in the profile directory."""
+        if self.profile_dir is None or not self.profile_dir.is_dir():
+            return []
+        return sorted({path for pattern in patterns for path in self.profile_dir.rglob(pattern)})
+    
+    def get_profile_files(self) -> List[Path]:
+        """
+        Get the profiles an optimized build reads.
+        
+        Returns:
+            Profile files in the profile directory, sorted.
+        """
+        return self._find_profile_data(self.PROFILE_PATTERNS)
+    
+    def clear_profiles(self) -> int:
+        """
+        Delete raw and merged profiles, before a fresh training run.
+        
+        Returns:
+            Number of files deleted.
+        """
+        files = self._find_profile_data(self.RAW_PROFILE_PATTERNS + self.PROFILE_PATTERNS)
+        for path in files:
+            path.unlink(missing_ok=True)
+        return len(files)
+    
+    def merge_profiles(self) -> bool:
+        """
+        Merge raw profiles from training runs into what builds read.
+        
+        Returns:
+            True on success (including when there is nothing to merge).
+        """
+        return True
+    
+    def get_optimization_flags(self) -> List[str]:
+        """
+        Get the compile flags for the LTO and PGO settings.
+        
+        Returns:
+            Flags for every compile, including the precompiled header.
+        """
+        return []
+    
+    def get_optimization_link_flags(self) -> List[str]:
+        """
+        Get the link flags for the LTO and PGO settings.
+        
+        Returns:
+            Flags for executable and shared library links.
+        """
+        return []
+    
+    def get_compiler_executable(self) -> str:
+        """
+        Get the compiler executable used by this toolchain.
+        
+        Returns:
+            Compiler executable name or path (e.g., 'g++', 'cl.exe').
+        """
+        raise NotImplementedError("Subclasses must implement get_compiler_executable()")
+    
+    def get_identity(self) -> str:
+        """
+        Get a string identifying the exact compiler binary in use.
+        
+        Combines the toolchain name with the resolved compiler path and its
+        size/mtime, so upgrading the compiler invalidates previous build
+        results. Computed once per toolchain instance; builds optimized
+        with profiles add a hash of the profiles.
+        
+        Returns:
+            Toolchain identity string.
+        """
+        if self._identity is None:
+            exe = self.get_compiler_executable()
+            resolved = shutil.which(exe) or exe
+            try:
+                st = os.stat(resolved)
+                stamp = f"{st.st_size}:{st.st_mtime_ns}"
+            except OSError:
+                stamp = "missing"
+            self._identity = f"{self.name}:{resolved}:{stamp}"
+        if self._profile_stamp is not None:
+            return f"{self._identity}:profile:{self._profile_stamp}"
+        return self._identity
+    
+    def get_compile_command(
+        self,
+        source_file: Path,
+        output_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Build the command line that compiles a source file.
+        
+        Args:
+            source_file: Path to source file.
+            output_file: Path to output object file.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Command line as a list of arguments.
+        """
+        raise NotImplementedError("Subclasses must implement get_compile_command()")
+    
+    def get_depfile_path(self, output_file: Path) -> Path:
+        """
+        Get the path of the depfile written alongside an object file.
+        
+        Args:
+            output_file: Path to the object file.
+            
+        Returns:
+            Path to the Makefile-style depfile listing the object's headers.
+        """
+        return output_file.with_suffix(".d")
+    
+    def get_preprocess_command(
+        self,
+        source_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Build the command line that preprocesses a source file to stdout.
+        
+        Args:
+            source_file: Path to source file.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Command line as a list of arguments.
+        """
+        raise NotImplementedError("Subclasses must implement get_preprocess_command()")
+    
+    def get_pch_path(self, header: Path) -> Path:
+        """
+        Get the path of the precompiled form of a header.
+        
+        Args:
+            header: Header being precompiled.
+            
+        Returns:
+            Path next to the header with PCH_EXTENSION appended.
+        """
+        return header.with_name(header.name + self.PCH_EXTENSION)
+    
+    def get_pch_compile_command(
+        self,
+        header: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Build the command line that precompiles a header.
+        
+        Args:
+            header: Header to precompile.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Command line as a list of arguments.
+        """
+        raise NotImplementedError("Subclasses must implement get_pch_compile_command()")
+    
+    def get_pch_flags(self) -> List[str]:
+        """
+        Get the compile flags that make a source use precompiled_header.
+        
+        Returns:
+            Flags added to every compile command while a PCH is configured.
+        """
+        raise NotImplementedError("Subclasses must implement get_pch_flags()")
+    
+    def get_pch_object(self) -> Optional[Path]:
+        """
+        Get an object file produced with the precompiled header, if any.
+        
+        Returns:
+            Object that must be linked alongside PCH users, or None.
+        """
+        return None
+    
+    def compile_precompiled_header(
+        self,
+        header: Path,
+        pch_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> bool:
+        """Precompile a header (see compile_precompiled_header_async())."""
+        return asyncio.run(self.compile_precompiled_header_async(header, pch_file, include_dirs, flags))
+    
+    async def compile_precompiled_header_async(
+        self,
+        header: Path,
+        pch_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        Precompile a header, bypassing the compile cache.
+        
+        Args:
+            header: Header to precompile.
+            pch_file: Output path, as returned by get_pch_path(header).
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            True if compilation succeeded, False otherwise.
+        """
+        cmd = self.get_pch_compile_command(header, include_dirs, flags)
+        return await self._run_compiler(cmd, header, pch_file)
+    
+    def get_cache_key(
+        self,
+        source_file: Path,
+        output_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> Optional[str]:
+        """Compute the compile cache key for a source file (see get_cache_key_async())."""
+        return asyncio.run(self.get_cache_key_async(source_file, output_file, include_dirs, flags))
+    
+    async def get_cache_key_async(
+        self,
+        source_file: Path,
+        output_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> Optional[str]:
+        """
+        Compute the compile cache key for a source file.
+        
+        The key covers the compiler identity, the compile command (with the
+        output and depfile paths masked so objects can be shared between
+        build directories), the preprocessed source, and the working
+        directory when debug info would embed it.
+        
+        Args:
+            source_file: Path to source file.
+            output_file: Path to output object file.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Cache key, or None if the source could not be preprocessed.
+        """
+        cmd = self.get_preprocess_command(source_file, include_dirs, flags)
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError:
+            return None
+        preprocessed, _ = await proc.communicate()
+        if proc.returncode != 0:
+            return None
+        
+        compile_cmd = self.get_compile_command(source_file, output_file, include_dirs, flags)
+        masks = {
+            str(output_file): "<output>",
+            str(self.get_depfile_path(output_file)): "<depfile>",
+        }
+        masked = []
+        for arg in compile_cmd:
+            for path, placeholder in masks.items():
+                arg = arg.replace(path, placeholder)
+            masked.append(arg)
+        
+        parts = [self.get_identity(), "\0".join(masked), preprocessed]
+        if any(arg.startswith(self.DEBUG_FLAG_PREFIXES) for arg in compile_cmd):
+            parts.append(os.getcwd())
+        return CompileCache.make_key(parts)
+    
+    def prepare_cache_key(
+        self,
+        source_file: Path,
+        output_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> Optional[str]:
+        """Compute a cache key ahead of compile_object (see prepare_cache_key_async())."""
+        return asyncio.run(self.prepare_cache_key_async(source_file, output_file, include_dirs, flags))
+    
+    async def prepare_cache_key_async(
+        self,
+        source_file: Path,
+        output_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> Optional[str]:
+        """
+        Compute a cache key ahead of compile_object.
+        
+        Lets the build prefetch remote entries for all pending objects at
+        once. The next compile_object call for output_file reuses the key
+        instead of preprocessing again.
+        
+        Args:
+            source_file: Path to source file.
+            output_file: Path to output object file.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Cache key, or None if the source could not be preprocessed.
+        """
+        key = await self.get_cache_key_async(source_file, output_file, include_dirs, flags)
+        with self._prepared_lock:
+            self._prepared_keys[str(output_file)] = key
+        return key
     
     def compile_object(
         self,
@@ -26,9 +729,22 @@ class Toolchain:
         output_file: Path,
         include_dirs: Optional[List[Path]] = None,
         flags: Optional[List[str]] = None,
+    ) -> bool:
+        """Compile a source file to an object file (see compile_object_async())."""
+        return asyncio.run(self.compile_object_async(source_file, output_file, include_dirs, flags))
+    
+    async def compile_object_async(
+        self,
+        source_file: Path,
+        output_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
     ) -> bool:
         """
-        Compile a source file to an object file.
+        Compile a source file to an object file, using the cache if attached.
+        
+        Cache restores and stores may touch the network (remote cache), so
+        they run on a worker thread rather than blocking the event loop.
         
         Args:
             source_file: Path to source file.
@@ -39,7 +755,299 @@ class Toolchain:
         Returns:
             True if compilation succeeded, False otherwise.
         """
-        raise NotImplementedError("Subclasses must implement compile_object()")
+        if self.cache is None:
+            return await self._compile(source_file, output_file, include_dirs, flags)
+        
+        outputs = {
+            "object": output_file,
+            "depfile": self.get_depfile_path(output_file),
+        }
+        with self._prepared_lock:
+            prepared = str(output_file) in self._prepared_keys
+            key = self._prepared_keys.pop(str(output_file), None)
+        if not prepared:
+            key = await self.get_cache_key_async(source_file, output_file, include_dirs, flags)
+        if key is not None and await asyncio.to_thread(self.cache.restore, key, outputs):
+            write_output(f"[{self.name}] Cached {source_file} -> {output_file}\n")
+            return True
+        
+        # Never write through a hardlink into a cache entry
+        for path in outputs.values():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        
+        if not await self._compile(source_file, output_file, include_dirs, flags):
+            return False
+        if key is not None:
+            await asyncio.to_thread(self.cache.store, key, outputs)
+        return True
+    
+    @staticmethod
+    def quote_response_arg(arg: str) -> str:
+        """
+        Quote an argument for a response file.
+        
+        Uses the GNU syntax (whitespace-separated, double quotes and
+        backslash escapes), which gcc, clang, ar and llvm-ar all read.
+        
+        Args:
+            arg: Command line argument.
+            
+        Returns:
+            Argument as written in the response file.
+        """
+        if arg and not any(c.isspace() or c in "\"'\\" for c in arg):
+            return arg
+        return '"' + arg.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    
+    def get_response_file_path(self, output_file: Path) -> Path:
+        """
+        Get the response file used when producing an output.
+        
+        Args:
+            output_file: Linked executable or library.
+            
+        Returns:
+            Path of the response file.
+        """
+        directory = self.response_file_dir or output_file.parent
+        return directory / f"{output_file.name}.rsp"
+    
+    def use_response_file(self, cmd: List[str], output_file: Path) -> List[str]:
+        """
+        Move a long command's arguments into a response file.
+        
+        Commands up to RESPONSE_FILE_THRESHOLD characters are returned
+        unchanged. Otherwise every argument after the tool is written to
+        the response file (only if its content changed, so unchanged links
+        reuse it) and the command becomes `<tool> @<response file>`.
+        
+        Args:
+            cmd: Link or archive command line.
+            output_file: Output of the command, naming the response file.
+            
+        Returns:
+            Command line to run.
+        """
+        if sum(len(arg) + 1 for arg in cmd) <= self.RESPONSE_FILE_THRESHOLD:
+            return cmd
+        
+        rsp_file = self.get_response_file_path(output_file)
+        content = "\n".join(self.quote_response_arg(arg) for arg in cmd[1:]) + "\n"
+        try:
+            unchanged = rsp_file.read_text(encoding=self.RESPONSE_FILE_ENCODING) == content
+        except (OSError, UnicodeError):
+            unchanged = False
+        if not unchanged:
+            rsp_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = rsp_file.with_name(f"{rsp_file.name}.{os.getpid()}.tmp")
+            tmp_file.write_text(content, encoding=self.RESPONSE_FILE_ENCODING)
+            os.replace(tmp_file, rsp_file)
+        return [cmd[0], f"@{rsp_file}"]
+    
+    async def _run_tool(
+        self,
+        cmd: List[str],
+        line_filter: Optional[Callable[[bytes], bool]] = None,
+    ) -> bool:
+        """
+        Run a compiler, linker or archiver command, streaming its output.
+        
+        Args:
+            cmd: Command line to run.
+            line_filter: Optional filter for output lines (see run_process_async()).
+            
+        Returns:
+            True if the tool exited successfully, False otherwise.
+        """
+        tool = Path(cmd[0]).name
+        try:
+            result = await run_process_async(cmd, line_filter)
+        except FileNotFoundError:
+            write_output(f"  Error: {tool} not found. Ensure {self.name} is installed and in PATH\n")
+            return False
+        except OSError as e:
+            write_output(f"  Error: {e}\n")
+            return False
+        if result.returncode != 0 and not result.output and not result.truncated:
+            write_output(f"  Error: {tool} exited with code {result.returncode}\n")
+        return result.returncode == 0
+    
+    def get_distributed_preprocess_command(
+        self,
+        source_file: Path,
+        output_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Build the command preprocessing a source file for a compile worker.
+        
+        It writes the preprocessed source to stdout and the object's
+        depfile, as the local compile would.
+        
+        Args:
+            source_file: Path to source file.
+            output_file: Path to output object file (names the depfile).
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Command line as a list of arguments.
+        """
+        raise NotImplementedError("Subclasses must implement get_distributed_preprocess_command()")
+    
+    def get_distributed_compile_args(self, flags: Optional[List[str]] = None) -> List[str]:
+        """
+        Get the arguments a worker compiles a preprocessed source with.
+        
+        Args:
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Arguments after the compiler, with the worker's input and output
+            files as {input} and {output}.
+        """
+        raise NotImplementedError("Subclasses must implement get_distributed_compile_args()")
+    
+    def can_distribute(self, flags: Optional[List[str]] = None) -> bool:
+        """
+        Check whether a compile may run on a worker.
+        
+        Compiles that read or write files next to the object (PGO profiles,
+        time traces) stay local.
+        
+        Args:
+            flags: Compiler flags of the compile.
+            
+        Returns:
+            True if the compile can be sent to a worker.
+        """
+        if not self.SUPPORTS_DISTRIBUTED or self.pgo is not None:
+            return False
+        trace_flags = self.get_time_trace_flags()
+        return not any(flag in trace_flags for flag in flags or [])
+    
+    async def _compile(
+        self,
+        source_file: Path,
+        output_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> bool:
+        """Compile on a worker if distributed, else (or when no worker can) locally."""
+        if self.distributor is not None and self.can_distribute(flags):
+            result = await self._compile_remote(source_file, output_file, include_dirs, flags)
+            if result is not None:
+                return result
+        return await self._invoke_compiler(source_file, output_file, include_dirs, flags)
+    
+    async def _compile_remote(
+        self,
+        source_file: Path,
+        output_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> Optional[bool]:
+        """
+        Preprocess a source file here and compile it on a worker.
+        
+        Args:
+            source_file: Path to source file.
+            output_file: Path to output object file.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Whether the compile on the worker succeeded, or None if it must
+            be compiled locally instead.
+        """
+        cmd = self.get_distributed_preprocess_command(source_file, output_file, include_dirs, flags)
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError:
+            self.distributor.note_fallback()
+            return None
+        preprocessed, diagnostics = await proc.communicate()
+        if proc.returncode != 0:
+            # The local compile reports the error
+            self.distributor.note_fallback()
+            return None
+        
+        # Workers run their own copy of the compiler, found by name
+        result = await self.distributor.compile(
+            os.path.basename(self.get_compiler_executable()),
+            self.get_version(),
+            self.get_distributed_compile_args(flags),
+            preprocessed,
+            os.getcwd(),
+        )
+        if result is None:
+            return None
+        
+        if result.exit_code == 0:
+            tmp_file = output_file.with_name(f"{output_file.name}.{os.getpid()}.tmp")
+            try:
+                tmp_file.write_bytes(result.object_data)
+                os.replace(tmp_file, output_file)
+            except OSError:
+                # Compiling locally reports the error if it persists
+                tmp_file.unlink(missing_ok=True)
+                self.distributor.note_fallback(compiled_remotely=True)
+                return None
+        
+        write_output(f"[{self.name}] Compiling {source_file} -> {output_file} on {result.worker}\n")
+        output = decode_output(diagnostics) + result.output
+        if output:
+            write_output("".join(f"  {line}\n" for line in output.splitlines()))
+        if result.exit_code != 0:
+            if not output:
+                tool = self.get_compiler_executable()
+                write_output(f"  Error: {tool} exited with code {result.exit_code} on {result.worker}\n")
+            return False
+        return True
+    
+    async def _invoke_compiler(
+        self,
+        source_file: Path,
+        output_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        Run the compiler on a source file.
+        
+        Args:
+            source_file: Path to source file.
+            output_file: Path to output object file.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            True if compilation succeeded, False otherwise.
+        """
+        raise NotImplementedError("Subclasses must implement _invoke_compiler()")
+    
+    async def _run_compiler(self, cmd: List[str], source_file: Path, output_file: Path) -> bool:
+        """
+        Run a compile command.
+        
+        Args:
+            cmd: Command line to run.
+            source_file: Source being compiled.
+            output_file: Output being produced.
+            
+        Returns:
+            True if compilation succeeded, False otherwise.
+        """
+        raise NotImplementedError("Subclasses must implement _run_compiler()")
     
     def link_executable(
         self,
@@ -48,6 +1056,17 @@ class Toolchain:
         lib_dirs: Optional[List[Path]] = None,
         libraries: Optional[List[str]] = None,
         flags: Optional[List[str]] = None,
+    ) -> bool:
+        """Link object files into an executable (see link_executable_async())."""
+        return asyncio.run(self.link_executable_async(object_files, output_file, lib_dirs, libraries, flags))
+    
+    async def link_executable_async(
+        self,
+        object_files: List[Path],
+        output_file: Path,
+        lib_dirs: Optional[List[Path]] = None,
+        libraries: Optional[List[str]] = None,
+        flags: Optional[List[str]] = None,
     ) -> bool:
         """
         Link object files into an executable.
@@ -62,13 +1081,22 @@ class Toolchain:
         Returns:
             True if linking succeeded, False otherwise.
         """
-        raise NotImplementedError("Subclasses must implement link_executable()")
+        raise NotImplementedError("Subclasses must implement link_executable_async()")
     
     def link_static_library(
         self,
         object_files: List[Path],
         output_file: Path,
         flags: Optional[List[str]] = None,
+    ) -> bool:
+        """Link object files into a static library (see link_static_library_async())."""
+        return asyncio.run(self.link_static_library_async(object_files, output_file, flags))
+    
+    async def link_static_library_async(
+        self,
+        object_files: List[Path],
+        output_file: Path,
+        flags: Optional[List[str]] = None,
     ) -> bool:
         """
         Link object files into a static library.
@@ -81,7 +1109,52 @@ class Toolchain:
         Returns:
             True if linking succeeded, False otherwise.
         """
-        raise NotImplementedError("Subclasses must implement link_static_library()")
+        raise NotImplementedError("Subclasses must implement link_static_library_async()")
+    
+    def can_update_static_library(self, members: List[Path]) -> bool:
+        """
+        Check whether a static library can be updated member by member.
+        
+        Args:
+            members: Every object file in the library, current or removed.
+            
+        Returns:
+            True if update_static_library_async() can be used on it.
+        """
+        return False
+    
+    def update_static_library(
+        self,
+        output_file: Path,
+        changed: List[Path],
+        removed: List[Path],
+        flags: Optional[List[str]] = None,
+    ) -> bool:
+        """Update members of a static library (see update_static_library_async())."""
+        return asyncio.run(self.update_static_library_async(output_file, changed, removed, flags))
+    
+    async def update_static_library_async(
+        self,
+        output_file: Path,
+        changed: List[Path],
+        removed: List[Path],
+        flags: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        Update a static library in place, leaving unchanged members alone.
+        
+        Only valid if can_update_static_library() allows it.
+        
+        Args:
+            output_file: Existing library to update.
+            changed: Object files to add or replace.
+            removed: Object files whose members to delete.
+            flags: Optional list of archiver flags.
+            
+        Returns:
+            True if the update succeeded, False otherwise.
+        """
+        raise NotImplementedError(f"The {self.name} toolchain cannot update static libraries")
     
     def link_shared_library(
         self,
@@ -90,6 +1163,17 @@ class Toolchain:
         lib_dirs: Optional[List[Path]] = None,
         libraries: Optional[List[str]] = None,
         flags: Optional[List[str]] = None,
+    ) -> bool:
+        """Link object files into a shared library (see link_shared_library_async())."""
+        return asyncio.run(self.link_shared_library_async(object_files, output_file, lib_dirs, libraries, flags))
+    
+    async def link_shared_library_async(
+        self,
+        object_files: List[Path],
+        output_file: Path,
+        lib_dirs: Optional[List[Path]] = None,
+        libraries: Optional[List[str]] = None,
+        flags: Optional[List[str]] = None,
     ) -> bool:
         """
         Link object files into a shared library.
@@ -104,7 +1188,29 @@ class Toolchain:
         Returns:
             True if linking succeeded, False otherwise.
         """
-        raise NotImplementedError("Subclasses must implement link_shared_library()")
+        raise NotImplementedError("Subclasses must implement link_shared_library_async()")
+    
+    def get_time_trace_flags(self) -> List[str]:
+        """
+        Get compile flags that make the compiler write a per-file time trace.
+        
+        Returns:
+            Flags to add to compile commands, or an empty list if the
+            compiler cannot produce time traces.
+        """
+        return []
+    
+    def get_time_trace_path(self, output_file: Path) -> Path:
+        """
+        Get the path of the time trace written alongside an object file.
+        
+        Args:
+            output_file: Path to the object file.
+            
+        Returns:
+            Path to the trace-event JSON file.
+        """
+        return output_file.with_suffix(".json")
     
     def get_object_extension(self) -> str:
         """
@@ -2,27 +2,161 @@
 
 from pathlib import Path
 from typing import List, Optional
-from .base import Toolchain
+import asyncio
+import os
+import shutil
+import sys
+from src.core.compile_worker import INPUT_PLACEHOLDER, OUTPUT_PLACEHOLDER
+from src.core.scheduler import default_job_count
+from .base import write_output
+from .gnu import GNUDriverToolchain
+from .probe import ToolchainInfo, probe_gnu_driver
 
 
-class ClangToolchain(Toolchain):
+class ClangToolchain(GNUDriverToolchain):
     """Clang/LLVM toolchain (clang++, lld, llvm-ar)."""
     
+    PCH_EXTENSION = ".pch"
+    SUPPORTED_LINKERS = ("bfd", "gold", "lld", "mold")
+    SUPPORTS_THIN_ARCHIVES = True
+    SUPPORTS_DISTRIBUTED = True
+    
+    # ThinLTO runs backends in parallel and caches them for incremental links
+    LTO_MODES = ("thin", "full")
+    
+    # Cache entries unused for a week, or beyond 2 GiB, are pruned by the linker
+    LTO_CACHE_POLICY = "prune_after=168h:cache_size_bytes=2g"
+    
+    # ThinLTO backend threads and cache per linker; gold, bfd and mold run
+    # LLVM through the LLVMgold plugin, and Apple's ld64 takes only a cache
+    THIN_LTO_FLAGS = {
+        "lld": [
+            "-Wl,--thinlto-jobs={threads}",
+            "-Wl,--thinlto-cache-dir={cache}",
+            "-Wl,--thinlto-cache-policy={policy}",
+        ],
+        "plugin": [
+            "-Wl,-plugin-opt,jobs={threads}",
+            "-Wl,-plugin-opt,cache-dir={cache}",
+            "-Wl,-plugin-opt,cache-policy={policy}",
+        ],
+        "ld64": ["-Wl,-cache_path_lto,{cache}"],
+    }
+    
+    # Instrumented programs write .profraw files, which llvm-profdata merges
+    # into the one profile optimized builds read
+    SUPPORTS_PGO = True
+    RAW_PROFILE_PATTERNS = ("*.profraw",)
+    PROFILE_DATA_NAME = "default.profdata"
+    PROFILE_PATTERNS = (PROFILE_DATA_NAME,)
+    
     def __init__(self):
         """Initialize Clang toolchain."""
         super().__init__("Clang")
     
-    def compile_object(
+    @classmethod
+    def probe(cls) -> ToolchainInfo:
+        """
+        Find clang++, llvm-ar and llvm-profdata and query clang++ for its
+        search directories.
+        
+        LLVM tools are taken from PATH, else from clang++'s own directory
+        (where versioned LLVM installs keep them), so archives always use
+        LLVM's archiver rather than falling back to GNU ar.
+        """
+        compiler = shutil.which("clang++") or "clang++"
+        info = probe_gnu_driver(compiler, cls._find_llvm_tool(compiler, "llvm-ar"))
+        info.profile_merger = cls._find_llvm_tool(compiler, "llvm-profdata")
+        return info
+    
+    @staticmethod
+    def _find_llvm_tool(compiler: str, name: str) -> str:
+        """Find an LLVM tool on PATH or next to clang++."""
+        found = shutil.which(name)
+        if found is None:
+            sibling = Path(os.path.realpath(compiler)).parent / name
+            found = str(sibling) if sibling.is_file() else name
+        return found
+    
+    def get_optimization_flags(self) -> List[str]:
+        """Get -flto and -fprofile-* compile flags."""
+        flags = []
+        if self.lto == "thin":
+            flags.append("-flto=thin")
+        elif self.lto == "full":
+            flags.append("-flto")
+        if self.pgo == "instrument":
+            flags.append(f"-fprofile-generate={self.profile_dir}")
+        elif self.pgo == "optimize":
+            flags += [
+                f"-fprofile-use={self.profile_dir / self.PROFILE_DATA_NAME}",
+                # Sources changed since training just lose their profile
+                "-Wno-profile-instr-unprofiled",
+                "-Wno-profile-instr-out-of-date",
+            ]
+        return flags
+    
+    def get_optimization_link_flags(self) -> List[str]:
+        """Get -flto link flags with ThinLTO threads and cache, and the profiling runtime."""
+        flags = []
+        if self.lto == "thin":
+            flags.append("-flto=thin")
+            if sys.platform == "darwin" and self.linker is None:
+                flavor = "ld64"
+            else:
+                flavor = "lld" if self.linker == "lld" else "plugin"
+            for flag in self.THIN_LTO_FLAGS[flavor]:
+                if "{cache}" in flag and self.lto_cache_dir is None:
+                    continue
+                flags.append(flag.format(
+                    threads=default_job_count(),
+                    cache=self.lto_cache_dir,
+                    policy=self.LTO_CACHE_POLICY,
+                ))
+        elif self.lto == "full":
+            flags.append("-flto")
+        if self.pgo == "instrument":
+            flags.append(f"-fprofile-generate={self.profile_dir}")
+        return flags
+    
+    def merge_profiles(self) -> bool:
+        """
+        Merge .profraw files into default.profdata with llvm-profdata.
+        
+        Skipped when no raw profile is newer than the merged one.
+        
+        Returns:
+            True if the merged profile is current, False if merging failed.
+        """
+        raw = self._find_profile_data(self.RAW_PROFILE_PATTERNS)
+        if not raw:
+            return True
+        merged = self.profile_dir / self.PROFILE_DATA_NAME
+        try:
+            merged_mtime = merged.stat().st_mtime_ns
+        except OSError:
+            merged_mtime = None
+        if merged_mtime is not None and all(path.stat().st_mtime_ns <= merged_mtime for path in raw):
+            return True
+        
+        cmd = [self.info.profile_merger or "llvm-profdata", "merge", f"-output={merged}"]
+        cmd.extend(str(path) for path in raw)
+        
+        # Long profile lists go in a response file
+        cmd = self.use_response_file(cmd, merged)
+        
+        write_output(f"[Clang] Merging {len(raw)} raw profile(s): {merged}\n")
+        return asyncio.run(self._run_tool(cmd))
+    
+    def get_compile_command(
         self,
         source_file: Path,
         output_file: Path,
         include_dirs: Optional[List[Path]] = None,
         flags: Optional[List[str]] = None,
-    ) -> bool:
+    ) -> List[str]:
         """
-        Compile source with clang++.
-        
-        Invokes: clang++ -c -o <output> [-I<include>] [flags] <source>
+        Build the clang++ command line for compiling a source file.
         
         Args:
             source_file: Path to source file.
@@ -31,38 +165,181 @@ class ClangToolchain(Toolchain):
             flags: Optional list of compiler flags.
             
         Returns:
-            True if compilation succeeded, False otherwise.
+            Command line as a list of arguments.
         """
-        import subprocess
-        
         # Build clang++ command
-        cmd = ["clang++", "-c", "-o", str(output_file), str(source_file)]
+        cmd = [self.get_compiler_executable(), "-c", "-o", str(output_file), str(source_file)]
+        
+        # Write a depfile listing the user headers this object includes
+        cmd.extend(["-MMD", "-MF", str(self.get_depfile_path(output_file))])
+        
+        # Use the precompiled header, if one is configured
+        if self.precompiled_header is not None:
+            cmd.extend(self.get_pch_flags())
         
         # Add include directories
         if include_dirs:
             for inc_dir in include_dirs:
                 cmd.append(f"-I{inc_dir}")
         
+        # Add LTO and PGO flags
+        cmd.extend(self.get_optimization_flags())
+        
         # Add compiler flags
         if flags:
             cmd.extend(flags)
         
-        print(f"[Clang] Compiling {source_file} -> {output_file}")
+        return cmd
+    
+    def get_preprocess_command(
+        self,
+        source_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Build the clang++ command line for preprocessing a source file.
+        
+        Invokes: clang++ -E [-I<include>] [flags] <source>
         
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if result.returncode != 0:
-                print(f"  Error: {result.stderr}")
-                return False
-            return True
-        except FileNotFoundError:
-            print(f"  Error: clang++ not found. Ensure Clang is installed and in PATH")
-            return False
-        except Exception as e:
-            print(f"  Error: {e}")
-            return False
+        Args:
+            source_file: Path to source file.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Command line as a list of arguments.
+        """
+        cmd = [self.get_compiler_executable(), "-E", str(source_file)]
+        
+        # Expand the precompiled header's source so cache keys cover it
+        if self.precompiled_header is not None:
+            cmd.extend(["-include", str(self.precompiled_header)])
+        
+        if include_dirs:
+            for inc_dir in include_dirs:
+                cmd.append(f"-I{inc_dir}")
+        
+        if flags:
+            cmd.extend(flags)
+        
+        return cmd
     
-    def link_executable(
+    def get_distributed_preprocess_command(
+        self,
+        source_file: Path,
+        output_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Build the clang++ command preprocessing a source file for a compile worker.
+        
+        Invokes: clang++ -E <source> [-include <pch>] [-I<include>] [flags] -MMD -MF <depfile> -MQ <output>
+        
+        Args:
+            source_file: Path to source file.
+            output_file: Path to output object file (names the depfile).
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Command line as a list of arguments.
+        """
+        cmd = self.get_preprocess_command(source_file, include_dirs, flags)
+        
+        # Write the depfile the local compile would have written
+        cmd.extend(["-MMD", "-MF", str(self.get_depfile_path(output_file)), "-MQ", str(output_file)])
+        return cmd
+    
+    def get_distributed_compile_args(self, flags: Optional[List[str]] = None) -> List[str]:
+        """Get clang++ arguments compiling a preprocessed source on a worker."""
+        # Headers, the PCH and the depfile were handled when preprocessing
+        args = ["-c", INPUT_PLACEHOLDER, "-o", OUTPUT_PLACEHOLDER]
+        args.extend(self.get_optimization_flags())
+        if flags:
+            args.extend(flags)
+        return args
+    
+    def get_pch_compile_command(
+        self,
+        header: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Build the clang++ command line for precompiling a header.
+        
+        Invokes: clang++ -x c++-header -c -o <header>.pch -MMD -MF <depfile> [-I<include>] [flags] <header>
+        
+        Args:
+            header: Header to precompile.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Command line as a list of arguments.
+        """
+        pch_file = self.get_pch_path(header)
+        cmd = [self.get_compiler_executable(), "-x", "c++-header", "-c", "-o", str(pch_file), str(header)]
+        cmd.extend(["-MMD", "-MF", str(self.get_depfile_path(pch_file))])
+        
+        if include_dirs:
+            for inc_dir in include_dirs:
+                cmd.append(f"-I{inc_dir}")
+        
+        # The PCH must be built like the sources that use it
+        cmd.extend(self.get_optimization_flags())
+        
+        if flags:
+            cmd.extend(flags)
+        
+        return cmd
+    
+    def get_pch_flags(self) -> List[str]:
+        """Get the clang++ flags that use the precompiled header."""
+        return ["-include-pch", str(self.get_pch_path(self.precompiled_header))]
+    
+    async def _invoke_compiler(
+        self,
+        source_file: Path,
+        output_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        Compile source with clang++.
+        
+        Invokes: clang++ -c -o <output> -MMD -MF <depfile> [-I<include>] [flags] <source>
+        
+        Args:
+            source_file: Path to source file.
+            output_file: Path to output object file.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            True if compilation succeeded, False otherwise.
+        """
+        cmd = self.get_compile_command(source_file, output_file, include_dirs, flags)
+        return await self._run_compiler(cmd, source_file, output_file)
+    
+    async def _run_compiler(self, cmd: List[str], source_file: Path, output_file: Path) -> bool:
+        """
+        Run a clang++ compile command.
+        
+        Args:
+            cmd: Command line from get_compile_command() or get_pch_compile_command().
+            source_file: Source being compiled, for progress output.
+            output_file: Output being produced, for progress output.
+            
+        Returns:
+            True if compilation succeeded, False otherwise.
+        """
+        write_output(f"[Clang] Compiling {source_file} -> {output_file}\n")
+        return await self._run_tool(cmd)
+    
+    async def link_executable_async(
         self,
         object_files: List[Path],
         output_file: Path,
@@ -85,10 +362,8 @@ class ClangToolchain(Toolchain):
         Returns:
             True if linking succeeded, False otherwise.
         """
-        import subprocess
-        
         # Build clang++ link command
-        cmd = ["clang++", "-o", str(output_file)] + [str(obj) for obj in object_files]
+        cmd = [self.get_compiler_executable(), "-o", str(output_file)] + [str(obj) for obj in object_files]
         
         # Add library directories
         if lib_dirs:
@@ -100,35 +375,35 @@ class ClangToolchain(Toolchain):
             for lib in libraries:
                 cmd.append(f"-l{lib}")
         
+        # Use the chosen linker
+        cmd.extend(self.get_linker_flags())
+        
+        # Add LTO and PGO flags
+        cmd.extend(self.get_optimization_link_flags())
+        
         # Add linker flags
         if flags:
             cmd.extend(flags)
         
-        print(f"[Clang] Linking executable: {output_file}")
+        # Long object lists go in a response file
+        cmd = self.use_response_file(cmd, output_file)
         
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if result.returncode != 0:
-                print(f"  Error: {result.stderr}")
-                return False
-            return True
-        except FileNotFoundError:
-            print(f"  Error: clang++ not found. Ensure Clang is installed and in PATH")
-            return False
-        except Exception as e:
-            print(f"  Error: {e}")
-            return False
+        write_output(f"[Clang] Linking executable: {output_file}\n")
+        return await self._run_tool(cmd)
     
-    def link_static_library(
+    async def link_static_library_async(
         self,
         object_files: List[Path],
         output_file: Path,
         flags: Optional[List[str]] = None,
     ) -> bool:
         """
-        Link object files into static library with llvm-ar.
+        Create a static library with llvm-ar.
+        
+        Invokes: llvm-ar rcs[P] [--thin] [flags] <output> <objects>
         
-        Invokes: llvm-ar rcs <output> [flags] <objects>
+        Any existing archive is deleted first, so members of removed sources
+        do not linger.
         
         Args:
             object_files: List of object file paths.
@@ -138,31 +413,32 @@ class ClangToolchain(Toolchain):
         Returns:
             True if linking succeeded, False otherwise.
         """
-        import subprocess
+        try:
+            os.unlink(output_file)
+        except FileNotFoundError:
+            pass
         
         # Build llvm-ar command
-        cmd = ["llvm-ar", "rcs", str(output_file)] + [str(obj) for obj in object_files]
+        cmd = self._archive_command("rcs", output_file, flags)
+        cmd.extend(self._archive_member(obj, output_file) for obj in object_files)
         
-        # Add archiver flags if provided
-        if flags:
-            cmd.extend(flags)
-        
-        print(f"[Clang] Creating static library: {output_file}")
+        # Long object lists go in a response file
+        cmd = self.use_response_file(cmd, output_file)
         
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if result.returncode != 0:
-                print(f"  Error: {result.stderr}")
-                return False
-            return True
-        except FileNotFoundError:
-            print(f"  Error: llvm-ar not found. Ensure LLVM/Clang is installed and in PATH")
-            return False
-        except Exception as e:
-            print(f"  Error: {e}")
-            return False
+        kind = "thin static library" if self.thin_archives else "static library"
+        write_output(f"[Clang] Creating {kind}: {output_file}\n")
+        return await self._run_tool(cmd)
+    
+    def _archive_command(self, operation: str, output_file: Path, flags: Optional[List[str]]) -> List[str]:
+        """Start an llvm-ar command; members of thin archives are matched by path (P)."""
+        cmd = [self.info.archiver, operation]
+        if self.thin_archives and operation != "s":
+            cmd[1] += "P"
+            if operation != "d":
+                cmd.append("--thin")
+        return cmd + list(flags or []) + [str(output_file)]
     
-    def link_shared_library(
+    async def link_shared_library_async(
         self,
         object_files: List[Path],
         output_file: Path,
@@ -185,10 +461,8 @@ class ClangToolchain(Toolchain):
         Returns:
             True if linking succeeded, False otherwise.
         """
-        import subprocess
-        
         # Build clang++ link command for shared library
-        cmd = ["clang++", "-shared", "-o", str(output_file)] + [str(obj) for obj in object_files]
+        cmd = [self.get_compiler_executable(), "-shared", "-o", str(output_file)] + [str(obj) for obj in object_files]
         
         # Add library directories
         if lib_dirs:
@@ -200,24 +474,25 @@ class ClangToolchain(Toolchain):
             for lib in libraries:
                 cmd.append(f"-l{lib}")
         
+        # Use the chosen linker
+        cmd.extend(self.get_linker_flags())
+        
+        # Add LTO and PGO flags
+        cmd.extend(self.get_optimization_link_flags())
+        
         # Add linker flags
         if flags:
             cmd.extend(flags)
         
-        print(f"[Clang] Linking shared library: {output_file}")
+        # Long object lists go in a response file
+        cmd = self.use_response_file(cmd, output_file)
         
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if result.returncode != 0:
-                print(f"  Error: {result.stderr}")
-                return False
-            return True
-        except FileNotFoundError:
-            print(f"  Error: clang++ not found. Ensure Clang is installed and in PATH")
-            return False
-        except Exception as e:
-            print(f"  Error: {e}")
-            return False
+        write_output(f"[Clang] Linking shared library: {output_file}\n")
+        return await self._run_tool(cmd)
+    
+    def get_time_trace_flags(self) -> List[str]:
+        """Get the clang++ flags that write <object>.json time traces."""
+        return ["-ftime-trace"]
     
     def get_object_extension(self) -> str:
         """Get Clang object file extension."""
@@ -1,28 +1,107 @@
 """GNU C++ toolchain."""
 
 from pathlib import Path
-from typing import List, Optional
-from .base import Toolchain
+from typing import List, Optional, Tuple
+import os
+import shutil
+from src.core.compile_worker import INPUT_PLACEHOLDER, OUTPUT_PLACEHOLDER
+from src.core.scheduler import default_job_count
+from .base import write_output
+from .gnu import GNUDriverToolchain
+from .probe import ToolchainInfo, probe_gnu_driver
 
 
-class GCCToolchain(Toolchain):
+class GCCToolchain(GNUDriverToolchain):
     """GNU C++ toolchain (g++, ld, ar)."""
     
+    PCH_EXTENSION = ".gch"
+    SUPPORTED_LINKERS = ("bfd", "gold", "lld", "mold")
+    SUPPORTS_THIN_ARCHIVES = True
+    SUPPORTS_DISTRIBUTED = True
+    
+    # First GCC release accepting -fuse-ld=<linker>, for linkers added late
+    LINKER_MIN_VERSIONS = {"lld": (9, 0), "mold": (12, 1)}
+    
+    # GCC has no ThinLTO; "thin" is its partitioned LTO, code-generating
+    # partitions in parallel, and "full" optimizes the program as one unit
+    LTO_MODES = ("thin", "full")
+    
+    # First GCC release keeping an incremental LTO cache (-flto-incremental)
+    LTO_CACHE_MIN_VERSION = (15, 0)
+    
+    # Instrumented programs update one .gcda file per object in place
+    SUPPORTS_PGO = True
+    PROFILE_PATTERNS = ("*.gcda",)
+    
+    # Flags reading the profiles in an optimized build
+    PROFILE_USE_FLAGS = ["-fprofile-use={dir}", "-fprofile-partial-training", "-Wno-missing-profile"]
+    
     def __init__(self):
         """Initialize GCC toolchain."""
         super().__init__("GCC")
     
-    def compile_object(
+    @classmethod
+    def probe(cls) -> ToolchainInfo:
+        """Find g++ and ar on PATH and query g++ for its search directories."""
+        info = probe_gnu_driver(shutil.which("g++") or "g++", shutil.which("ar") or "ar")
+        version = cls._parse_version(info.version)
+        info.linkers = [
+            name for name in info.linkers
+            if version >= cls.LINKER_MIN_VERSIONS.get(name, (0, 0))
+        ]
+        # gcc-ar passes GCC's LTO plugin to ar, so archives index LTO objects
+        info.lto_archiver = shutil.which("gcc-ar") or ""
+        return info
+    
+    @staticmethod
+    def _parse_version(version: str) -> Tuple[int, int]:
+        """Get (major, minor) from a version string, (0, 0) if unknown."""
+        try:
+            major, minor = (int(part) for part in version.split(".")[:2])
+        except ValueError:
+            return (0, 0)
+        return (major, minor)
+    
+    def get_optimization_flags(self) -> List[str]:
+        """Get -flto and -fprofile-* compile flags."""
+        flags = []
+        if self.lto is not None:
+            # Objects carry GIMPLE; code is generated when linking
+            flags.append("-flto")
+        if self.pgo == "instrument":
+            flags += [f"-fprofile-generate={self.profile_dir}", "-fprofile-update=prefer-atomic"]
+        elif self.pgo == "optimize":
+            flags += [flag.format(dir=self.profile_dir) for flag in self.PROFILE_USE_FLAGS]
+        return flags
+    
+    def get_optimization_link_flags(self) -> List[str]:
+        """Get -flto and -fprofile-* link flags; LTO code generation runs on all cores."""
+        flags = []
+        if self.lto == "thin":
+            flags.append(f"-flto={default_job_count()}")
+            if (
+                self.lto_cache_dir is not None
+                and self._parse_version(self.info.version) >= self.LTO_CACHE_MIN_VERSION
+            ):
+                flags.append(f"-flto-incremental={self.lto_cache_dir}")
+        elif self.lto == "full":
+            flags += ["-flto", "-flto-partition=one"]
+        if self.pgo == "instrument":
+            flags.append(f"-fprofile-generate={self.profile_dir}")
+        elif self.pgo == "optimize":
+            # Code is generated at link time under LTO, so the link reads them too
+            flags += [flag.format(dir=self.profile_dir) for flag in self.PROFILE_USE_FLAGS]
+        return flags
+    
+    def get_compile_command(
         self,
         source_file: Path,
         output_file: Path,
         include_dirs: Optional[List[Path]] = None,
         flags: Optional[List[str]] = None,
-    ) -> bool:
+    ) -> List[str]:
         """
-        Compile source with g++.
-        
-        Invokes: g++ -c -o <output> [-I<include>] [flags] <source>
+        Build the g++ command line for compiling a source file.
         
         Args:
             source_file: Path to source file.
@@ -31,38 +110,182 @@ class GCCToolchain(Toolchain):
             flags: Optional list of compiler flags.
             
         Returns:
-            True if compilation succeeded, False otherwise.
+            Command line as a list of arguments.
         """
-        import subprocess
-        
         # Build g++ command
-        cmd = ["g++", "-c", "-o", str(output_file), str(source_file)]
+        cmd = [self.get_compiler_executable(), "-c", "-o", str(output_file), str(source_file)]
+        
+        # Write a depfile listing the user headers this object includes
+        cmd.extend(["-MMD", "-MF", str(self.get_depfile_path(output_file))])
+        
+        # Use the precompiled header, if one is configured
+        if self.precompiled_header is not None:
+            cmd.extend(self.get_pch_flags())
         
         # Add include directories
         if include_dirs:
             for inc_dir in include_dirs:
                 cmd.append(f"-I{inc_dir}")
         
+        # Add LTO and PGO flags
+        cmd.extend(self.get_optimization_flags())
+        
         # Add compiler flags
         if flags:
             cmd.extend(flags)
         
-        print(f"[GCC] Compiling {source_file} -> {output_file}")
+        return cmd
+    
+    def get_preprocess_command(
+        self,
+        source_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Build the g++ command line for preprocessing a source file.
         
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if result.returncode != 0:
-                print(f"  Error: {result.stderr}")
-                return False
-            return True
-        except FileNotFoundError:
-            print(f"  Error: g++ not found. Ensure GCC is installed and in PATH")
-            return False
-        except Exception as e:
-            print(f"  Error: {e}")
-            return False
+        Invokes: g++ -E [-I<include>] [flags] <source>
+        
+        Args:
+            source_file: Path to source file.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Command line as a list of arguments.
+        """
+        cmd = [self.get_compiler_executable(), "-E", str(source_file)]
+        
+        # Expand the precompiled header's source so cache keys cover it
+        if self.precompiled_header is not None:
+            cmd.extend(["-include", str(self.precompiled_header)])
+        
+        if include_dirs:
+            for inc_dir in include_dirs:
+                cmd.append(f"-I{inc_dir}")
+        
+        if flags:
+            cmd.extend(flags)
+        
+        return cmd
+    
+    def get_distributed_preprocess_command(
+        self,
+        source_file: Path,
+        output_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Build the g++ command preprocessing a source file for a compile worker.
+        
+        Invokes: g++ -E <source> [-include <pch>] [-I<include>] [flags] -MMD -MF <depfile> -MQ <output>
+        
+        Args:
+            source_file: Path to source file.
+            output_file: Path to output object file (names the depfile).
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Command line as a list of arguments.
+        """
+        cmd = self.get_preprocess_command(source_file, include_dirs, flags)
+        
+        # Write the depfile the local compile would have written
+        cmd.extend(["-MMD", "-MF", str(self.get_depfile_path(output_file)), "-MQ", str(output_file)])
+        return cmd
+    
+    def get_distributed_compile_args(self, flags: Optional[List[str]] = None) -> List[str]:
+        """Get g++ arguments compiling a preprocessed source on a worker."""
+        # Headers, the PCH and the depfile were handled when preprocessing
+        args = ["-c", INPUT_PLACEHOLDER, "-o", OUTPUT_PLACEHOLDER]
+        args.extend(self.get_optimization_flags())
+        if flags:
+            args.extend(flags)
+        return args
+    
+    def get_pch_compile_command(
+        self,
+        header: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Build the g++ command line for precompiling a header.
+        
+        Invokes: g++ -x c++-header -c -o <header>.gch -MMD -MF <depfile> [-I<include>] [flags] <header>
+        
+        Args:
+            header: Header to precompile.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Command line as a list of arguments.
+        """
+        pch_file = self.get_pch_path(header)
+        cmd = [self.get_compiler_executable(), "-x", "c++-header", "-c", "-o", str(pch_file), str(header)]
+        cmd.extend(["-MMD", "-MF", str(self.get_depfile_path(pch_file))])
+        
+        if include_dirs:
+            for inc_dir in include_dirs:
+                cmd.append(f"-I{inc_dir}")
+        
+        # The PCH must be built like the sources that use it
+        cmd.extend(self.get_optimization_flags())
+        
+        if flags:
+            cmd.extend(flags)
+        
+        return cmd
+    
+    def get_pch_flags(self) -> List[str]:
+        """Get the g++ flags that use the precompiled header."""
+        # g++ picks up <header>.gch next to the header named by -include
+        return ["-include", str(self.precompiled_header), "-Winvalid-pch"]
     
-    def link_executable(
+    async def _invoke_compiler(
+        self,
+        source_file: Path,
+        output_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        Compile source with g++.
+        
+        Invokes: g++ -c -o <output> -MMD -MF <depfile> [-I<include>] [flags] <source>
+        
+        Args:
+            source_file: Path to source file.
+            output_file: Path to output object file.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            True if compilation succeeded, False otherwise.
+        """
+        cmd = self.get_compile_command(source_file, output_file, include_dirs, flags)
+        return await self._run_compiler(cmd, source_file, output_file)
+    
+    async def _run_compiler(self, cmd: List[str], source_file: Path, output_file: Path) -> bool:
+        """
+        Run a g++ compile command.
+        
+        Args:
+            cmd: Command line from get_compile_command() or get_pch_compile_command().
+            source_file: Source being compiled, for progress output.
+            output_file: Output being produced, for progress output.
+            
+        Returns:
+            True if compilation succeeded, False otherwise.
+        """
+        write_output(f"[GCC] Compiling {source_file} -> {output_file}\n")
+        return await self._run_tool(cmd)
+    
+    async def link_executable_async(
         self,
         object_files: List[Path],
         output_file: Path,
@@ -85,10 +308,8 @@ class GCCToolchain(Toolchain):
         Returns:
             True if linking succeeded, False otherwise.
         """
-        import subprocess
-        
         # Build g++ link command
-        cmd = ["g++", "-o", str(output_file)] + [str(obj) for obj in object_files]
+        cmd = [self.get_compiler_executable(), "-o", str(output_file)] + [str(obj) for obj in object_files]
         
         # Add library directories
         if lib_dirs:
@@ -100,35 +321,35 @@ class GCCToolchain(Toolchain):
             for lib in libraries:
                 cmd.append(f"-l{lib}")
         
+        # Use the chosen linker
+        cmd.extend(self.get_linker_flags())
+        
+        # Add LTO and PGO flags
+        cmd.extend(self.get_optimization_link_flags())
+        
         # Add linker flags
         if flags:
             cmd.extend(flags)
         
-        print(f"[GCC] Linking executable: {output_file}")
+        # Long object lists go in a response file
+        cmd = self.use_response_file(cmd, output_file)
         
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if result.returncode != 0:
-                print(f"  Error: {result.stderr}")
-                return False
-            return True
-        except FileNotFoundError:
-            print(f"  Error: g++ not found. Ensure GCC is installed and in PATH")
-            return False
-        except Exception as e:
-            print(f"  Error: {e}")
-            return False
+        write_output(f"[GCC] Linking executable: {output_file}\n")
+        return await self._run_tool(cmd)
     
-    def link_static_library(
+    async def link_static_library_async(
         self,
         object_files: List[Path],
         output_file: Path,
         flags: Optional[List[str]] = None,
     ) -> bool:
         """
-        Link object files into static library with ar.
+        Create a static library with ar.
+        
+        Invokes: ar rcs[TP] [flags] <output> <objects>
         
-        Invokes: ar rcs <output> [flags] <objects>
+        Any existing archive is deleted first, so members of removed sources
+        do not linger.
         
         Args:
             object_files: List of object file paths.
@@ -138,31 +359,37 @@ class GCCToolchain(Toolchain):
         Returns:
             True if linking succeeded, False otherwise.
         """
-        import subprocess
+        try:
+            os.unlink(output_file)
+        except FileNotFoundError:
+            pass
         
         # Build ar command
-        cmd = ["ar", "rcs", str(output_file)] + [str(obj) for obj in object_files]
+        cmd = self._archive_command("rcs", output_file, flags)
+        cmd.extend(self._archive_member(obj, output_file) for obj in object_files)
         
-        # Add archiver flags if provided
-        if flags:
-            cmd.extend(flags)
+        # Long object lists go in a response file
+        cmd = self.use_response_file(cmd, output_file)
         
-        print(f"[GCC] Creating static library: {output_file}")
+        kind = "thin static library" if self.thin_archives else "static library"
+        write_output(f"[GCC] Creating {kind}: {output_file}\n")
+        return await self._run_tool(cmd)
+    
+    def _archive_command(self, operation: str, output_file: Path, flags: Optional[List[str]]) -> List[str]:
+        """
+        Start an ar command; members of thin archives are matched by path (P).
         
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if result.returncode != 0:
-                print(f"  Error: {result.stderr}")
-                return False
-            return True
-        except FileNotFoundError:
-            print(f"  Error: ar not found. Ensure GCC toolchain is installed and in PATH")
-            return False
-        except Exception as e:
-            print(f"  Error: {e}")
-            return False
+        LTO objects are archived with gcc-ar, if found, so the symbol index
+        covers them.
+        """
+        if self.thin_archives and operation != "s":
+            operation += "P" if operation == "d" else "TP"
+        archiver = self.info.archiver
+        if self.lto is not None and self.info.lto_archiver:
+            archiver = self.info.lto_archiver
+        return [archiver, operation] + list(flags or []) + [str(output_file)]
     
-    def link_shared_library(
+    async def link_shared_library_async(
         self,
         object_files: List[Path],
         output_file: Path,
@@ -185,10 +412,8 @@ class GCCToolchain(Toolchain):
         Returns:
             True if linking succeeded, False otherwise.
         """
-        import subprocess
-        
         # Build g++ link command for shared library
-        cmd = ["g++", "-shared", "-o", str(output_file)] + [str(obj) for obj in object_files]
+        cmd = [self.get_compiler_executable(), "-shared", "-o", str(output_file)] + [str(obj) for obj in object_files]
         
         # Add library directories
         if lib_dirs:
@@ -200,24 +425,21 @@ class GCCToolchain(Toolchain):
             for lib in libraries:
                 cmd.append(f"-l{lib}")
         
+        # Use the chosen linker
+        cmd.extend(self.get_linker_flags())
+        
+        # Add LTO and PGO flags
+        cmd.extend(self.get_optimization_link_flags())
+        
         # Add linker flags
         if flags:
             cmd.extend(flags)
         
-        print(f"[GCC] Linking shared library: {output_file}")
+        # Long object lists go in a response file
+        cmd = self.use_response_file(cmd, output_file)
         
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if result.returncode != 0:
-                print(f"  Error: {result.stderr}")
-                return False
-            return True
-        except FileNotFoundError:
-            print(f"  Error: g++ not found. Ensure GCC is installed and in PATH")
-            return False
-        except Exception as e:
-            print(f"  Error: {e}")
-            return False
+        write_output(f"[GCC] Linking shared library: {output_file}\n")
+        return await self._run_tool(cmd)
     
     def get_object_extension(self) -> str:
         """Get GCC object file extension."""
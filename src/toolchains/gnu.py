@@ -0,0 +1,115 @@
+"""Shared base of toolchains with a GCC-compatible driver."""
+
+from pathlib import Path
+from typing import List, Optional
+import os
+from src.core.scheduler import default_job_count
+from .base import Toolchain, write_output
+
+
+class GNUDriverToolchain(Toolchain):
+    """
+    Base class for toolchains whose compiler driver takes GCC's options
+    (g++, clang++).
+    """
+    
+    # Flags running each linker on all cores (gold is single-threaded by default)
+    LINKER_THREAD_FLAGS = {
+        "gold": ["-Wl,--threads", "-Wl,--thread-count={threads}"],
+        "lld": ["-Wl,--threads={threads}"],
+        "mold": ["-Wl,--thread-count={threads}"],
+    }
+    
+    def get_compiler_executable(self) -> str:
+        """Get the compiler driver the probe found."""
+        return self.info.compiler
+    
+    def get_linker_flags(self) -> List[str]:
+        """Get -fuse-ld and thread-count flags for the chosen linker."""
+        if self.linker is None:
+            return []
+        threads = default_job_count()
+        return [f"-fuse-ld={self.linker}"] + [
+            flag.format(threads=threads) for flag in self.LINKER_THREAD_FLAGS.get(self.linker, [])
+        ]
+    
+    def can_update_static_library(self, members: List[Path]) -> bool:
+        """
+        Check whether a static library can be updated member by member.
+        
+        Regular archives name members by file name only, so that is only
+        safe when no two objects share a file name; thin archives name
+        them by path.
+        
+        Args:
+            members: Every object file in the library, current or removed.
+            
+        Returns:
+            True if update_static_library_async() can be used on it.
+        """
+        return self.thin_archives or len({member.name for member in members}) == len(members)
+    
+    async def update_static_library_async(
+        self,
+        output_file: Path,
+        changed: List[Path],
+        removed: List[Path],
+        flags: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        Update a static library in place with ar (llvm-ar for Clang).
+        
+        Invokes: ar d[P] <output> <removed>, then ar rcs[P] [flags] <output> <changed>
+        (see _archive_command() for each toolchain's thin archive options)
+        
+        Args:
+            output_file: Existing library to update.
+            changed: Object files to add or replace.
+            removed: Object files whose members to delete.
+            flags: Optional list of archiver flags.
+            
+        Returns:
+            True if the update succeeded, False otherwise.
+        """
+        write_output(
+            f"[{self.name}] Updating static library: {output_file} "
+            f"({len(changed)} changed, {len(removed)} removed)\n"
+        )
+        if removed:
+            names = [self._archive_member(obj, output_file) if self.thin_archives else obj.name for obj in removed]
+            cmd = self.use_response_file(self._archive_command("d", output_file, None) + names, output_file)
+            if not await self._run_tool(cmd):
+                return False
+        
+        # Add or replace changed members; after deletions alone, `s` just
+        # rebuilds the symbol index
+        operation = "rcs" if changed else "s"
+        cmd = self._archive_command(operation, output_file, flags)
+        cmd.extend(self._archive_member(obj, output_file) for obj in changed)
+        return await self._run_tool(self.use_response_file(cmd, output_file))
+    
+    def _archive_member(self, obj: Path, output_file: Path) -> str:
+        """
+        Get the path to pass for an archive member.
+        
+        Thin archives store member paths relative to the archive and match
+        them in the form <archive dir>/<relative path>, so that form is
+        used for thin archives.
+        """
+        if not self.thin_archives:
+            return str(obj)
+        return os.path.join(output_file.parent, os.path.relpath(obj, output_file.parent))
+    
+    def _archive_command(self, operation: str, output_file: Path, flags: Optional[List[str]]) -> List[str]:
+        """
+        Start an archiver command.
+        
+        Args:
+            operation: ar operation letters (e.g. 'rcs', 'd', 's').
+            output_file: Archive to operate on.
+            flags: Optional list of archiver flags.
+            
+        Returns:
+            Command line up to and including the archive; members follow.
+        """
+        raise NotImplementedError("Subclasses must implement _archive_command()")
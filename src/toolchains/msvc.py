@@ -1,160 +1,224 @@
 """Microsoft Visual C++ toolchain."""
 
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, List, Optional
+import os
+import shutil
 import subprocess
-from .base import Toolchain
+from .base import Toolchain, decode_output, write_output
+from .probe import ToolchainInfo, find_version, run_probe
+from src.core.depfile import write_depfile
 
 
 class MSVCToolchain(Toolchain):
     """Microsoft Visual C++ toolchain (cl.exe, link.exe, lib.exe)."""
     
+    DEBUG_FLAG_PREFIXES = ("/Z7", "/Zi", "/ZI", "-Z7", "-Zi", "-ZI")
+    PCH_EXTENSION = ".pch"
+    # UTF-16 with a BOM is read regardless of the console code page
+    RESPONSE_FILE_ENCODING = "utf-16"
+    
+    # Visual Studio MSVC toolset directories, newest version subdirectory first
+    VS_ROOTS = [
+        Path("C:/Program Files/Microsoft Visual Studio/18/Community/VC/Tools/MSVC"),
+        Path("C:/Program Files (x86)/Microsoft Visual Studio/2019/Community/VC/Tools/MSVC"),
+        Path("C:/Program Files (x86)/Microsoft Visual Studio/2019/BuildTools/VC/Tools/MSVC"),
+        Path("C:/Program Files/Microsoft Visual Studio/2022/Community/VC/Tools/MSVC"),
+    ]
+    
+    # Windows 10/11 SDK directories (containing Include/ and Lib/)
+    SDK_ROOTS = [
+        Path("C:/Program Files (x86)/Windows Kits/10"),
+        Path("C:/Program Files/Windows Kits/10"),
+    ]
+    
     def __init__(self):
         """Initialize MSVC toolchain."""
         super().__init__("MSVC")
-        self._cl_exe = self._find_cl_exe()
-        self._link_exe = self._find_link_exe()
-        self._lib_exe = self._find_lib_exe()
-        self._include_dirs = self._find_include_dirs()
+        self._cl_exe = self.info.compiler
+        self._link_exe = self.info.linker
+        self._lib_exe = self.info.archiver
+        self._include_dirs = [Path(d) for d in self.info.include_dirs]
+        self._lib_dirs = [Path(d) for d in self.info.lib_dirs]
     
-    @staticmethod
-    def _find_include_dirs() -> List[Path]:
-        """Find MSVC and Windows SDK include directories."""
-        includes = []
-        
-        # Find MSVC includes
-        vs_paths = [
-            Path("C:/Program Files/Microsoft Visual Studio/18/Community/VC/Tools/MSVC"),
-            Path("C:/Program Files (x86)/Microsoft Visual Studio/2019/Community/VC/Tools/MSVC"),
-            Path("C:/Program Files (x86)/Microsoft Visual Studio/2019/BuildTools/VC/Tools/MSVC"),
-            Path("C:/Program Files/Microsoft Visual Studio/2022/Community/VC/Tools/MSVC"),
-        ]
+    @classmethod
+    def get_vs_roots(cls) -> List[Path]:
+        """
+        Get the MSVC toolset directories to search.
         
-        for vs_path in vs_paths:
-            if vs_path.exists():
-                versions = sorted(vs_path.glob("*"), reverse=True)
-                for version_dir in versions:
-                    include_path = version_dir / "include"
-                    if include_path.exists():
-                        includes.append(include_path)
-                        break
-        
-        # Find Windows SDK includes
-        sdk_paths = [
-            Path("C:/Program Files (x86)/Windows Kits/10/Include"),
-            Path("C:/Program Files/Windows Kits/10/Include"),
-        ]
+        SUGAR_MSVC_ROOTS (os.pathsep-separated) replaces the defaults.
         
-        for sdk_path in sdk_paths:
-            if sdk_path.exists():
-                # Find latest SDK version
-                versions = sorted(sdk_path.glob("*"), reverse=True)
-                for version_dir in versions:
-                    ucrt_path = version_dir / "ucrt"
-                    um_path = version_dir / "um"
-                    if ucrt_path.exists():
-                        includes.append(ucrt_path)
-                    if um_path.exists():
-                        includes.append(um_path)
-                    break
+        Returns:
+            List of VC/Tools/MSVC directories.
+        """
+        override = os.environ.get("SUGAR_MSVC_ROOTS")
+        if override:
+            return [Path(entry) for entry in override.split(os.pathsep) if entry]
+        return list(cls.VS_ROOTS)
+    
+    @classmethod
+    def get_sdk_roots(cls) -> List[Path]:
+        """
+        Get the Windows SDK directories to search.
+        
+        SUGAR_WINSDK_ROOTS (os.pathsep-separated) replaces the defaults.
         
-        return includes
+        Returns:
+            List of Windows Kits/10 directories.
+        """
+        override = os.environ.get("SUGAR_WINSDK_ROOTS")
+        if override:
+            return [Path(entry) for entry in override.split(os.pathsep) if entry]
+        return list(cls.SDK_ROOTS)
     
-    @staticmethod
-    def _find_cl_exe() -> str:
-        """Find cl.exe path, checking PATH first then Visual Studio installations."""
-        # Try PATH first
-        try:
-            result = subprocess.run(["where", "cl.exe"], capture_output=True, text=True, check=False)
-            if result.returncode == 0:
-                return "cl.exe"
-        except Exception:
-            pass
-        
-        # Search Visual Studio installations
-        vs_paths = [
-            Path("C:/Program Files/Microsoft Visual Studio/18/Community/VC/Tools/MSVC"),
-            Path("C:/Program Files (x86)/Microsoft Visual Studio/2019/Community/VC/Tools/MSVC"),
-            Path("C:/Program Files (x86)/Microsoft Visual Studio/2019/BuildTools/VC/Tools/MSVC"),
-            Path("C:/Program Files/Microsoft Visual Studio/2022/Community/VC/Tools/MSVC"),
-        ]
+    @classmethod
+    def get_install_roots(cls) -> List[Path]:
+        """Get MSVC and Windows SDK directories whose changes trigger a new probe."""
+        roots = cls.get_vs_roots()
+        for sdk_root in cls.get_sdk_roots():
+            roots.extend([sdk_root / "Include", sdk_root / "Lib"])
+        return roots
+    
+    @classmethod
+    def probe(cls) -> ToolchainInfo:
+        """
+        Find cl.exe, link.exe, lib.exe and the MSVC and Windows SDK directories.
         
-        for vs_path in vs_paths:
-            if vs_path.exists():
-                # Find the latest MSVC version
-                versions = sorted(vs_path.glob("*"), reverse=True)
-                for version_dir in versions:
-                    cl_path = version_dir / "bin" / "Hostx64" / "x64" / "cl.exe"
-                    if cl_path.exists():
-                        return str(cl_path)
+        Tools on PATH (e.g. in a Developer Command Prompt) take precedence
+        over the newest Visual Studio installation.
+        """
+        vs_roots = cls.get_vs_roots()
+        sdk_roots = cls.get_sdk_roots()
+        cl_exe = cls._find_tool("cl.exe", vs_roots)
+        
+        include_dirs: List[str] = []
+        lib_dirs: List[str] = []
+        
+        # Newest MSVC toolset in each installation
+        for vs_path in vs_roots:
+            for version_dir in cls._version_dirs(vs_path):
+                if (version_dir / "include").exists():
+                    include_dirs.append(str(version_dir / "include"))
+                    break
+        for vs_path in vs_roots:
+            for version_dir in cls._version_dirs(vs_path):
+                if (version_dir / "lib" / "x64").exists():
+                    lib_dirs.append(str(version_dir / "lib" / "x64"))
+                    break
         
-        return "cl.exe"  # Fallback to PATH
+        # Newest Windows SDK in each Windows Kits directory
+        for sdk_root in sdk_roots:
+            for version_dir in cls._version_dirs(sdk_root / "Include")[:1]:
+                for sub in ("ucrt", "um"):
+                    if (version_dir / sub).exists():
+                        include_dirs.append(str(version_dir / sub))
+        for sdk_root in sdk_roots:
+            for version_dir in cls._version_dirs(sdk_root / "Lib")[:1]:
+                for sub in ("ucrt", "um"):
+                    if (version_dir / sub / "x64").exists():
+                        lib_dirs.append(str(version_dir / sub / "x64"))
+        
+        # cl.exe prints its banner, including the version, when run without arguments
+        version = find_version(run_probe([cl_exe]), r"Version\s+(\d+(?:\.\d+)+)")
+        
+        return ToolchainInfo(
+            compiler=cl_exe,
+            linker=cls._find_tool("link.exe", vs_roots),
+            archiver=cls._find_tool("lib.exe", vs_roots),
+            version=version,
+            include_dirs=include_dirs,
+            lib_dirs=lib_dirs,
+        )
     
     @staticmethod
-    def _find_link_exe() -> str:
-        """Find link.exe path."""
-        try:
-            result = subprocess.run(["where", "link.exe"], capture_output=True, text=True, check=False)
-            if result.returncode == 0:
-                return "link.exe"
-        except Exception:
-            pass
-        
-        vs_paths = [
-            Path("C:/Program Files/Microsoft Visual Studio/18/Community/VC/Tools/MSVC"),
-            Path("C:/Program Files (x86)/Microsoft Visual Studio/2019/Community/VC/Tools/MSVC"),
-            Path("C:/Program Files (x86)/Microsoft Visual Studio/2019/BuildTools/VC/Tools/MSVC"),
-            Path("C:/Program Files/Microsoft Visual Studio/2022/Community/VC/Tools/MSVC"),
-        ]
+    def _version_dirs(root: Path) -> List[Path]:
+        """List the version subdirectories of an install root, newest first."""
+        if not root.exists():
+            return []
+        return sorted(root.glob("*"), reverse=True)
+    
+    @classmethod
+    def _find_tool(cls, exe_name: str, vs_roots: List[Path]) -> str:
+        """
+        Find an MSVC tool, checking PATH first then Visual Studio installations.
+        
+        Args:
+            exe_name: Tool file name (e.g. 'cl.exe').
+            vs_roots: MSVC toolset directories to search.
+            
+        Returns:
+            exe_name if it is on PATH, else the full path of the newest
+            installed copy, falling back to exe_name.
+        """
+        if shutil.which(exe_name):
+            return exe_name
         
-        for vs_path in vs_paths:
-            if vs_path.exists():
-                versions = sorted(vs_path.glob("*"), reverse=True)
-                for version_dir in versions:
-                    link_path = version_dir / "bin" / "Hostx64" / "x64" / "link.exe"
-                    if link_path.exists():
-                        return str(link_path)
+        for vs_path in vs_roots:
+            for version_dir in cls._version_dirs(vs_path):
+                tool_path = version_dir / "bin" / "Hostx64" / "x64" / exe_name
+                if tool_path.exists():
+                    return str(tool_path)
         
-        return "link.exe"
+        return exe_name  # Fallback to PATH
     
-    @staticmethod
-    def _find_lib_exe() -> str:
-        """Find lib.exe path."""
-        try:
-            result = subprocess.run(["where", "lib.exe"], capture_output=True, text=True, check=False)
-            if result.returncode == 0:
-                return "lib.exe"
-        except Exception:
-            pass
-        
-        vs_paths = [
-            Path("C:/Program Files/Microsoft Visual Studio/18/Community/VC/Tools/MSVC"),
-            Path("C:/Program Files (x86)/Microsoft Visual Studio/2019/Community/VC/Tools/MSVC"),
-            Path("C:/Program Files (x86)/Microsoft Visual Studio/2019/BuildTools/VC/Tools/MSVC"),
-            Path("C:/Program Files/Microsoft Visual Studio/2022/Community/VC/Tools/MSVC"),
-        ]
+    SHOW_INCLUDES_PREFIX = "Note: including file:"
+    
+    def _show_includes_filter(
+        self,
+        source_file: Path,
+        includes: List[Path],
+    ) -> Callable[[bytes], bool]:
+        """
+        Create an output filter that collects /showIncludes notes.
         
-        for vs_path in vs_paths:
-            if vs_path.exists():
-                versions = sorted(vs_path.glob("*"), reverse=True)
-                for version_dir in versions:
-                    lib_path = version_dir / "bin" / "Hostx64" / "x64" / "lib.exe"
-                    if lib_path.exists():
-                        return str(lib_path)
+        Headers under the MSVC and Windows SDK include directories are
+        dropped, matching what -MMD reports for GCC and Clang. The notes and
+        the source file name cl.exe echoes are kept out of the console.
         
-        return "lib.exe"
+        Args:
+            source_file: Source being compiled.
+            includes: Receives the included user headers, in order.
+            
+        Returns:
+            Line filter for run_process().
+        """
+        system_dirs = [str(d).lower().replace("/", "\\") for d in self._include_dirs]
+        prefix = self.SHOW_INCLUDES_PREFIX.encode("ascii")
+        echoed_name = source_file.name.encode("utf-8", "surrogateescape")
+        seen = set()
+        
+        def collect(line: bytes) -> bool:
+            if line.strip() == echoed_name:
+                return False
+            if not line.startswith(prefix):
+                return True
+            header = decode_output(line[len(prefix):]).strip()
+            normalized = header.lower().replace("/", "\\")
+            if normalized not in seen and not any(normalized.startswith(d) for d in system_dirs):
+                seen.add(normalized)
+                includes.append(Path(header))
+            return False
+        
+        return collect
+    
+    @staticmethod
+    def quote_response_arg(arg: str) -> str:
+        """Quote an argument for a link.exe/lib.exe response file (Windows rules)."""
+        return subprocess.list2cmdline([arg])
+    
+    def get_compiler_executable(self) -> str:
+        """Get MSVC compiler executable."""
+        return self._cl_exe
     
-    def compile_object(
+    def get_compile_command(
         self,
         source_file: Path,
         output_file: Path,
         include_dirs: Optional[List[Path]] = None,
         flags: Optional[List[str]] = None,
-    ) -> bool:
+    ) -> List[str]:
         """
-        Compile source with cl.exe.
-        
-        Invokes: cl.exe /c /Fo<output> [/I<include>] [flags] <source>
+        Build the cl.exe command line for compiling a source file.
         
         Args:
             source_file: Path to source file.
@@ -163,15 +227,19 @@ class MSVCToolchain(Toolchain):
             flags: Optional list of compiler flags.
             
         Returns:
-            True if compilation succeeded, False otherwise.
+            Command line as a list of arguments.
         """
-        # Build cl.exe command
-        cmd = [self._cl_exe, "/c", f"/Fo{output_file}", str(source_file)]
+        # Build cl.exe command; /showIncludes reports headers for the depfile
+        cmd = [self._cl_exe, "/nologo", "/c", "/showIncludes", f"/Fo{output_file}", str(source_file)]
         
         # Add system include directories (MSVC and Windows SDK)
         for inc_dir in self._include_dirs:
             cmd.append(f"/I{inc_dir}")
         
+        # Use the precompiled header, if one is configured
+        if self.precompiled_header is not None:
+            cmd.extend(self.get_pch_flags())
+        
         # Add user-provided include directories
         if include_dirs:
             for inc_dir in include_dirs:
@@ -181,22 +249,150 @@ class MSVCToolchain(Toolchain):
         if flags:
             cmd.extend(flags)
         
-        print(f"[MSVC] Compiling {source_file} -> {output_file}")
+        return cmd
+    
+    def get_preprocess_command(
+        self,
+        source_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Build the cl.exe command line for preprocessing a source file.
         
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if result.returncode != 0:
-                print(f"  Error: {result.stderr}")
-                return False
-            return True
-        except FileNotFoundError:
-            print(f"  Error: cl.exe not found. Ensure MSVC is installed and in PATH")
-            return False
-        except Exception as e:
-            print(f"  Error: {e}")
+        Invokes: cl.exe /nologo /E [/I<include>] [flags] <source>
+        
+        Args:
+            source_file: Path to source file.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Command line as a list of arguments.
+        """
+        cmd = [self._cl_exe, "/nologo", "/E", str(source_file)]
+        
+        # Expand the precompiled header's source so cache keys cover it
+        if self.precompiled_header is not None:
+            cmd.append(f"/FI{self.precompiled_header}")
+        
+        for inc_dir in self._include_dirs:
+            cmd.append(f"/I{inc_dir}")
+        
+        if include_dirs:
+            for inc_dir in include_dirs:
+                cmd.append(f"/I{inc_dir}")
+        
+        if flags:
+            cmd.extend(flags)
+        
+        return cmd
+    
+    def get_pch_compile_command(
+        self,
+        header: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Build the cl.exe command line for precompiling a header.
+        
+        Invokes: cl.exe /nologo /c /showIncludes /Yc<header> /FI<header> /Fp<pch> /Fo<obj> [/I<include>] [flags] /Tp<header>
+        
+        The header is compiled as its own C++ source, and forced-included
+        so the /Yc and /Yu names match. The object written alongside the
+        .pch must be linked into every binary that uses it.
+        
+        Args:
+            header: Header to precompile.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            Command line as a list of arguments.
+        """
+        cmd = [
+            self._cl_exe,
+            "/nologo",
+            "/c",
+            "/showIncludes",
+            f"/Yc{header}",
+            f"/FI{header}",
+            f"/Fp{self.get_pch_path(header)}",
+            f"/Fo{self.get_pch_object()}",
+        ]
+        
+        for inc_dir in self._include_dirs:
+            cmd.append(f"/I{inc_dir}")
+        
+        if include_dirs:
+            for inc_dir in include_dirs:
+                cmd.append(f"/I{inc_dir}")
+        
+        if flags:
+            cmd.extend(flags)
+        
+        cmd.append(f"/Tp{header}")
+        return cmd
+    
+    def get_pch_flags(self) -> List[str]:
+        """Get the cl.exe flags that use the precompiled header."""
+        header = self.precompiled_header
+        return [f"/Yu{header}", f"/FI{header}", f"/Fp{self.get_pch_path(header)}"]
+    
+    def get_pch_object(self) -> Optional[Path]:
+        """Get the object file cl.exe writes when creating the precompiled header."""
+        if self.precompiled_header is None:
+            return None
+        return self.precompiled_header.with_name(self.precompiled_header.name + ".obj")
+    
+    async def _invoke_compiler(
+        self,
+        source_file: Path,
+        output_file: Path,
+        include_dirs: Optional[List[Path]] = None,
+        flags: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        Compile source with cl.exe.
+        
+        Invokes: cl.exe /nologo /c /showIncludes /Fo<output> [/I<include>] [flags] <source>
+        
+        Included user headers are written to a depfile next to the object.
+        
+        Args:
+            source_file: Path to source file.
+            output_file: Path to output object file.
+            include_dirs: Optional list of include directories.
+            flags: Optional list of compiler flags.
+            
+        Returns:
+            True if compilation succeeded, False otherwise.
+        """
+        cmd = self.get_compile_command(source_file, output_file, include_dirs, flags)
+        return await self._run_compiler(cmd, source_file, output_file)
+    
+    async def _run_compiler(self, cmd: List[str], source_file: Path, output_file: Path) -> bool:
+        """
+        Run a cl.exe compile command and write the depfile for its output.
+        
+        Args:
+            cmd: Command line from get_compile_command() or get_pch_compile_command().
+            source_file: Source being compiled.
+            output_file: Output being produced; the depfile is written next to it.
+            
+        Returns:
+            True if compilation succeeded, False otherwise.
+        """
+        write_output(f"[MSVC] Compiling {source_file} -> {output_file}\n")
+        
+        includes: List[Path] = []
+        if not await self._run_tool(cmd, self._show_includes_filter(source_file, includes)):
             return False
+        write_depfile(self.get_depfile_path(output_file), output_file, [source_file] + includes)
+        return True
     
-    def link_executable(
+    async def link_executable_async(
         self,
         object_files: List[Path],
         output_file: Path,
@@ -207,7 +403,7 @@ class MSVCToolchain(Toolchain):
         """
         Link object files into executable with link.exe.
         
-        Invokes: link.exe [/LIBPATH:<lib_dir>] [libraries] /OUT:<output> [flags] <objects>
+        Invokes: link.exe /nologo [/LIBPATH:<lib_dir>] [libraries] /OUT:<output> [flags] <objects>
         
         Args:
             object_files: List of object file paths.
@@ -219,57 +415,14 @@ class MSVCToolchain(Toolchain):
         Returns:
             True if linking succeeded, False otherwise.
         """
-        import subprocess
-        
-        # Find MSVC library directories
-        msvc_lib_dirs = []
-        vs_paths = [
-            Path("C:/Program Files/Microsoft Visual Studio/18/Community/VC/Tools/MSVC"),
-            Path("C:/Program Files (x86)/Microsoft Visual Studio/2019/Community/VC/Tools/MSVC"),
-            Path("C:/Program Files (x86)/Microsoft Visual Studio/2019/BuildTools/VC/Tools/MSVC"),
-            Path("C:/Program Files/Microsoft Visual Studio/2022/Community/VC/Tools/MSVC"),
-        ]
-        
-        for vs_path in vs_paths:
-            if vs_path.exists():
-                versions = sorted(vs_path.glob("*"), reverse=True)
-                for version_dir in versions:
-                    lib_path = version_dir / "lib" / "x64"
-                    if lib_path.exists():
-                        msvc_lib_dirs.append(lib_path)
-                        break
-        
-        # Find Windows SDK library directories
-        sdk_lib_dirs = []
-        sdk_paths = [
-            Path("C:/Program Files (x86)/Windows Kits/10/Lib"),
-            Path("C:/Program Files/Windows Kits/10/Lib"),
-        ]
-        
-        for sdk_path in sdk_paths:
-            if sdk_path.exists():
-                versions = sorted(sdk_path.glob("*"), reverse=True)
-                for version_dir in versions:
-                    ucrt_lib = version_dir / "ucrt" / "x64"
-                    um_lib = version_dir / "um" / "x64"
-                    if ucrt_lib.exists():
-                        sdk_lib_dirs.append(ucrt_lib)
-                    if um_lib.exists():
-                        sdk_lib_dirs.append(um_lib)
-                    break
-        
         # Build link.exe command
-        cmd = [self._link_exe, f"/OUT:{output_file}"]
+        cmd = [self._link_exe, "/nologo", f"/OUT:{output_file}"]
         
         # Add object files
         cmd.extend([str(obj) for obj in object_files])
         
-        # Add MSVC library directories
-        for lib_dir in msvc_lib_dirs:
-            cmd.append(f"/LIBPATH:{lib_dir}")
-        
-        # Add Windows SDK library directories
-        for lib_dir in sdk_lib_dirs:
+        # Add MSVC and Windows SDK library directories
+        for lib_dir in self._lib_dirs:
             cmd.append(f"/LIBPATH:{lib_dir}")
         
         # Add user-provided library directories
@@ -288,22 +441,13 @@ class MSVCToolchain(Toolchain):
         if flags:
             cmd.extend(flags)
         
-        print(f"[MSVC] Linking executable: {output_file}")
+        # Long object lists go in a response file
+        cmd = self.use_response_file(cmd, output_file)
         
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if result.returncode != 0:
-                print(f"  Error: {result.stderr}")
-                return False
-            return True
-        except FileNotFoundError:
-            print(f"  Error: link.exe not found. Ensure MSVC is installed and in PATH")
-            return False
-        except Exception as e:
-            print(f"  Error: {e}")
-            return False
+        write_output(f"[MSVC] Linking executable: {output_file}\n")
+        return await self._run_tool(cmd)
     
-    def link_static_library(
+    async def link_static_library_async(
         self,
         object_files: List[Path],
         output_file: Path,
@@ -312,7 +456,7 @@ class MSVCToolchain(Toolchain):
         """
         Link object files into static library with lib.exe.
         
-        Invokes: lib.exe /OUT:<output> [flags] <objects>
+        Invokes: lib.exe /nologo /OUT:<output> [flags] <objects>
         
         Args:
             object_files: List of object file paths.
@@ -322,10 +466,8 @@ class MSVCToolchain(Toolchain):
         Returns:
             True if linking succeeded, False otherwise.
         """
-        import subprocess
-        
         # Build lib.exe command
-        cmd = [self._lib_exe, f"/OUT:{output_file}"]
+        cmd = [self._lib_exe, "/nologo", f"/OUT:{output_file}"]
         
         # Add object files
         cmd.extend([str(obj) for obj in object_files])
@@ -334,22 +476,13 @@ class MSVCToolchain(Toolchain):
         if flags:
             cmd.extend(flags)
         
-        print(f"[MSVC] Creating static library: {output_file}")
+        # Long object lists go in a response file
+        cmd = self.use_response_file(cmd, output_file)
         
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if result.returncode != 0:
-                print(f"  Error: {result.stderr}")
-                return False
-            return True
-        except FileNotFoundError:
-            print(f"  Error: lib.exe not found. Ensure MSVC is installed and in PATH")
-            return False
-        except Exception as e:
-            print(f"  Error: {e}")
-            return False
+        write_output(f"[MSVC] Creating static library: {output_file}\n")
+        return await self._run_tool(cmd)
     
-    def link_shared_library(
+    async def link_shared_library_async(
         self,
         object_files: List[Path],
         output_file: Path,
@@ -360,7 +493,7 @@ class MSVCToolchain(Toolchain):
         """
         Link object files into shared library with link.exe.
         
-        Invokes: link.exe /DLL [/LIBPATH:<lib_dir>] [libraries] /OUT:<output> [flags] <objects>
+        Invokes: link.exe /nologo /DLL [/LIBPATH:<lib_dir>] [libraries] /OUT:<output> [flags] <objects>
         
         Args:
             object_files: List of object file paths.
@@ -372,10 +505,8 @@ class MSVCToolchain(Toolchain):
         Returns:
             True if linking succeeded, False otherwise.
         """
-        import subprocess
-        
         # Build link.exe command for DLL
-        cmd = [self._link_exe, "/DLL", f"/OUT:{output_file}"]
+        cmd = [self._link_exe, "/nologo", "/DLL", f"/OUT:{output_file}"]
         
         # Add object files
         cmd.extend([str(obj) for obj in object_files])
@@ -393,20 +524,11 @@ class MSVCToolchain(Toolchain):
         if flags:
             cmd.extend(flags)
         
-        print(f"[MSVC] Linking shared library: {output_file}")
+        # Long object lists go in a response file
+        cmd = self.use_response_file(cmd, output_file)
         
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if result.returncode != 0:
-                print(f"  Error: {result.stderr}")
-                return False
-            return True
-        except FileNotFoundError:
-            print(f"  Error: link.exe not found. Ensure MSVC is installed and in PATH")
-            return False
-        except Exception as e:
-            print(f"  Error: {e}")
-            return False
+        write_output(f"[MSVC] Linking shared library: {output_file}\n")
+        return await self._run_tool(cmd)
     
     def get_object_extension(self) -> str:
         """Get MSVC object file extension."""
@@ -0,0 +1,246 @@
+"""Cached discovery of installed compilers, linkers and system directories."""
+
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from src.core.cache import user_cache_dir
+
+
+@dataclass
+class ToolchainInfo:
+    """Resolved tools and directories of an installed toolchain."""
+
+    compiler: str
+    linker: str
+    archiver: str
+    version: str = ""
+    include_dirs: List[str] = field(default_factory=list)
+    lib_dirs: List[str] = field(default_factory=list)
+    # Alternative linkers the compiler driver can use, fastest first
+    linkers: List[str] = field(default_factory=list)
+    # Archiver that indexes LTO objects (gcc-ar), if it differs from archiver
+    lto_archiver: str = ""
+    # Tool merging raw PGO profiles (llvm-profdata), if the toolchain needs one
+    profile_merger: str = ""
+
+
+class ToolchainProbe:
+    """
+    Per-user cache of toolchain probe results.
+
+    Finding a toolchain means searching PATH, globbing install trees and
+    running the compiler for its version and search directories. The
+    result is stored in the user cache directory, keyed by the PATH
+    variable and the modification times of the PATH entries and install
+    roots, so it is redone only when something is installed, removed or
+    upgraded. Results are also kept in memory for the life of the process.
+    """
+
+    FILENAME = "toolchains.json"
+    VERSION = 3
+
+    _memory: Dict[str, ToolchainInfo] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        Initialize the probe cache.
+
+        Args:
+            cache_dir: Directory holding the cache file (defaults to the
+                per-user SugarBuilder cache directory).
+        """
+        self.path = Path(cache_dir or user_cache_dir()) / self.FILENAME
+
+    @staticmethod
+    def get_key(name: str, roots: List[Path]) -> str:
+        """
+        Compute the cache key for a toolchain.
+
+        Args:
+            name: Toolchain name.
+            roots: Install directories the probe searches.
+
+        Returns:
+            Hex digest of the toolchain name, PATH and directory mtimes.
+        """
+        search_path = os.environ.get("PATH", "")
+        dirs = [Path(entry) for entry in search_path.split(os.pathsep) if entry] + list(roots)
+        stamps = []
+        for directory in dirs:
+            try:
+                stamps.append([str(directory), os.stat(directory).st_mtime_ns])
+            except OSError:
+                stamps.append([str(directory), None])
+        data = json.dumps([name, search_path, stamps])
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def lookup(
+        self,
+        name: str,
+        roots: List[Path],
+        probe: Callable[[], ToolchainInfo],
+    ) -> ToolchainInfo:
+        """
+        Get toolchain details, probing only if the cached result is stale.
+
+        Args:
+            name: Toolchain name.
+            roots: Install directories the probe searches.
+            probe: Function that discovers the toolchain.
+
+        Returns:
+            ToolchainInfo for the toolchain.
+        """
+        key = self.get_key(name, roots)
+        with self._lock:
+            info = self._memory.get(key)
+            if info is not None:
+                return info
+
+            entries = self._load()
+            entry = entries.get(name)
+            if isinstance(entry, dict) and entry.get("key") == key:
+                try:
+                    info = ToolchainInfo(**entry["info"])
+                except (KeyError, TypeError):
+                    info = None
+
+            if info is None:
+                info = probe()
+                entries[name] = {"key": key, "info": asdict(info)}
+                self._save(entries)
+
+            self._memory[key] = info
+            return info
+
+    def _load(self) -> Dict[str, dict]:
+        """Read cached probe results, or nothing if unreadable."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return {}
+        entries = data.get("toolchains")
+        return entries if isinstance(entries, dict) else {}
+
+    def _save(self, entries: Dict[str, dict]) -> None:
+        """Write probe results, ignoring an unwritable cache directory."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": self.VERSION, "toolchains": entries}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+
+# Linkers selectable with -fuse-ld=, fastest first, and the executables
+# a GCC-compatible driver looks for on PATH
+FAST_LINKERS = [
+    ("mold", ["ld.mold", "mold"]),
+    ("lld", ["ld.lld"]),
+    ("gold", ["ld.gold"]),
+]
+
+
+def find_linkers() -> List[str]:
+    """
+    Find the alternative linkers installed on PATH.
+
+    Returns:
+        Names of available linkers from FAST_LINKERS, fastest first.
+    """
+    return [name for name, exes in FAST_LINKERS if any(shutil.which(exe) for exe in exes)]
+
+
+def run_probe(cmd: List[str], stdin: Optional[str] = None) -> str:
+    """
+    Run a probe command and return everything it printed.
+
+    Args:
+        cmd: Command line.
+        stdin: Optional text to pass on standard input.
+
+    Returns:
+        Combined stdout and stderr, or an empty string if it could not run.
+    """
+    try:
+        result = subprocess.run(
+            cmd, input=stdin, capture_output=True, text=True, timeout=30, check=False
+        )
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return result.stdout + result.stderr
+
+
+def find_version(output: str, pattern: str = r"(\d+\.\d+(?:\.\d+)*)") -> str:
+    """
+    Extract a version number from compiler output.
+
+    Args:
+        output: Text printed by the compiler.
+        pattern: Regular expression whose first group is the version.
+
+    Returns:
+        Version string, or an empty string if none was found.
+    """
+    match = re.search(pattern, output)
+    return match.group(1) if match else ""
+
+
+def probe_gnu_driver(compiler: str, archiver: str) -> ToolchainInfo:
+    """
+    Probe a GCC-compatible compiler driver (g++, clang++).
+
+    Runs the driver for its version, its system include directories and
+    its library search path, and looks for faster linkers it can use.
+
+    Args:
+        compiler: Resolved compiler path.
+        archiver: Resolved archiver path.
+
+    Returns:
+        ToolchainInfo with the driver as compiler and linker.
+    """
+    version = find_version(run_probe([compiler, "--version"]).split("\n", 1)[0])
+
+    include_dirs = []
+    in_search_list = False
+    for line in run_probe([compiler, "-E", "-x", "c++", "-", "-v"], stdin="").splitlines():
+        if line.startswith("#include <...> search starts here:"):
+            in_search_list = True
+        elif line.startswith("End of search list."):
+            break
+        elif in_search_list:
+            include_dirs.append(os.path.normpath(line.strip().split(" (")[0]))
+
+    lib_dirs = []
+    for line in run_probe([compiler, "-print-search-dirs"]).splitlines():
+        if line.startswith("libraries:"):
+            entries = line.split(":", 1)[1].strip().lstrip("=")
+            for entry in entries.split(os.pathsep):
+                if entry and os.path.isdir(entry):
+                    path = os.path.normpath(entry)
+                    if path not in lib_dirs:
+                        lib_dirs.append(path)
+
+    return ToolchainInfo(
+        compiler=compiler,
+        linker=compiler,
+        archiver=archiver,
+        version=version,
+        include_dirs=include_dirs,
+        lib_dirs=lib_dirs,
+        linkers=find_linkers(),
+    )
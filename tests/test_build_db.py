@@ -0,0 +1,132 @@
+"""Tests for the persistent build database."""
+
+from pathlib import Path
+import json
+import os
+from src.core.build_db import BuildDatabase, file_stamp
+from src.core.hashing import FileHasher
+
+
+COMMAND = ["g++", "-c", "-o", "main.o", "main.cpp"]
+TOOLCHAIN = "GCC:/usr/bin/g++:1:2"
+
+# A fixed time in the past, so touches always move the mtime forward
+PAST_NS = 1_600_000_000 * 10**9
+
+
+def write(path: Path, text: str, mtime_ns: int = PAST_NS) -> Path:
+    """Write a file with a known modification time."""
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def touch(path: Path, mtime_ns: int = PAST_NS + 10**9) -> None:
+    """Change a file's modification time without changing its contents."""
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def compiled(tmp_path: Path, hasher=None):
+    """A database with main.o recorded as compiled from main.cpp."""
+    source = write(tmp_path / "main.cpp", "int main() {}\n")
+    obj = write(tmp_path / "main.o", "object")
+    db = BuildDatabase(tmp_path / "build", hasher)
+    db.record_object(obj, source, COMMAND, TOOLCHAIN, db.source_stamp(source))
+    return db, source, obj
+
+
+def test_file_stamp(tmp_path):
+    path = write(tmp_path / "a.cpp", "abc")
+    assert file_stamp(path) == (PAST_NS, 3)
+    assert file_stamp(tmp_path / "missing.cpp") is None
+
+
+def test_object_up_to_date(tmp_path):
+    db, source, obj = compiled(tmp_path)
+    assert db.is_object_up_to_date(obj, source, COMMAND, TOOLCHAIN)
+
+
+def test_object_out_of_date(tmp_path):
+    db, source, obj = compiled(tmp_path)
+
+    assert not db.is_object_up_to_date(obj, source, COMMAND + ["-O2"], TOOLCHAIN)
+    assert not db.is_object_up_to_date(obj, source, COMMAND, "Clang:/usr/bin/clang++:1:2")
+    assert not db.is_object_up_to_date(tmp_path / "other.o", source, COMMAND, TOOLCHAIN)
+
+    touch(source)
+    assert not db.is_object_up_to_date(obj, source, COMMAND, TOOLCHAIN)
+
+
+def test_missing_object_is_out_of_date(tmp_path):
+    db, source, obj = compiled(tmp_path)
+    obj.unlink()
+    assert not db.is_object_up_to_date(obj, source, COMMAND, TOOLCHAIN)
+
+
+def test_forget_object(tmp_path):
+    db, source, obj = compiled(tmp_path)
+    db.forget_object(obj)
+    assert not db.is_object_up_to_date(obj, source, COMMAND, TOOLCHAIN)
+
+
+def test_hash_mode_ignores_touch(tmp_path):
+    db, source, obj = compiled(tmp_path, FileHasher(tmp_path / "build"))
+
+    touch(source)
+    assert db.is_object_up_to_date(obj, source, COMMAND, TOOLCHAIN)
+
+    write(source, "int main() { return 1; }\n", PAST_NS + 2 * 10**9)
+    assert not db.is_object_up_to_date(obj, source, COMMAND, TOOLCHAIN)
+
+
+def test_save_and_load(tmp_path):
+    db, source, obj = compiled(tmp_path)
+    db.save()
+
+    loaded = BuildDatabase.load(tmp_path / "build")
+    assert loaded.is_object_up_to_date(obj, source, COMMAND, TOOLCHAIN)
+
+
+def test_load_discards_other_version(tmp_path):
+    db, source, obj = compiled(tmp_path)
+    db.save()
+    data = json.loads(db.path.read_text())
+    data["version"] = BuildDatabase.VERSION + 1
+    db.path.write_text(json.dumps(data))
+
+    loaded = BuildDatabase.load(tmp_path / "build")
+    assert not loaded.is_object_up_to_date(obj, source, COMMAND, TOOLCHAIN)
+
+
+def test_load_tolerates_corrupt_file(tmp_path):
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / BuildDatabase.FILENAME).write_text("{not json")
+    db = BuildDatabase.load(tmp_path / "build")
+    assert not db.is_object_up_to_date(tmp_path / "main.o", tmp_path / "main.cpp", COMMAND, TOOLCHAIN)
+
+
+def test_target_up_to_date(tmp_path):
+    objects = [write(tmp_path / "a.o", "a"), write(tmp_path / "b.o", "b")]
+    target = write(tmp_path / "app", "exe")
+    signature = {"type": "exe", "toolchain": TOOLCHAIN}
+    db = BuildDatabase(tmp_path / "build")
+    db.record_target(target, objects, signature)
+
+    assert db.is_target_up_to_date(target, objects, signature)
+    assert not db.is_target_up_to_date(target, objects, {**signature, "type": "shared"})
+    assert not db.is_target_up_to_date(target, objects[:1], signature)
+
+    touch(objects[1])
+    assert not db.is_target_up_to_date(target, objects, signature)
+
+
+def test_archive_changes(tmp_path):
+    a, b, c = (write(tmp_path / f"{name}.o", name) for name in "abc")
+    library = write(tmp_path / "liba.a", "archive")
+    signature = {"type": "static"}
+    db = BuildDatabase(tmp_path / "build")
+    db.record_target(library, [a, b], signature)
+
+    touch(a)
+    assert db.get_archive_changes(library, [a, c], signature) == ([a, c], [b])
+    assert db.get_archive_changes(library, [a, b], {"type": "other"}) is None
@@ -0,0 +1,166 @@
+"""Tests for depfile parsing and header dependency tracking."""
+
+from pathlib import Path
+import os
+import pytest
+from src.core.depfile import DependencyGraph, parse_depfile, write_depfile
+from src.core.hashing import FileHasher
+
+
+PAST_NS = 1_600_000_000 * 10**9
+# Compiles "start" after every file below was last written
+COMPILE_NS = PAST_NS + 10**9
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("main.o: main.cpp util.h\n", ["main.cpp", "util.h"]),
+    ("main.o: main.cpp \\\n  util.h \\\n  config.h\n", ["main.cpp", "util.h", "config.h"]),
+    ("main.o: main.cpp \\\r\n  util.h\r\n", ["main.cpp", "util.h"]),
+    ("main.o: my\\ project/main.cpp\n", ["my project/main.cpp"]),
+    ("main.o: a\\#b.h $$HOME.h\n", ["a#b.h", "$HOME.h"]),
+    ("main.o main.d: main.cpp\n", ["main.cpp"]),
+    ("main.o : main.cpp\n", ["main.cpp"]),
+    (
+        "C:\\proj\\build\\main.o: C:\\proj\\main.cpp C:/proj/include/util.h\n",
+        ["C:\\proj\\main.cpp", "C:/proj/include/util.h"],
+    ),
+    ("main.o:\n", []),
+    ("", []),
+    ("no target here\n", []),
+])
+def test_parse_depfile(text, expected):
+    assert parse_depfile(text) == expected
+
+
+def test_write_depfile_round_trip(tmp_path):
+    deps = [Path("my dir/a.cpp"), Path("b#1.h"), Path("$x.h")]
+    depfile = tmp_path / "a.d"
+    write_depfile(depfile, Path("out dir/a.o"), deps)
+    assert parse_depfile(depfile.read_text()) == [str(dep) for dep in deps]
+
+
+def write(path: Path, text: str, mtime_ns: int = PAST_NS) -> Path:
+    """Write a file with a known modification time."""
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Two objects: a.o includes common.h, b.o includes nothing."""
+    files = {
+        "a.cpp": write(tmp_path / "a.cpp", '#include "common.h"\n'),
+        "b.cpp": write(tmp_path / "b.cpp", "int b;\n"),
+        "common.h": write(tmp_path / "common.h", "int common;\n"),
+    }
+    return tmp_path, files
+
+
+def record(graph: DependencyGraph, root: Path, files) -> None:
+    graph.update(root / "a.o", [files["a.cpp"], files["common.h"]], COMPILE_NS)
+    graph.update(root / "b.o", [files["b.cpp"]], COMPILE_NS)
+
+
+def test_header_touch_dirties_dependents_only(project):
+    root, files = project
+    graph = DependencyGraph(root / "build")
+    record(graph, root, files)
+    assert graph.is_up_to_date(root / "a.o")
+    assert graph.is_up_to_date(root / "b.o")
+
+    os.utime(files["common.h"], ns=(COMPILE_NS + 10**9,) * 2)
+    graph.refresh()
+
+    assert not graph.is_up_to_date(root / "a.o")
+    assert graph.is_up_to_date(root / "b.o")
+    assert graph.get_dependents(files["common.h"]) == [root / "a.o"]
+    assert graph.get_dependents_of([files["common.h"]]) == {root / "a.o"}
+
+
+def test_hash_mode_ignores_header_touch(project):
+    root, files = project
+    graph = DependencyGraph(root / "build", FileHasher(root / "build"))
+    record(graph, root, files)
+
+    os.utime(files["common.h"], ns=(COMPILE_NS + 10**9,) * 2)
+    graph.refresh()
+    assert graph.is_up_to_date(root / "a.o")
+
+    write(files["common.h"], "long common;\n", COMPILE_NS + 2 * 10**9)
+    graph.refresh()
+    assert not graph.is_up_to_date(root / "a.o")
+    assert graph.is_up_to_date(root / "b.o")
+
+
+def test_header_edited_during_compile(project):
+    root, files = project
+    write(files["common.h"], "int common2;\n", COMPILE_NS + 10**6)
+    graph = DependencyGraph(root / "build")
+    record(graph, root, files)
+
+    # Possibly edited after the compiler read it, so never trusted
+    assert not graph.is_up_to_date(root / "a.o")
+    assert graph.is_up_to_date(root / "b.o")
+
+
+def test_missing_header_dirties_dependents(project):
+    root, files = project
+    graph = DependencyGraph(root / "build")
+    record(graph, root, files)
+    files["common.h"].unlink()
+    graph.refresh()
+    assert not graph.is_up_to_date(root / "a.o")
+
+
+def test_update_from_depfile(project):
+    root, files = project
+    graph = DependencyGraph(root / "build")
+    depfile = root / "a.d"
+    write_depfile(depfile, root / "a.o", [files["a.cpp"], files["common.h"]])
+
+    assert graph.update_from_depfile(root / "a.o", depfile, COMPILE_NS)
+    assert graph.get_dependencies(root / "a.o") == [files["a.cpp"], files["common.h"]]
+
+    assert not graph.update_from_depfile(root / "b.o", root / "missing.d", COMPILE_NS)
+    assert not graph.is_up_to_date(root / "b.o")
+
+
+def test_save_and_load(project):
+    root, files = project
+    graph = DependencyGraph(root / "build")
+    record(graph, root, files)
+    graph.forget(root / "b.o")
+    graph.save()
+
+    loaded = DependencyGraph.load(root / "build")
+    assert loaded.is_up_to_date(root / "a.o")
+    assert not loaded.is_up_to_date(root / "b.o")
+    # Paths only b.o used are dropped from the table
+    assert files["b.cpp"] not in loaded.get_files()
+
+
+def test_show_includes_filter(tmp_path, monkeypatch):
+    from src.toolchains.msvc import MSVCToolchain
+    from src.toolchains.probe import ToolchainProbe
+
+    # No MSVC installation: the probe finds nothing, which is enough here
+    monkeypatch.setenv("SUGAR_MSVC_ROOTS", str(tmp_path / "none"))
+    monkeypatch.setenv("SUGAR_WINSDK_ROOTS", str(tmp_path / "none"))
+    monkeypatch.setenv("SUGAR_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(ToolchainProbe, "_memory", {})
+    toolchain = MSVCToolchain()
+    toolchain._include_dirs = [Path("C:/VS/include")]
+
+    includes = []
+    keep = toolchain._show_includes_filter(Path("src/main.cpp"), includes)
+    lines = [
+        b"main.cpp",
+        b"Note: including file: C:\\proj\\util.h",
+        b"Note: including file:  C:\\VS\\include\\vector",
+        b"Note: including file:   C:\\PROJ\\UTIL.H",
+        b"src\\main.cpp(3): warning C4100: unused parameter",
+    ]
+
+    assert [keep(line) for line in lines] == [False, False, False, False, True]
+    assert includes == [Path("C:\\proj\\util.h")]
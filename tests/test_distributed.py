@@ -0,0 +1,137 @@
+"""Tests for distributed compilation with compile workers on localhost."""
+
+from pathlib import Path
+import asyncio
+import math
+import shutil
+import threading
+import pytest
+from src.core.compile_worker import CompileWorker
+from src.core.distributed import WorkerPool
+
+
+pytestmark = pytest.mark.skipif(shutil.which("g++") is None, reason="needs g++")
+
+COMPILE_ARGS = ["-c", "{input}", "-o", "{output}"]
+
+
+def start_worker(slots: int = 1) -> CompileWorker:
+    """Start a worker on a free localhost port."""
+    worker = CompileWorker(("127.0.0.1", 0), slots, ["g++"])
+    threading.Thread(target=worker.serve_forever, daemon=True).start()
+    return worker
+
+
+def stop_worker(worker: CompileWorker) -> None:
+    """Stop a worker and close its port."""
+    worker.shutdown()
+    worker.server_close()
+
+
+@pytest.fixture
+def workers():
+    """Two single-slot workers."""
+    started = [start_worker(), start_worker()]
+    yield started
+    for worker in started:
+        stop_worker(worker)
+
+
+@pytest.fixture
+def version(workers):
+    """Version of the local g++, as the workers see it."""
+    return workers[0].get_compiler_version("g++")
+
+
+def compile_source(pool: WorkerPool, version: str, source: str, cwd: Path):
+    """Send one preprocessed source to the pool."""
+    return asyncio.run(pool.compile("g++", version, COMPILE_ARGS, source.encode(), str(cwd)))
+
+
+def test_compile_on_worker(workers, version, tmp_path):
+    pool = WorkerPool([worker.url for worker in workers])
+
+    result = compile_source(pool, version, "int answer() { return 42; }\n", tmp_path)
+
+    assert result is not None
+    assert result.exit_code == 0
+    assert result.object_data.startswith(b"\x7fELF")
+    assert pool.remote_compiles == 1
+    assert pool.local_fallbacks == 0
+
+
+def test_compiles_spread_over_workers(workers, version, tmp_path):
+    pool = WorkerPool([worker.url for worker in workers])
+
+    async def compile_both():
+        return await asyncio.gather(*(
+            pool.compile("g++", version, COMPILE_ARGS, f"int f{i}() {{ return {i}; }}\n".encode(), str(tmp_path))
+            for i in range(2)
+        ))
+
+    results = asyncio.run(compile_both())
+
+    # Each worker has one slot, so each takes one compile
+    assert sorted(result.worker for result in results) == sorted(
+        worker.url.split("//", 1)[1] for worker in workers
+    )
+
+
+def test_compile_error_comes_back(workers, version, tmp_path):
+    pool = WorkerPool([workers[0].url])
+
+    result = compile_source(pool, version, "int broken( {\n", tmp_path)
+
+    assert result is not None
+    assert result.exit_code != 0
+    assert "error" in result.output
+    assert result.object_data == b""
+
+
+def test_version_mismatch_skips_worker(workers, tmp_path):
+    pool = WorkerPool([workers[0].url])
+
+    assert compile_source(pool, "0.0.1", "int f() { return 0; }\n", tmp_path) is None
+    assert pool.local_fallbacks == 1
+    # Not asked again for the rest of the build
+    assert math.isinf(pool.workers[0].down_until)
+
+
+def test_retry_on_another_worker(workers, version, tmp_path):
+    stopped = start_worker()
+    stop_worker(stopped)
+    pool = WorkerPool([stopped.url, workers[0].url])
+
+    result = compile_source(pool, version, "int f() { return 0; }\n", tmp_path)
+
+    assert result is not None
+    assert result.worker == workers[0].url.split("//", 1)[1]
+
+
+def test_fallback_when_workers_are_down(workers, version, tmp_path):
+    pool = WorkerPool([worker.url for worker in workers])
+    assert asyncio.run(pool.refresh()) == 2
+
+    for worker in workers:
+        stop_worker(worker)
+    workers.clear()
+
+    assert compile_source(pool, version, "int f() { return 0; }\n", tmp_path) is None
+    assert pool.remote_compiles == 0
+    assert pool.local_fallbacks == 1
+
+
+def test_toolchain_compiles_on_worker(workers, tmp_path, monkeypatch):
+    from src.toolchains.gcc import GCCToolchain
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SUGAR_CACHE_DIR", str(tmp_path / "cache"))
+    Path("main.cpp").write_text('#include <cstdio>\nint main() { std::puts("hi"); }\n')
+    toolchain = GCCToolchain()
+    toolchain.distributor = WorkerPool([worker.url for worker in workers])
+
+    assert toolchain.compile_object(Path("main.cpp"), Path("main.o"))
+    assert toolchain.distributor.remote_compiles == 1
+    assert Path("main.o").read_bytes().startswith(b"\x7fELF")
+    # The depfile is written by the local preprocessing step
+    assert "main.cpp" in Path("main.d").read_text()
@@ -0,0 +1,111 @@
+"""Tests for content hashing and the stat-keyed hash cache."""
+
+from pathlib import Path
+import hashlib
+import json
+import mmap
+import os
+import pytest
+from src.core import hashing
+from src.core.hashing import FileHasher, hash_file
+
+
+PAST_NS = 1_600_000_000 * 10**9
+
+
+def write(path: Path, data: bytes, mtime_ns: int = PAST_NS) -> Path:
+    """Write a file with a known modification time."""
+    path.write_bytes(data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def test_blake2b_fallback(tmp_path, monkeypatch):
+    monkeypatch.setattr(hashing, "xxhash", None)
+    path = write(tmp_path / "a.cpp", b"int a;\n")
+    assert hash_file(path) == hashlib.blake2b(b"int a;\n", digest_size=16).hexdigest()
+
+
+def test_xxhash(tmp_path):
+    xxhash = pytest.importorskip("xxhash")
+    path = write(tmp_path / "a.cpp", b"int a;\n")
+    assert hash_file(path) == xxhash.xxh3_128(b"int a;\n").hexdigest()
+
+
+def test_mmap_matches_read(tmp_path, monkeypatch):
+    path = write(tmp_path / "big.cpp", os.urandom(64 * 1024))
+    expected = hash_file(path)
+
+    mapped = []
+    real_mmap = mmap.mmap
+
+    def spy(*args, **kwargs):
+        mapped.append(True)
+        return real_mmap(*args, **kwargs)
+
+    monkeypatch.setattr(hashing, "MMAP_THRESHOLD", 1024)
+    monkeypatch.setattr(hashing.mmap, "mmap", spy)
+    assert hash_file(path) == expected
+    assert mapped
+
+
+def test_empty_file(tmp_path):
+    path = write(tmp_path / "empty.h", b"")
+    assert hash_file(path) == hash_file(path, size=0)
+
+
+def test_cached_by_stat(tmp_path):
+    path = write(tmp_path / "a.cpp", b"int a;\n")
+    hasher = FileHasher(tmp_path / "build")
+
+    digest = hasher.hash(path)
+    assert hasher.hash(path) == digest
+    assert hasher.files_hashed == 1
+
+    write(path, b"int b;\n", PAST_NS + 10**9)
+    assert hasher.hash(path) != digest
+    assert hasher.files_hashed == 2
+
+
+def test_missing_file(tmp_path):
+    assert FileHasher(tmp_path / "build").hash(tmp_path / "missing.h") is None
+
+
+def test_recently_modified_file_is_rehashed(tmp_path):
+    path = tmp_path / "a.cpp"
+    path.write_bytes(b"int a;\n")
+    mtime_ns = os.stat(path).st_mtime_ns
+    hasher = FileHasher(tmp_path / "build")
+    first = hasher.hash(path)
+
+    # Same size, same mtime: only the content tells the edit apart
+    path.write_bytes(b"int b;\n")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    assert hasher.hash(path) != first
+    assert hasher.files_hashed == 2
+
+
+def test_save_and_load(tmp_path):
+    path = write(tmp_path / "a.cpp", b"int a;\n")
+    hasher = FileHasher(tmp_path / "build")
+    digest = hasher.hash(path)
+    hasher.save()
+
+    loaded = FileHasher.load(tmp_path / "build")
+    assert loaded.hash(path) == digest
+    assert loaded.files_hashed == 0
+
+
+def test_load_discards_other_algorithm(tmp_path):
+    path = write(tmp_path / "a.cpp", b"int a;\n")
+    hasher = FileHasher(tmp_path / "build")
+    hasher.hash(path)
+    hasher.save()
+    data = json.loads(hasher.path.read_text())
+    data["algorithm"] = "md5"
+    hasher.path.write_text(json.dumps(data))
+
+    loaded = FileHasher.load(tmp_path / "build")
+    loaded.hash(path)
+    assert loaded.files_hashed == 1
@@ -0,0 +1,170 @@
+"""Tests for toolchain probing against fake MSVC and Windows SDK trees."""
+
+from pathlib import Path
+import os
+import sys
+import pytest
+from src.toolchains.msvc import MSVCToolchain
+from src.toolchains.probe import ToolchainProbe
+
+
+# The stub tools are shell scripts
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="needs a POSIX shell")
+
+CL_BANNER = "Microsoft (R) C/C++ Optimizing Compiler Version 19.38.33130 for x64"
+
+
+def make_stub(path: Path, script: str) -> None:
+    """Create an executable shell script."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"#!/bin/sh\n{script}\n")
+    path.chmod(0o755)
+
+
+@pytest.fixture
+def fake_msvc(tmp_path, monkeypatch):
+    """Fake VC/Tools/MSVC and Windows Kits/10 trees with a stub cl.exe."""
+    vc_root = tmp_path / "VC" / "Tools" / "MSVC"
+    sdk_root = tmp_path / "Windows Kits" / "10"
+    runs = tmp_path / "cl-runs.log"
+
+    # An older toolset without tools, and the newest one with them
+    (vc_root / "14.29.30133" / "include").mkdir(parents=True)
+    newest = vc_root / "14.38.33130"
+    (newest / "include").mkdir(parents=True)
+    (newest / "lib" / "x64").mkdir(parents=True)
+    tools = newest / "bin" / "Hostx64" / "x64"
+    # cl.exe prints its banner to stderr; each run is logged to count probes
+    make_stub(tools / "cl.exe", f'echo run >> "{runs}"\necho "{CL_BANNER}" >&2')
+    make_stub(tools / "link.exe", "exit 0")
+    make_stub(tools / "lib.exe", "exit 0")
+
+    sdk_version = "10.0.22621.0"
+    for sub in ("ucrt", "um"):
+        (sdk_root / "Include" / sdk_version / sub).mkdir(parents=True)
+        (sdk_root / "Lib" / sdk_version / sub / "x64").mkdir(parents=True)
+
+    monkeypatch.setenv("SUGAR_MSVC_ROOTS", str(vc_root))
+    monkeypatch.setenv("SUGAR_WINSDK_ROOTS", str(sdk_root))
+    monkeypatch.setenv("SUGAR_CACHE_DIR", str(tmp_path / "cache"))
+    # The in-memory cache is shared by the process
+    monkeypatch.setattr(ToolchainProbe, "_memory", {})
+
+    def probe_count() -> int:
+        return len(runs.read_text().splitlines()) if runs.exists() else 0
+
+    return {
+        "vc_root": vc_root,
+        "sdk_root": sdk_root,
+        "tools": tools,
+        "sdk_version": sdk_version,
+        "probe_count": probe_count,
+    }
+
+
+def test_probe_resolves_fake_tree(fake_msvc):
+    tools = fake_msvc["tools"]
+    include = fake_msvc["sdk_root"] / "Include" / fake_msvc["sdk_version"]
+    lib = fake_msvc["sdk_root"] / "Lib" / fake_msvc["sdk_version"]
+
+    info = MSVCToolchain.probe()
+
+    assert info.compiler == str(tools / "cl.exe")
+    assert info.linker == str(tools / "link.exe")
+    assert info.archiver == str(tools / "lib.exe")
+    assert info.version == "19.38.33130"
+    assert info.include_dirs == [
+        str(fake_msvc["vc_root"] / "14.38.33130" / "include"),
+        str(include / "ucrt"),
+        str(include / "um"),
+    ]
+    assert info.lib_dirs == [
+        str(fake_msvc["vc_root"] / "14.38.33130" / "lib" / "x64"),
+        str(lib / "ucrt" / "x64"),
+        str(lib / "um" / "x64"),
+    ]
+
+
+def test_toolchain_uses_probe_result(fake_msvc):
+    toolchain = MSVCToolchain()
+
+    assert toolchain.get_compiler_executable() == str(fake_msvc["tools"] / "cl.exe")
+    assert toolchain.get_version() == "19.38.33130"
+    assert fake_msvc["probe_count"]() == 1
+
+
+def test_lookup_reuses_cached_probe(fake_msvc, tmp_path, monkeypatch):
+    roots = MSVCToolchain.get_install_roots()
+    first = ToolchainProbe().lookup("MSVC", roots, MSVCToolchain.probe)
+    assert fake_msvc["probe_count"]() == 1
+
+    # Same process: served from memory
+    assert ToolchainProbe().lookup("MSVC", roots, MSVCToolchain.probe) == first
+
+    # New process: served from the cache file
+    monkeypatch.setattr(ToolchainProbe, "_memory", {})
+    assert ToolchainProbe().lookup("MSVC", roots, MSVCToolchain.probe) == first
+    assert fake_msvc["probe_count"]() == 1
+    assert (tmp_path / "cache" / ToolchainProbe.FILENAME).exists()
+
+
+def test_lookup_probes_again_when_root_changes(fake_msvc, monkeypatch):
+    roots = MSVCToolchain.get_install_roots()
+    ToolchainProbe().lookup("MSVC", roots, MSVCToolchain.probe)
+    assert fake_msvc["probe_count"]() == 1
+
+    # Installing a toolset changes the root's modification time
+    vc_root = fake_msvc["vc_root"]
+    mtime = os.stat(vc_root).st_mtime_ns
+    os.utime(vc_root, ns=(mtime + 10**9, mtime + 10**9))
+
+    monkeypatch.setattr(ToolchainProbe, "_memory", {})
+    ToolchainProbe().lookup("MSVC", roots, MSVCToolchain.probe)
+    assert fake_msvc["probe_count"]() == 2
+
+    # The new result is cached in turn
+    monkeypatch.setattr(ToolchainProbe, "_memory", {})
+    ToolchainProbe().lookup("MSVC", roots, MSVCToolchain.probe)
+    assert fake_msvc["probe_count"]() == 2
+
+
+@pytest.fixture
+def fake_gxx(tmp_path, monkeypatch):
+    """A stub g++ in a directory at the front of PATH."""
+    bin_dir = tmp_path / "bin"
+    make_stub(bin_dir / "g++", 'echo "g++ (Fake) 13.2.0"')
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+    monkeypatch.setenv("SUGAR_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(ToolchainProbe, "_memory", {})
+    return bin_dir / "g++"
+
+
+def test_commands_run_probed_compiler(fake_gxx):
+    from src.toolchains.gcc import GCCToolchain
+
+    toolchain = GCCToolchain()
+    source, output = Path("main.cpp"), Path("main.o")
+
+    assert toolchain.info.compiler == str(fake_gxx)
+    assert toolchain.get_version() == "13.2.0"
+    assert toolchain.get_compile_command(source, output)[0] == str(fake_gxx)
+    assert toolchain.get_preprocess_command(source)[0] == str(fake_gxx)
+    assert toolchain.get_pch_compile_command(Path("pch.h"))[0] == str(fake_gxx)
+    assert str(fake_gxx) in toolchain.get_identity()
+
+
+def test_links_run_probed_compiler(fake_gxx, tmp_path, monkeypatch):
+    from src.toolchains.gcc import GCCToolchain
+
+    toolchain = GCCToolchain()
+    commands = []
+
+    async def record(cmd):
+        commands.append(cmd)
+        return True
+
+    monkeypatch.setattr(toolchain, "_run_tool", record)
+    objects = [tmp_path / "main.o"]
+    assert toolchain.link_executable(objects, tmp_path / "app")
+    assert toolchain.link_shared_library(objects, tmp_path / "libapp.so")
+    assert [cmd[0] for cmd in commands] == [str(fake_gxx), str(fake_gxx)]
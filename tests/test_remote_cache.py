@@ -0,0 +1,135 @@
+"""Tests for the shared compile cache client and reference server."""
+
+from pathlib import Path
+import http.client
+import threading
+import pytest
+from src.core.cache import CompileCache
+from src.core.cache_server import CacheServer
+from src.core.remote_cache import CacheBackend, HTTPCacheBackend, pack_entry, unpack_entry
+
+
+KEY = "0123456789abcdef" * 2
+OTHER_KEY = "fedcba9876543210" * 2
+
+
+@pytest.fixture
+def server(tmp_path):
+    """A cache server on a free localhost port."""
+    server = CacheServer(("127.0.0.1", 0), tmp_path / "server", max_entry_size=1024)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def backend(server):
+    """A client for the server."""
+    backend = HTTPCacheBackend(server.url, connections=4)
+    yield backend
+    backend.close()
+
+
+def request(server: CacheServer, method: str, path: str, body=None, headers=None):
+    """Send one raw request and return (status, body)."""
+    host, port = server.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def test_pack_round_trip():
+    files = {"object": b"\x7fELF...", "depfile": b"a.o: a.cpp\n"}
+    assert unpack_entry(pack_entry(files)) == files
+    with pytest.raises(ValueError):
+        unpack_entry(pack_entry(files)[:-3])
+
+
+def test_put_then_get(backend):
+    assert backend.put(KEY, b"entry")
+    assert backend.get(KEY) == b"entry"
+
+
+def test_missing_entry(backend, server):
+    assert backend.get(KEY) is None
+    assert request(server, "GET", f"/{KEY}")[0] == 404
+
+
+def test_first_writer_wins(backend):
+    assert backend.put(KEY, b"first")
+    assert backend.put(KEY, b"second")
+    assert backend.get(KEY) == b"first"
+
+
+def test_bad_key(server):
+    assert request(server, "GET", "/not-a-key")[0] == 400
+    assert request(server, "PUT", "/NOT-HEX", body=b"x")[0] == 400
+
+
+def test_head_sends_no_body(backend, server):
+    backend.put(KEY, b"entry")
+    host, port = server.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    conn.request("HEAD", f"/{KEY}")
+    response = conn.getresponse()
+    assert response.status == 200
+    assert response.getheader("Content-Length") == "5"
+    assert response.read() == b""
+    # The connection is still usable, so nothing followed the headers
+    conn.request("GET", f"/{KEY}")
+    assert conn.getresponse().read() == b"entry"
+    conn.close()
+
+
+def test_put_body_limits(server):
+    assert request(server, "PUT", f"/{KEY}", body=b"x" * 2048)[0] == 413
+    assert request(server, "PUT", f"/{KEY}", headers={"Content-Length": "abc"})[0] == 400
+
+
+def test_get_many(backend):
+    keys = [f"{index:032x}" for index in range(10)]
+    for key in keys[::2]:
+        backend.put(key, key.encode())
+    assert backend.get_many(keys) == {key: key.encode() for key in keys[::2]}
+    assert backend.get_many([]) == {}
+
+
+def test_compile_cache_shares_entries(backend, tmp_path):
+    source = tmp_path / "main.o"
+    source.write_bytes(b"object")
+    first = CompileCache(tmp_path / "first", 1 << 20, backend)
+    first.store(KEY, {"object": source})
+
+    # Another machine with an empty local cache
+    second = CompileCache(tmp_path / "second", 1 << 20, backend)
+    assert second.prefetch([KEY, OTHER_KEY]) == 1
+    restored = tmp_path / "restored.o"
+    assert second.restore(KEY, {"object": restored})
+    assert restored.read_bytes() == b"object"
+    assert second.remote_hits == 1
+
+
+def test_restore_skips_prefetched_misses(tmp_path):
+    class CountingBackend(CacheBackend):
+        def __init__(self):
+            self.requests = []
+
+        def get(self, key):
+            self.requests.append(key)
+            return None
+
+    backend = CountingBackend()
+    cache = CompileCache(tmp_path / "cache", 1 << 20, backend)
+    cache.prefetch([KEY])
+    assert not cache.restore(KEY, {"object": tmp_path / "main.o"})
+    assert backend.requests == [KEY]
+
+    # A new build asks again
+    cache.reset_stats()
+    cache.restore(KEY, {"object": tmp_path / "main.o"})
+    assert backend.requests == [KEY, KEY]
@@ -0,0 +1,175 @@
+"""Tests for the parallel job scheduler."""
+
+from typing import List
+import asyncio
+import pytest
+from src.core.scheduler import Job, JobScheduler
+
+
+class Recorder:
+    """Fake build steps that log when they start and finish."""
+
+    def __init__(self):
+        self.events: List[str] = []
+        self.running = 0
+        self.max_running = 0
+
+    def job(self, name: str, deps=(), cost: float = 0.0, succeed: bool = True, delay: float = 0.01) -> Job:
+        async def run() -> bool:
+            self.events.append(f"start {name}")
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            await asyncio.sleep(delay)
+            self.running -= 1
+            self.events.append(f"end {name}")
+            return succeed
+
+        return Job(name, run, list(deps), cost=cost)
+
+    def started(self) -> List[str]:
+        return [event.split()[1] for event in self.events if event.startswith("start")]
+
+
+def test_runs_every_job():
+    recorder = Recorder()
+    jobs = [recorder.job(f"j{i}") for i in range(5)]
+
+    results = list(JobScheduler(2).run(jobs))
+
+    assert sorted(result.job.name for result in results) == [f"j{i}" for i in range(5)]
+    assert all(result.success for result in results)
+
+
+def test_concurrency_limit():
+    recorder = Recorder()
+    jobs = [recorder.job(f"j{i}") for i in range(8)]
+
+    list(JobScheduler(3).run(jobs))
+
+    assert recorder.max_running == 3
+
+
+def test_worker_ids_are_slots():
+    recorder = Recorder()
+    results = list(JobScheduler(2).run([recorder.job(f"j{i}") for i in range(6)]))
+    assert {result.worker for result in results} == {0, 1}
+
+
+def test_dependencies_finish_first():
+    recorder = Recorder()
+    lib = recorder.job("lib", delay=0.05)
+    obj = recorder.job("obj")
+    app = recorder.job("app", deps=[lib, obj])
+
+    list(JobScheduler(4).run([app, obj, lib]))
+
+    events = recorder.events
+    assert events.index("start app") > events.index("end lib")
+    assert events.index("start app") > events.index("end obj")
+
+
+def test_plain_functions_run_on_threads():
+    ran = []
+    job = Job("sync", lambda: ran.append(True) or True)
+    results = list(JobScheduler(1).run([job]))
+    assert ran == [True] and results[0].success
+
+
+def test_exception_is_a_failure():
+    def broken() -> bool:
+        raise RuntimeError("boom")
+
+    (result,) = JobScheduler(1).run([Job("broken", broken)])
+    assert not result.success
+    assert isinstance(result.error, RuntimeError)
+
+
+def test_fail_fast():
+    recorder = Recorder()
+    jobs = [recorder.job("bad", succeed=False)] + [recorder.job(f"j{i}") for i in range(3)]
+    scheduler = JobScheduler(1)
+
+    results = list(scheduler.run(jobs))
+
+    assert [result.job.name for result in results] == ["bad"]
+    assert scheduler.failed
+    assert scheduler.skipped == 3
+
+
+def test_keep_going():
+    recorder = Recorder()
+    bad = recorder.job("bad", succeed=False)
+    after_bad = recorder.job("after_bad", deps=[bad])
+    others = [recorder.job(f"j{i}") for i in range(3)]
+    scheduler = JobScheduler(1, keep_going=True)
+
+    results = list(scheduler.run([bad, after_bad, *others]))
+
+    # Independent jobs still run; jobs after a failure never do
+    assert sorted(result.job.name for result in results) == ["bad", "j0", "j1", "j2"]
+    assert scheduler.failed
+    assert scheduler.skipped == 1
+
+
+def test_unscheduled_dependency():
+    recorder = Recorder()
+    missing = recorder.job("missing")
+    with pytest.raises(ValueError):
+        list(JobScheduler(1).run([recorder.job("app", deps=[missing])]))
+
+
+def test_cycle():
+    recorder = Recorder()
+    first = recorder.job("first")
+    second = recorder.job("second", deps=[first])
+    first.deps.append(second)
+    with pytest.raises(ValueError):
+        list(JobScheduler(1).run([first, second]))
+
+
+def test_longest_job_first():
+    recorder = Recorder()
+    jobs = [recorder.job(name, cost=cost) for name, cost in [("a", 1.0), ("b", 5.0), ("c", 3.0)]]
+
+    list(JobScheduler(1).run(jobs))
+
+    assert recorder.started() == ["b", "c", "a"]
+
+
+def test_equal_costs_keep_submission_order():
+    recorder = Recorder()
+    list(JobScheduler(1).run([recorder.job(name) for name in "abc"]))
+    assert recorder.started() == ["a", "b", "c"]
+
+
+def test_critical_path_first():
+    recorder = Recorder()
+    # pch is cheap but unblocks the expensive compile behind it
+    pch = recorder.job("pch", cost=1.0)
+    heavy = recorder.job("heavy", deps=[pch], cost=10.0)
+    medium = recorder.job("medium", cost=5.0)
+
+    list(JobScheduler(1).run([medium, heavy, pch]))
+
+    assert recorder.started() == ["pch", "heavy", "medium"]
+
+
+def test_order_from_build_timings(tmp_path):
+    from src.core.timings import BuildTimings
+
+    sources = {}
+    for name, size in [("small", 50), ("big", 10_000), ("measured", 100)]:
+        sources[name] = tmp_path / f"{name}.cpp"
+        sources[name].write_bytes(b"x" * size)
+    timings = BuildTimings(tmp_path / "build")
+    timings.record(f"{sources['measured']}.o", 2.0)
+
+    estimates = timings.estimate({f"{path}.o": [path] for path in sources.values()})
+    recorder = Recorder()
+    jobs = [recorder.job(name, cost=estimates[f"{path}.o"]) for name, path in sources.items()]
+    list(JobScheduler(1).run(jobs))
+
+    # Unmeasured files are estimated at the measured seconds per byte
+    assert estimates[f"{sources['big']}.o"] == pytest.approx(200.0)
+    assert estimates[f"{sources['small']}.o"] == pytest.approx(1.0)
+    assert recorder.started() == ["big", "measured", "small"]
@@ -0,0 +1,117 @@
+"""Tests for source discovery and the directory listing cache."""
+
+from pathlib import Path
+import os
+from src.core.sources import SourceScanner, matches_any
+
+
+PAST_NS = 1_600_000_000 * 10**9
+
+
+def touch(path: Path) -> Path:
+    """Create a file, along with its parent directories."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("", encoding="utf-8")
+    return path
+
+
+def age(*directories: Path) -> None:
+    """Move directory mtimes out of the recent-change window."""
+    for directory in directories:
+        os.utime(directory, ns=(PAST_NS, PAST_NS))
+
+
+def names(paths, root: Path):
+    return [p.relative_to(root).as_posix() for p in paths]
+
+
+def test_matches_any():
+    assert matches_any("a/b/c.cpp", ["*.cpp"])
+    assert matches_any("tests/x/y.cpp", ["tests/*"])
+    assert not matches_any("src/main.cpp", ["tests/*", "*.c"])
+
+
+def test_scan_filters_extensions_and_patterns(tmp_path):
+    for rel in ("main.cpp", "util.c", "notes.txt", "sub/a.cpp", "tests/t.cpp"):
+        touch(tmp_path / rel)
+    scanner = SourceScanner([".cpp", ".c"])
+
+    assert names(scanner.scan(tmp_path), tmp_path) == [
+        "main.cpp", "sub/a.cpp", "tests/t.cpp", "util.c",
+    ]
+    assert names(scanner.scan(tmp_path, recursive=False), tmp_path) == ["main.cpp", "util.c"]
+    assert names(scanner.scan(tmp_path, exclude=["tests/*"]), tmp_path) == [
+        "main.cpp", "sub/a.cpp", "util.c",
+    ]
+    assert names(scanner.scan(tmp_path, include=["*.c"]), tmp_path) == ["util.c"]
+
+
+def test_excluded_directory_is_not_entered(tmp_path):
+    touch(tmp_path / "main.cpp")
+    touch(tmp_path / "third_party" / "lib.cpp")
+    scanner = SourceScanner([".cpp"])
+    scanner.scan(tmp_path, exclude=["third_party"])
+    assert scanner.directories_read == 1
+
+
+def test_skip_dirs(tmp_path):
+    touch(tmp_path / "main.cpp")
+    touch(tmp_path / "build" / "gen.cpp")
+    scanner = SourceScanner([".cpp"])
+    assert names(scanner.scan(tmp_path, skip_dirs=[tmp_path / "build"]), tmp_path) == ["main.cpp"]
+
+
+def test_unchanged_directories_are_not_reread(tmp_path):
+    touch(tmp_path / "src" / "main.cpp")
+    touch(tmp_path / "src" / "sub" / "a.cpp")
+    age(tmp_path / "src", tmp_path / "src" / "sub")
+    root = tmp_path / "src"
+    cache_dir = tmp_path / "build"
+
+    scanner = SourceScanner([".cpp"], cache_dir)
+    first = scanner.scan(root)
+    assert scanner.directories_read == 2
+    scanner.save()
+
+    reloaded = SourceScanner([".cpp"], cache_dir)
+    assert reloaded.scan(root) == first
+    assert reloaded.directories_read == 0
+
+
+def test_directory_mtime_change_invalidates_listing(tmp_path):
+    root = tmp_path / "src"
+    touch(root / "main.cpp")
+    touch(root / "sub" / "a.cpp")
+    age(root, root / "sub")
+    scanner = SourceScanner([".cpp"], tmp_path / "build")
+    scanner.scan(root)
+    scanner.save()
+
+    touch(root / "sub" / "b.cpp")
+    os.utime(root / "sub", ns=(PAST_NS + 10**9, PAST_NS + 10**9))
+
+    reloaded = SourceScanner([".cpp"], tmp_path / "build")
+    assert names(reloaded.scan(root), root) == ["main.cpp", "sub/a.cpp", "sub/b.cpp"]
+    assert reloaded.directories_read == 1
+
+
+def test_recently_modified_directory_is_not_cached(tmp_path):
+    touch(tmp_path / "main.cpp")
+    scanner = SourceScanner([".cpp"], tmp_path / "build")
+    scanner.scan(tmp_path)
+    scanner.scan(tmp_path)
+    assert scanner.directories_read == 2
+
+
+def test_cache_ignored_when_extensions_change(tmp_path):
+    root = tmp_path / "src"
+    touch(root / "main.cpp")
+    touch(root / "util.c")
+    age(root)
+    scanner = SourceScanner([".cpp"], tmp_path / "build")
+    scanner.scan(root)
+    scanner.save()
+
+    other = SourceScanner([".cpp", ".c"], tmp_path / "build")
+    assert names(other.scan(root), root) == ["main.cpp", "util.c"]
+    assert other.directories_read == 1
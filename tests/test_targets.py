@@ -0,0 +1,72 @@
+"""Tests for target dependency graph validation and ordering."""
+
+import pytest
+from src.core.targets import Target, TargetGraph
+
+
+def target(name: str, project_type: str = "static", deps=()) -> Target:
+    return Target(name, project_type, ["src"], deps=list(deps))
+
+
+def test_dependencies_come_first():
+    graph = TargetGraph([
+        target("app", "exe", ["net", "core"]),
+        target("net", deps=["core"]),
+        target("core"),
+    ])
+    order = [t.name for t in graph.order()]
+    assert order.index("core") < order.index("net") < order.index("app")
+
+
+def test_transitive_deps_in_link_order():
+    graph = TargetGraph([
+        target("app", "exe", ["net"]),
+        target("net", deps=["core"]),
+        target("core", deps=["util"]),
+        target("util"),
+        target("unused"),
+    ])
+    # Each library precedes the libraries it depends on
+    assert [t.name for t in graph.transitive_deps("app")] == ["net", "core", "util"]
+    assert [t.name for t in graph.transitive_deps("util")] == []
+
+
+def test_diamond_dependency_listed_once():
+    graph = TargetGraph([
+        target("app", "exe", ["a", "b"]),
+        target("a", deps=["base"]),
+        target("b", deps=["base"]),
+        target("base"),
+    ])
+    deps = [t.name for t in graph.transitive_deps("app")]
+    assert sorted(deps) == ["a", "b", "base"]
+    assert deps[-1] == "base"
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match="cycle: a -> b -> c -> a"):
+        TargetGraph([
+            target("a", deps=["b"]),
+            target("b", deps=["c"]),
+            target("c", deps=["a"]),
+        ])
+
+
+def test_self_dependency_is_rejected():
+    with pytest.raises(ValueError, match="cycle: a -> a"):
+        TargetGraph([target("a", deps=["a"])])
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError, match="unknown target 'missing'"):
+        TargetGraph([target("app", "exe", ["missing"])])
+
+
+def test_executable_dependency_is_rejected():
+    with pytest.raises(ValueError, match="cannot depend on executable 'tool'"):
+        TargetGraph([target("app", "exe", ["tool"]), target("tool", "exe")])
+
+
+def test_duplicate_name_is_rejected():
+    with pytest.raises(ValueError, match="Duplicate target name: a"):
+        TargetGraph([target("a"), target("a", "shared")])
@@ -0,0 +1,76 @@
+"""Tests for unity build batch planning and generation."""
+
+from pathlib import Path
+import os
+from src.core.unity import UNITY_HEADER, UnityBatch, UnityBuilder
+
+
+def plan(tmp_path: Path, rel_paths, batch_size: int = 3, exclude=()):
+    builder = UnityBuilder(tmp_path / "unity", batch_size, exclude)
+    sources = [tmp_path / rel for rel in rel_paths]
+    return builder, builder.plan(sources, lambda p: os.path.relpath(p, tmp_path))
+
+
+def test_batches_split_by_size_in_sorted_order(tmp_path):
+    _, (batches, singles) = plan(tmp_path, ["e.cpp", "a.cpp", "d.cpp", "b.cpp", "c.cpp"])
+    assert [b.path for b in batches] == [
+        tmp_path / "unity" / "unity_0.cpp",
+        tmp_path / "unity" / "unity_1.cpp",
+    ]
+    assert [[s.name for s in b.sources] for b in batches] == [
+        ["a.cpp", "b.cpp", "c.cpp"], ["d.cpp", "e.cpp"],
+    ]
+    assert singles == []
+
+
+def test_batches_grouped_by_directory_and_language(tmp_path):
+    _, (batches, singles) = plan(
+        tmp_path, ["a/x.cpp", "a/y.cpp", "b/x.cpp", "b/y.cpp", "a/z.c", "a/w.c"]
+    )
+    assert {(b.path.relative_to(tmp_path).as_posix(), len(b.sources)) for b in batches} == {
+        ("unity/a/unity_0.cpp", 2),
+        ("unity/a/unity_0.c", 2),
+        ("unity/b/unity_0.cpp", 2),
+    }
+    for batch in batches:
+        assert len({s.parent for s in batch.sources}) == 1
+        assert len({s.suffix == ".c" for s in batch.sources}) == 1
+    assert singles == []
+
+
+def test_excluded_sources_stay_out_of_batches(tmp_path):
+    _, (batches, singles) = plan(
+        tmp_path, ["a.cpp", "b.cpp", "c.cpp", "gen/big.cpp", "gen/huge.cpp"],
+        exclude=["gen/*", "c.cpp"],
+    )
+    assert [[s.name for s in b.sources] for b in batches] == [["a.cpp", "b.cpp"]]
+    assert singles == sorted([tmp_path / "c.cpp", tmp_path / "gen/big.cpp", tmp_path / "gen/huge.cpp"])
+
+
+def test_single_file_batches_are_compiled_alone(tmp_path):
+    _, (batches, singles) = plan(tmp_path, ["a.cpp", "b.cpp", "c.cpp", "d.cpp", "other/e.cpp"])
+    assert [[s.name for s in b.sources] for b in batches] == [["a.cpp", "b.cpp", "c.cpp"]]
+    assert singles == [tmp_path / "d.cpp", tmp_path / "other/e.cpp"]
+
+
+def test_write_only_rewrites_changed_batches(tmp_path):
+    builder, (batches, _) = plan(tmp_path, ["a.cpp", "b.cpp"])
+    assert builder.write(batches) == 1
+    content = batches[0].path.read_text(encoding="utf-8")
+    assert content.startswith(UNITY_HEADER)
+    assert f'#include "{(tmp_path / "a.cpp").as_posix()}"' in content
+
+    assert builder.write(batches) == 0
+    batches[0].sources.append(tmp_path / "c.cpp")
+    assert builder.write(batches) == 1
+
+
+def test_write_removes_stale_batches(tmp_path):
+    builder = UnityBuilder(tmp_path / "unity", 2)
+    sources = [tmp_path / n for n in ("a.cpp", "b.cpp", "c.cpp", "d.cpp")]
+    first = [UnityBatch(tmp_path / "unity" / "unity_0.cpp", sources[:2]),
+             UnityBatch(tmp_path / "unity" / "unity_1.cpp", sources[2:])]
+    builder.write(first)
+    builder.write(first[:1])
+    assert first[0].path.exists()
+    assert not first[1].path.exists()
@@ -0,0 +1,57 @@
+"""Tests for file system change watchers."""
+
+import os
+import threading
+import pytest
+from src.core.watcher import ADDED, MODIFIED, InotifyWatcher, PollingWatcher
+
+
+inotify = pytest.mark.skipif(not InotifyWatcher.available(), reason="inotify not available")
+
+
+def open_fds():
+    return set(os.listdir("/proc/self/fd"))
+
+
+def test_polling_watcher_reports_changes(tmp_path):
+    (tmp_path / "a.cpp").write_text("int a;\n", encoding="utf-8")
+    watcher = PollingWatcher([tmp_path], interval=0.01)
+    (tmp_path / "b.cpp").write_text("int b;\n", encoding="utf-8")
+    (tmp_path / "a.cpp").write_text("int a = 1;\n", encoding="utf-8")
+    assert sorted(watcher.poll()) == [(ADDED, tmp_path / "b.cpp"), (MODIFIED, tmp_path / "a.cpp")]
+
+
+@inotify
+def test_inotify_watcher_reports_changes(tmp_path):
+    watcher = InotifyWatcher([tmp_path])
+    try:
+        (tmp_path / "a.cpp").write_text("int a;\n", encoding="utf-8")
+        assert (ADDED, tmp_path / "a.cpp") in watcher.wait(5)
+    finally:
+        watcher.close()
+
+
+@inotify
+def test_close_releases_descriptors(tmp_path):
+    before = open_fds()
+    watcher = InotifyWatcher([tmp_path])
+    assert len(open_fds() - before) == 3
+    watcher.close()
+    assert open_fds() <= before
+    assert watcher.wait(0) == []
+
+
+@inotify
+def test_close_wakes_waiter_then_releases_descriptors(tmp_path):
+    before = open_fds()
+    watcher = InotifyWatcher([tmp_path])
+    result = []
+    thread = threading.Thread(target=lambda: result.append(watcher.wait()))
+    thread.start()
+    while not watcher._waiting:
+        thread.join(0.01)
+    watcher.close()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert result == [[]]
+    assert open_fds() <= before